@@ -0,0 +1,42 @@
+"""
+Add LLM response cache columns.
+
+Revision ID: b7c41e9d2a63
+Revises: 4dd3f9030cea
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b7c41e9d2a63"
+down_revision: Union[str, Sequence[str], None] = "4dd3f9030cea"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add the per source cache bypass flag and the per instance cache counters."""
+    with op.batch_alter_table("SourceLLM") as batch_op:
+        batch_op.add_column(
+            sa.Column("BypassCache", sa.Boolean(), nullable=False, server_default=sa.false())
+        )
+
+    with op.batch_alter_table("SourceInstance") as batch_op:
+        batch_op.add_column(sa.Column("CacheHits", sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column("CacheMisses", sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    """Remove the cache columns."""
+    with op.batch_alter_table("SourceInstance") as batch_op:
+        batch_op.drop_column("CacheMisses")
+        batch_op.drop_column("CacheHits")
+
+    with op.batch_alter_table("SourceLLM") as batch_op:
+        batch_op.drop_column("BypassCache")
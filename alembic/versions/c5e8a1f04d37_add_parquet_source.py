@@ -0,0 +1,43 @@
+"""
+Add Parquet source.
+
+Revision ID: c5e8a1f04d37
+Revises: b7c41e9d2a63
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c5e8a1f04d37"
+down_revision: Union[str, Sequence[str], None] = "b7c41e9d2a63"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create the Parquet source table. The source type itself is seeded by init-db."""
+    op.create_table(
+        "SourceParquet",
+        sa.Column("Id", sa.Integer(), nullable=False),
+        sa.Column("Columns", sa.Text(), nullable=True),
+        sa.Column("Filters", sa.Text(), nullable=True),
+        sa.Column("IsSplitter", sa.Boolean(), nullable=False),
+        sa.Column("FieldName", sa.Text(), nullable=True),
+        sa.ForeignKeyConstraint(["Id"], ["Source.Id"]),
+        sa.PrimaryKeyConstraint("Id"),
+    )
+
+
+def downgrade() -> None:
+    """Remove Parquet sources and the Parquet source table."""
+    conn = op.get_bind()
+    conn.execute(sa.text("DELETE FROM SourceInstance WHERE SourceId IN (SELECT Id FROM SourceParquet)"))
+    conn.execute(sa.text("DELETE FROM Source WHERE discriminator = 'parquet'"))
+    op.drop_table("SourceParquet")
+    conn.execute(sa.text("DELETE FROM SourceType WHERE Name = 'Parquet'"))
@@ -14,3 +14,96 @@ USE_WORKERS = os.getenv("SCALE", "MULTIPLE") == "MULTIPLE"
 DOWNLOAD_DIRECTORY = Path(os.getenv("DOWNLOAD_DIRECTORY", "/download_dir"))
 UPLOAD_DIRECTORY = Path(os.getenv("UPLOAD_DIRECTORY", "/upload_dir"))
 OUTPUT_FILE_PERMISSION = 0o666
+
+# number of processes used to render outcomes. 1 renders everything in the worker itself.
+OUTCOME_WORKERS = int(os.getenv("OUTCOME_WORKERS", "1"))
+
+# number of parsed outcome templates kept in memory by each process.
+TEMPLATE_CACHE_SIZE = int(os.getenv("TEMPLATE_CACHE_SIZE", "32"))
+
+# completed outcome instances are written to the database in batches of this size, or
+# after this many seconds, whichever comes first.
+OUTCOME_STATUS_FLUSH_COUNT = int(os.getenv("OUTCOME_STATUS_FLUSH_COUNT", "50"))
+OUTCOME_STATUS_FLUSH_SECONDS = float(os.getenv("OUTCOME_STATUS_FLUSH_SECONDS", "2"))
+
+# number of long lived LibreOffice conversion servers per process used for PDF outcomes. 0
+# starts a new LibreOffice for each document instead. Servers are run with UNOSERVER_COMMAND.
+LIBREOFFICE_SERVERS = int(os.getenv("LIBREOFFICE_SERVERS", "0"))
+UNOSERVER_COMMAND = os.getenv("UNOSERVER_COMMAND", "unoserver")
+LIBREOFFICE_TIMEOUT = float(os.getenv("LIBREOFFICE_TIMEOUT", "120"))
+
+# stream contexts into outcome rendering as they are built, rather than building them all
+# first. Outcome instances are then created CONTEXT_BATCH_SIZE contexts at a time.
+STREAM_CONTEXTS = os.getenv("STREAM_CONTEXTS", "0") == "1"
+CONTEXT_BATCH_SIZE = int(os.getenv("CONTEXT_BATCH_SIZE", "100"))
+
+# number of sources loaded at the same time, when they don't read fields from each other.
+# 1 loads every source one after another.
+SOURCE_WORKERS = int(os.getenv("SOURCE_WORKERS", "4"))
+
+# number of parameter sets a Database source combines into one UNION ALL query when it is
+# loaded for many contexts at once. 1 runs the query once per distinct parameter set.
+SQL_BATCH_SIZE = int(os.getenv("SQL_BATCH_SIZE", "50"))
+
+# connection pool settings for the engines of user supplied databases, which are shared by
+# every workflow a process runs. Connections idle longer than the recycle time are replaced.
+META_DB_POOL_SIZE = int(os.getenv("META_DB_POOL_SIZE", "5"))
+META_DB_MAX_OVERFLOW = int(os.getenv("META_DB_MAX_OVERFLOW", "10"))
+META_DB_POOL_RECYCLE = int(os.getenv("META_DB_POOL_RECYCLE", "1800"))
+
+# number of rows fetched at a time when a splitting Database source streams its results.
+SQL_YIELD_PER = int(os.getenv("SQL_YIELD_PER", "1000"))
+
+# LLM sources loaded for many contexts call their provider concurrently, with at most
+# LLM_MAX_CONCURRENCY calls in flight and LLM_TOKENS_PER_MINUTE (0 for no limit) per provider.
+# LLM_PROVIDER_LIMITS overrides them per provider, like "openai=8:90000,ollama=1".
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "4"))
+LLM_TOKENS_PER_MINUTE = int(os.getenv("LLM_TOKENS_PER_MINUTE", "0"))
+LLM_PROVIDER_LIMITS = os.getenv("LLM_PROVIDER_LIMITS", "")
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "5"))
+
+# LLM responses are cached on disk by provider, model and prompt, so repeated prompts are not
+# sent again. Set LLM_CACHE_PATH empty to disable. A LLM_CACHE_TTL of 0 never expires them.
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", str(Path(DB_PATH).parent / "llm_cache.db"))
+LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", str(30 * 24 * 60 * 60)))
+LLM_CACHE_MAX_MB = int(os.getenv("LLM_CACHE_MAX_MB", "256"))
+
+# CSV and Excel sources are cached as Arrow files in SOURCE_CACHE_DIR once parsed, keyed by the
+# file's version, so an unchanged file isn't parsed again. Set SOURCE_CACHE_DIR empty to disable.
+SOURCE_CACHE_DIR = os.getenv("SOURCE_CACHE_DIR", str(Path(DB_PATH).parent / "source_cache"))
+SOURCE_CACHE_MAX_MB = int(os.getenv("SOURCE_CACHE_MAX_MB", "1024"))
+
+# an outcome whose template reads the same fields as an earlier document of the run is copied
+# from it rather than rendered again. RENDER_DEDUP_SIZE is how many distinct documents are
+# remembered per run (0 disables it). DEDUP_HARD_LINKS hard links local copies instead.
+RENDER_DEDUP_SIZE = int(os.getenv("RENDER_DEDUP_SIZE", "10000"))
+DEDUP_HARD_LINKS = os.getenv("DEDUP_HARD_LINKS", "0") == "1"
+
+# S3 clients and SharePoint logins are kept per storage instance and shared by every source
+# and outcome in a process. Once no service uses one for STORAGE_CLIENT_IDLE_SECONDS it is
+# closed (0 keeps them).
+# S3_MAX_POOL_CONNECTIONS is the number of connections each S3 client keeps open.
+STORAGE_CLIENT_IDLE_SECONDS = float(os.getenv("STORAGE_CLIENT_IDLE_SECONDS", "600"))
+S3_MAX_POOL_CONNECTIONS = int(os.getenv("S3_MAX_POOL_CONNECTIONS", "20"))
+
+# S3 outputs up to S3_MULTIPART_THRESHOLD_MB are sent in a single request from memory, larger
+# ones in S3_MULTIPART_CHUNK_MB parts, S3_UPLOAD_CONCURRENCY at a time. Uploads run on
+# S3_UPLOAD_WORKERS background threads per process while the next document renders (0 waits).
+S3_MULTIPART_THRESHOLD_MB = int(os.getenv("S3_MULTIPART_THRESHOLD_MB", "16"))
+S3_MULTIPART_CHUNK_MB = int(os.getenv("S3_MULTIPART_CHUNK_MB", "16"))
+S3_UPLOAD_CONCURRENCY = int(os.getenv("S3_UPLOAD_CONCURRENCY", "8"))
+S3_UPLOAD_WORKERS = int(os.getenv("S3_UPLOAD_WORKERS", "4"))
+
+# templates and sources read from S3 and SharePoint are kept in REMOTE_FILE_CACHE_DIR, shared by
+# every process on the host, and only downloaded again once their ETag changes. Set
+# REMOTE_FILE_CACHE_DIR empty to disable.
+REMOTE_FILE_CACHE_DIR = os.getenv(
+    "REMOTE_FILE_CACHE_DIR", str(Path(DB_PATH).parent / "remote_file_cache")
+)
+REMOTE_FILE_CACHE_MAX_MB = int(os.getenv("REMOTE_FILE_CACHE_MAX_MB", "1024"))
+
+# SharePoint outputs over SHAREPOINT_CHUNK_MB are uploaded in chunks of that size.
+SHAREPOINT_CHUNK_MB = int(os.getenv("SHAREPOINT_CHUNK_MB", "4"))
+
+# number of rows read at a time when a splitting Parquet source streams its file.
+PARQUET_BATCH_SIZE = int(os.getenv("PARQUET_BATCH_SIZE", "10000"))
@@ -1,26 +1,106 @@
 """Define data containers returned from a database."""
 
+from collections.abc import Mapping
+from typing import Any, Iterator, Optional
+
 from loguru import logger
 
 
 class RecordSet:
-    """Represents a data container with 1 or more fields and 1 or more rows."""
+    """
+    Represents a data container with 1 or more fields and 1 or more rows.
+
+    The values are stored by column, with the headings shared by every row, rather
+    than as a dict per row repeating every heading. Rows are read through Row views,
+    which behave like the dicts they replace.
+    """
 
     def __init__(self, columns, data):
         """Create the container with headings and data."""
-        self.headings = columns
-        self.data = [dict(zip(columns, row, strict=False)) for row in data]
+        self.headings = tuple(columns)
+        self.positions = {heading: position for position, heading in enumerate(self.headings)}
+
+        rows = list(data)
+        self.length = len(rows)
+        if rows:
+            self.columns = [list(column) for column in zip(*rows, strict=False)]
+        else:
+            self.columns = [[] for _ in self.headings]
+
+        self._rows: Optional[list[Row]] = None
+
+    @property
+    def data(self) -> list["Row"]:
+        """Return a view of each row, in order."""
+        if self._rows is None:
+            self._rows = [Row(self, index) for index in range(self.length)]
+
+        return self._rows
 
     def __bool__(self):
         """Return if this container has data."""
         return self.data is not None
 
+    def __len__(self):
+        """Return the number of rows."""
+        return self.length
+
     def column(self, heading):
-        """Return a list of data for a particular heading."""
-        if heading not in self.headings:
+        """Return a list of data for a particular heading. The list is shared, so don't change it."""
+        if heading not in self.positions:
             return []
 
-        return [record[heading] for record in self.data or []]
+        return self.columns[self.positions[heading]]
+
+
+class Row(Mapping):
+    """
+    A read only view of a single row of a RecordSet.
+
+    Fields can be read as row["field"] or row.field, and a Row compares equal to a
+    dict of the same fields, so it can be used wherever a record dict was before.
+    """
+
+    __slots__ = ("_recordset", "_index")
+
+    def __init__(self, recordset: RecordSet, index: int):
+        """Create a view of row index of recordset."""
+        self._recordset = recordset
+        self._index = index
+
+    def __getitem__(self, key) -> Any:
+        """Return the value of the field key in this row."""
+        return self._recordset.columns[self._recordset.positions[key]][self._index]
+
+    def __getattr__(self, name: str) -> Any:
+        """Return the value of the field name in this row."""
+        if name.startswith("_"):
+            raise AttributeError(name)
+
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def __contains__(self, key) -> bool:
+        """Return if this row has the field key."""
+        return key in self._recordset.positions
+
+    def __iter__(self) -> Iterator:
+        """Iterate over the field names."""
+        return iter(self._recordset.headings)
+
+    def __len__(self) -> int:
+        """Return the number of fields."""
+        return len(self._recordset.headings)
+
+    def __repr__(self) -> str:
+        """Represent the row as a dict of its fields."""
+        return repr(dict(self))
+
+    def __reduce__(self) -> tuple:
+        """Pickle the row as a dict of its fields, rather than with its whole RecordSet."""
+        return (dict, (dict(self),))
 
 
 class Record:
@@ -51,6 +131,79 @@ class Record:
         return bool(self.data)
 
 
+class Context(Mapping):
+    """
+    Represents the data used to render a document, built up in read only layers.
+
+    Merging a source's data adds a layer in front of the existing context rather than
+    copying every key from earlier sources, so contexts from the same expansion share
+    their parent layers and each only stores the keys its own source added. Lookups
+    fall through the layers from newest to oldest, so a later source overrides an
+    earlier one as dict.update would.
+    """
+
+    __slots__ = ("layer", "parent")
+
+    def __init__(self, layer: Optional[Mapping] = None, parent: Optional["Context"] = None):
+        """Create a context from a layer of data on top of an optional parent."""
+        self.layer = layer if layer is not None else {}
+        self.parent = parent
+
+    def merge(self, data: Mapping) -> "Context":
+        """Return a new context with data layered on top of this one."""
+        return Context(layer=data, parent=self)
+
+    def layers(self) -> list[Mapping]:
+        """Return the layers from oldest to newest."""
+        layers = []
+        context: Optional[Context] = self
+        while context is not None:
+            layers.append(context.layer)
+            context = context.parent
+
+        return layers[::-1]
+
+    def to_dict(self) -> dict:
+        """Return a flattened copy of this context as a plain dict."""
+        flattened = {}
+        for layer in self.layers():
+            flattened.update(layer)
+
+        return flattened
+
+    def __getitem__(self, key) -> Any:
+        """Return the value of key from the newest layer that has it."""
+        context: Optional[Context] = self
+        while context is not None:
+            if key in context.layer:
+                return context.layer[key]
+            context = context.parent
+
+        raise KeyError(key)
+
+    def __contains__(self, key) -> bool:
+        """Return if any layer has key."""
+        context: Optional[Context] = self
+        while context is not None:
+            if key in context.layer:
+                return True
+            context = context.parent
+
+        return False
+
+    def __iter__(self) -> Iterator:
+        """Iterate over the keys in the order they were first added."""
+        return iter(self.to_dict())
+
+    def __len__(self) -> int:
+        """Return the number of distinct keys."""
+        return len(self.to_dict())
+
+    def __repr__(self) -> str:
+        """Represent the context as its flattened data."""
+        return f"Context({self.to_dict()!r})"
+
+
 # class RecordScalar:
 #     """
 #     Represents a data container with 1 field and only a single row.
@@ -134,10 +134,19 @@ class DatabaseManager:
     #     """Return a Storage Service."""
     #     return StorageService(instance_repo=self.storage_instances, type_repo=self.storage_types)
 
-    def commit(self):
-        """Commit the current session's transaction."""
+    def commit(self, expire: bool = True):
+        """
+        Commit the current session's transaction.
+
+        expire: expire the session's objects, so they are loaded again when next read. Not
+        expiring them lets other threads keep reading objects already loaded.
+        """
         if self._session:
-            self._session.commit()
+            self._session.expire_on_commit = expire
+            try:
+                self._session.commit()
+            finally:
+                self._session.expire_on_commit = True
 
     def rollback(self):
         """Roll back the current session's transaction."""
@@ -4,7 +4,7 @@ import datetime
 from typing import Optional, Sequence
 
 from loguru import logger
-from sqlalchemy import or_, select, update
+from sqlalchemy import insert, or_, select, update
 from sqlalchemy.orm import Session
 
 from .tables import (
@@ -20,6 +20,7 @@ from .tables import (
     Outcome,
     OutcomeInstance,
     OutcomeType,
+    ParquetSource,
     Source,
     SourceInstance,
     SourceType,
@@ -261,6 +262,7 @@ class SourceTypeRepository(Repository):
             SourceType(Name="Database", IsSlow=0, IsFile=0, IsMulti=0),
             SourceType(Name="CSV", IsSlow=0, IsFile=1, IsMulti=0),
             SourceType(Name="Excel", IsSlow=0, IsFile=1, IsMulti=0),
+            SourceType(Name="Parquet", IsSlow=0, IsFile=1, IsMulti=0),
             SourceType(Name="LLM", IsSlow=0, IsFile=0, IsMulti=0),
         ]
         source_types_to_add = []
@@ -601,6 +603,34 @@ class SourceRepository(Repository):
         self.session.flush()
         return source
 
+    def add_parquet(
+        self,
+        workflow_id: int,
+        source_type: SourceType,
+        step: int,
+        is_splitter: bool,
+        file_template_id: Optional[int] = None,
+        field_name: Optional[str] = None,
+        columns: Optional[str] = None,
+        filters: Optional[str] = None,
+        name: Optional[str] = None,
+    ) -> ParquetSource:
+        """Add a ParquetSource."""
+        source = ParquetSource(
+            WorkflowId=workflow_id,
+            TypeId=source_type.Id,
+            FileTemplateId=file_template_id,
+            Step=step,
+            Name=name,
+            IsSplitter=is_splitter,
+            FieldName=field_name if not is_splitter else None,
+            Columns=columns,
+            Filters=filters,
+        )
+        self.session.add(source)
+        self.session.flush()
+        return source
+
     def add_database(
         self,
         workflow_id: int,
@@ -636,6 +666,7 @@ class SourceRepository(Repository):
         llm_prompt_template: Optional[str] = None,
         llm_system_prompt: Optional[str] = None,
         name: Optional[str] = None,
+        bypass_cache: bool = False,
     ) -> LLMSource:
         """Add an LLMSource."""
         source = LLMSource(
@@ -646,6 +677,7 @@ class SourceRepository(Repository):
             llm=llm,
             LLMPromptTemplate=llm_prompt_template,
             LLMSystemPrompt=llm_system_prompt,
+            BypassCache=bypass_cache,
         )
         self.session.add(source)
         self.session.flush()
@@ -782,6 +814,30 @@ class SourceRepository(Repository):
         self.session.flush()
         return source
 
+    def update_parquet(
+        self,
+        source_id: int,
+        step: int,
+        is_splitter: bool,
+        file_template_id: Optional[int] = None,
+        field_name: Optional[str] = None,
+        columns: Optional[str] = None,
+        filters: Optional[str] = None,
+        name: Optional[str] = None,
+    ) -> ParquetSource:
+        """Update a ParquetSource."""
+        source = self.get(source_id=source_id)
+        assert isinstance(source, ParquetSource)
+        source.Step = step
+        source.Name = name
+        source.FileTemplateId = file_template_id
+        source.IsSplitter = is_splitter
+        source.FieldName = field_name if not is_splitter else None
+        source.Columns = columns
+        source.Filters = filters
+        self.session.flush()
+        return source
+
     def update_database(
         self,
         source_id: int,
@@ -811,6 +867,7 @@ class SourceRepository(Repository):
         llm_prompt_template: Optional[str] = None,
         llm_system_prompt: Optional[str] = None,
         name: Optional[str] = None,
+        bypass_cache: bool = False,
     ) -> LLMSource:
         """Update an LLMSource."""
         source = self.get(source_id=source_id)
@@ -819,6 +876,7 @@ class SourceRepository(Repository):
         source.LLM = llm
         source.LLMPromptTemplate = llm_prompt_template
         source.LLMSystemPrompt = llm_system_prompt
+        source.BypassCache = bypass_cache
         self.session.flush()
         return source
 
@@ -932,9 +990,18 @@ class SourceInstanceRepository(Repository):
         self.session.flush()
         return source_instance
 
-    def set_loaded(self, source_instance_id: int) -> None:
-        """Set a given SourceInstance as 'loaded'."""
-        stmt = update(SourceInstance).where(SourceInstance.Id == source_instance_id).values(Status="Loaded")
+    def set_loaded(
+        self,
+        source_instance_id: int,
+        cache_hits: Optional[int] = None,
+        cache_misses: Optional[int] = None,
+    ) -> None:
+        """Set a given SourceInstance as 'loaded', with its cache hits and misses if cached."""
+        stmt = (
+            update(SourceInstance)
+            .where(SourceInstance.Id == source_instance_id)
+            .values(Status="Loaded", CacheHits=cache_hits, CacheMisses=cache_misses)
+        )
         self.session.execute(stmt)
 
 
@@ -957,14 +1024,26 @@ class OutcomeInstanceRepository(Repository):
         self.session.flush()
         return outcome_instance
 
-    def set_complete(self, outcome_instance_id: int) -> None:
-        """Set a given OutcomeInstance as 'loaded'."""
-        stmt = update(OutcomeInstance).where(OutcomeInstance.Id == outcome_instance_id).values(Status="Complete")
-        self.session.execute(stmt)
+    def add_all(self, outcome_ids: list[int], instance_id: int) -> Sequence[OutcomeInstance]:
+        """
+        Add an Outcome Instance for each outcome Id with a multi-row insert.
 
-    def set_rendered_name(self, outcome_instance_id: int, rendered_name: str) -> None:
-        """Set the RenderedName of a given OutcomeInstance."""
-        stmt = (
-            update(OutcomeInstance).where(OutcomeInstance.Id == outcome_instance_id).values(RenderedName=rendered_name)
-        )
-        self.session.execute(stmt)
+        The returned Outcome Instances are in the same order as outcome_ids.
+        """
+        if not outcome_ids:
+            return []
+
+        stmt = insert(OutcomeInstance).returning(OutcomeInstance, sort_by_parameter_order=True)
+        rows = [{"OutcomeId": outcome_id, "InstanceId": instance_id, "Status": "Ongoing"} for outcome_id in outcome_ids]
+        return self.session.scalars(stmt, rows).all()
+
+    def set_complete_many(self, rendered_names: dict[int, str]) -> None:
+        """Set many OutcomeInstances as 'Complete' along with their RenderedName, keyed by Id."""
+        if not rendered_names:
+            return
+
+        rows = [
+            {"Id": outcome_instance_id, "Status": "Complete", "RenderedName": rendered_name}
+            for outcome_instance_id, rendered_name in rendered_names.items()
+        ]
+        self.session.execute(update(OutcomeInstance), rows)
@@ -326,7 +326,7 @@ class Source(Base):
     file_template: Mapped[Optional["FileTemplate"]] = relationship("FileTemplate", back_populates="source")
 
     # polymorphic discrimination
-    discriminator: Mapped[str] = mapped_column(String(50))  # options are excel, csv, database, llm
+    discriminator: Mapped[str] = mapped_column(String(50))  # options are excel, csv, parquet, database, llm
     __mapper_args__ = {"polymorphic_on": "discriminator", "polymorphic_identity": "base"}
 
     # relationships
@@ -357,6 +357,21 @@ class ExcelSource(Source, MultiRecordMixin):
     __mapper_args__ = {"polymorphic_identity": "excel"}
 
 
+class ParquetSource(Source, MultiRecordMixin):
+    """Parquet Source."""
+
+    __tablename__ = "SourceParquet"
+
+    Id: Mapped[int] = mapped_column(ForeignKey("Source.Id"), primary_key=True)
+
+    # comma separated columns to read, all columns if empty.
+    Columns: Mapped[str] = mapped_column(Text, nullable=True)
+    # one "column operator value" condition per line, all of which a row must meet.
+    Filters: Mapped[str] = mapped_column(Text, nullable=True)
+
+    __mapper_args__ = {"polymorphic_identity": "parquet"}
+
+
 class DatabaseSource(Source, MultiRecordMixin):
     """Database Source."""
 
@@ -385,6 +400,9 @@ class LLMSource(Source):
 
     FieldName: Mapped[str] = mapped_column(Text, nullable=False, default="llm_output")
 
+    # always call the LLM rather than using a cached response.
+    BypassCache: Mapped[bool] = mapped_column(nullable=False, default=False)
+
     __mapper_args__ = {"polymorphic_identity": "llm"}
 
     llm: Mapped["LLM"] = relationship("LLM", back_populates="sources")
@@ -442,6 +460,10 @@ class SourceInstance(Base):
 
     Status: Mapped[str] = mapped_column(Text, nullable=False, default="Ongoing")
 
+    # responses served from and missing from the LLM response cache, for cached sources.
+    CacheHits: Mapped[int] = mapped_column(nullable=True)
+    CacheMisses: Mapped[int] = mapped_column(nullable=True)
+
 
 class OutcomeInstance(Base):
     """Represents an instance of an Outcome."""
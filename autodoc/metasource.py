@@ -1,21 +1,108 @@
 """Define metasources, such as MetaDatabase, for user supplied database objects."""
 
-from sqlalchemy import VARCHAR, bindparam, create_engine, text
+import atexit
+import threading
+from typing import Iterator
 
+import regex as re
+from sqlalchemy import VARCHAR, Engine, bindparam, create_engine, make_url, text
+from sqlalchemy.exc import DBAPIError
+
+from autodoc.config import META_DB_MAX_OVERFLOW, META_DB_POOL_RECYCLE, META_DB_POOL_SIZE
 from autodoc.containers import Record, RecordSet
 from autodoc.data.tables import DatabaseMetaSource
 
 from loguru import logger
 
 
+# the column that tags which parameter set each row of a batched query belongs to.
+BATCH_INDEX = "autodoc_batch_index"
+
+# an ORDER BY isn't kept by a query once it is wrapped in a derived table, so these aren't batched.
+ORDER_BY = re.compile(r"\border\s+by\b", re.IGNORECASE)
+
+
+class EngineRegistry:
+    """
+    A process wide store of engines for user supplied databases, keyed by database Id.
+
+    Creating an engine per source service meant a new connection pool for every check
+    and load. Instead each database gets one pooled engine that is shared by every
+    workflow this process runs. The connection string is stored with the engine, so if
+    it has been edited since, the old engine is disposed and a new one created.
+    """
+
+    def __init__(self):
+        """Create an empty registry."""
+        self.engines: dict[int, tuple[str, Engine]] = {}
+        self.lock = threading.Lock()
+
+    def get(self, database: DatabaseMetaSource) -> Engine:
+        """Return the engine for database, creating it if new or its connection string changed."""
+        connection_string = database.ConnectionString
+
+        with self.lock:
+            existing = self.engines.get(database.Id)
+            if existing and existing[0] == connection_string:
+                return existing[1]
+
+            if existing:
+                logger.info(f"Connection string of database {database.Id} changed, replacing engine")
+                existing[1].dispose()
+
+            logger.info(f"Creating engine for database {database.Id}")
+            engine = create_pooled_engine(connection_string)
+            self.engines[database.Id] = (connection_string, engine)
+
+            return engine
+
+    def invalidate(self, database_id: int):
+        """Dispose of the engine for a database, so it is recreated on next use."""
+        with self.lock:
+            existing = self.engines.pop(database_id, None)
+
+        if existing:
+            existing[1].dispose()
+
+    def dispose_all(self):
+        """Dispose of every engine."""
+        with self.lock:
+            engines = [engine for _, engine in self.engines.values()]
+            self.engines = {}
+
+        for engine in engines:
+            engine.dispose()
+
+
+def create_pooled_engine(connection_string: str) -> Engine:
+    """
+    Create an engine that checks connections before use and recycles idle ones.
+
+    SQLite doesn't use a sized pool, so the pool size settings are only applied to
+    server databases.
+    """
+    options: dict = {"pool_pre_ping": True, "pool_recycle": META_DB_POOL_RECYCLE}
+
+    if make_url(connection_string).get_backend_name() != "sqlite":
+        options["pool_size"] = META_DB_POOL_SIZE
+        options["max_overflow"] = META_DB_MAX_OVERFLOW
+
+    return create_engine(connection_string, **options)
+
+
+engine_registry = EngineRegistry()
+# close the pooled connections cleanly when the process exits, rather than leaving the
+# database to time them out.
+atexit.register(engine_registry.dispose_all)
+
+
 class MetaDatabase:
     """A User supplied database."""
 
     def __init__(self, database: DatabaseMetaSource):
         """Initialise a metadatabase from details in the MetaDatabaseSource table."""
         self.database = database
-        logger.info(f"Creating engine with {self.database.ConnectionString}")
-        self.engine = create_engine(self.database.ConnectionString)
+        self.engine = engine_registry.get(database)
 
     def check_connection(self) -> bool:
         """Check if a connection to the database can be established."""
@@ -37,6 +124,89 @@ class MetaDatabase:
         headings, data = self.get_data(sql, params)
         return RecordSet(headings, data)
 
+    def recordsets(
+        self, sql: str, param_sets: list[dict], batch_size: int = 50
+    ) -> list[RecordSet]:
+        """
+        Create a recordset for each of param_sets, in order, over a single connection.
+
+        Up to batch_size parameter sets are run as one UNION ALL query, each copy of sql
+        tagged with its position so the rows can be split back out. If sql orders its
+        rows, or the database can't run it as a subquery, each parameter set is run on
+        its own instead, so the rows keep the order sql gives them.
+        """
+        recordsets: list[RecordSet] = []
+        batchable = not ORDER_BY.search(sql)
+
+        with self.engine.connect() as connection:
+            for start in range(0, len(param_sets), max(batch_size, 1)):
+                chunk = param_sets[start : start + max(batch_size, 1)]
+
+                if batchable and len(chunk) > 1:
+                    try:
+                        recordsets.extend(self.get_batched_recordsets(connection, sql, chunk))
+                        continue
+                    except DBAPIError as e:
+                        logger.warning(f"Batched query failed, running each separately: {e}")
+                        connection.rollback()
+
+                for params in chunk:
+                    result = connection.execute(bind_sql(sql, params))
+                    recordsets.append(RecordSet(list(result.keys()), result.fetchall()))
+
+            connection.commit()
+
+        return recordsets
+
+    @staticmethod
+    def get_batched_recordsets(connection, sql: str, param_sets: list[dict]) -> list[RecordSet]:
+        """Run sql once for every parameter set in a single query, and split the results."""
+        subquery = sql.strip().rstrip(";")
+        parts = []
+        params = {}
+
+        for index, param_set in enumerate(param_sets):
+            renamed = subquery
+            for key, value in param_set.items():
+                batch_key = f"{key}__{index}"
+                renamed = re.sub(rf"(?<=[\s\(]:){re.escape(key)}\b", batch_key, renamed)
+                params[batch_key] = value
+
+            parts.append(f"SELECT {index} AS {BATCH_INDEX}, b.* FROM ({renamed}) b")
+
+        batched_sql = "\nUNION ALL\n".join(parts)
+        result = connection.execute(bind_sql(batched_sql, params))
+        headings = list(result.keys())[1:]
+
+        rows: list[list] = [[] for _ in param_sets]
+        for row in result:
+            rows[row[0]].append(row[1:])
+
+        return [RecordSet(headings, data) for data in rows]
+
+    def iter_records(
+        self, sql: str, params: dict | None = None, yield_per: int = 1000
+    ) -> Iterator[dict]:
+        """
+        Yield the rows of a query one record at a time, without buffering the result.
+
+        A server side cursor is used where the database supports one, fetching yield_per
+        rows at a time, so memory stays flat however many rows there are. The connection
+        is held until the iterator is exhausted or closed.
+        """
+        bound_sql = bind_sql(sql, params)
+
+        with self.engine.connect() as connection:
+            result = connection.execution_options(
+                stream_results=True, yield_per=yield_per
+            ).execute(bound_sql)
+            headings = list(result.keys())
+
+            for row in result:
+                yield dict(zip(headings, row, strict=False))
+
+            connection.commit()
+
     def record(self, sql: str, params: dict | None = None) -> Record:
         """Create a recordset."""
         headings, data = self.get_data(sql, params)
@@ -70,18 +240,13 @@ class MetaDatabase:
         # bind the named parameters.
         bound_sql = bind_sql(sql, params)
 
-        # start the connection.
-        connection = self.engine.connect()
-        transaction = connection.begin()
-
-        # get the results from the query.
-        result = connection.execute(bound_sql)
-        data = result.fetchall()
-        headings = list(result.keys())
+        # check out a pooled connection, which is returned to the pool even on error.
+        with self.engine.connect() as connection:
+            result = connection.execute(bound_sql)
+            data = result.fetchall()
+            headings = list(result.keys())
 
-        # commit and close the connection
-        transaction.commit()
-        connection.close()
+            connection.commit()
 
         return headings, data
 
@@ -6,6 +6,7 @@ from typing import Optional, Tuple
 import requests
 from docx.shared import Cm, Inches, Length, Mm
 from docxtpl import DocxTemplate, InlineImage
+from jinja2 import Environment
 from loguru import logger
 from PIL import Image, ImageOps
 
@@ -13,9 +14,10 @@ from PIL import Image, ImageOps
 class DocxTemplateService:
     """Define a Template rendering service, that allows for self referential inline images."""
 
-    def __init__(self, document: DocxTemplate):
-        """Initialise with the document template."""
+    def __init__(self, document: DocxTemplate, jinja_env: Optional[Environment] = None):
+        """Initialise with the document template and optionally the environment to compile it with."""
         self.document = document
+        self.jinja_env = jinja_env
 
     def render(self, data: dict) -> None:
         """Render the given data to the document."""
@@ -66,10 +68,12 @@ class DocxTemplateService:
             width, height = get_width_and_height(**kwargs)
             return InlineImage(self.document, image_stream, width=width, height=height)
 
-        data["_image_file"] = fetch_inline_image_file
-        data["_image_url"] = fetch_inline_image_url
+        # flatten the context once here, as it is rendered once per document part.
+        context = dict(data)
+        context["_image_file"] = fetch_inline_image_file
+        context["_image_url"] = fetch_inline_image_url
 
-        self.document.render(data)
+        self.document.render(context, jinja_env=self.jinja_env)
 
 
 PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
@@ -0,0 +1,255 @@
+"""Convert Word documents to PDF with headless LibreOffice."""
+
+import atexit
+import http.client
+import queue
+import shlex
+import shutil
+import socket
+import subprocess
+import tempfile
+import threading
+import time
+import xmlrpc.client
+from pathlib import Path
+from typing import Optional
+
+from loguru import logger
+
+from autodoc.config import LIBREOFFICE_SERVERS, LIBREOFFICE_TIMEOUT, UNOSERVER_COMMAND
+
+WORD_FILTER = "MS Word 2007 XML"
+
+
+def convert_with_subprocess(path: Path, outdir: Path) -> None:
+    """
+    Convert a file to pdf with a one-off headless LibreOffice.
+
+    This is the fallback when no conversion server is available, so it pays the
+    LibreOffice startup cost for each file. The pdf is named after path, with a .pdf suffix.
+    """
+    command = [
+        "libreoffice",
+        "--headless",
+        f"--infilter='{WORD_FILTER}'",
+        "--convert-to",
+        "pdf",
+        str(path),
+        "--outdir",
+        str(outdir),
+    ]
+    logger.info(f"running headless libreoffice command: {command}")
+
+    subprocess.run(command)
+
+
+def find_free_port() -> int:
+    """Return a local port that is currently free to bind."""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class TimeoutTransport(xmlrpc.client.Transport):
+    """An xmlrpc Transport whose connections time out, so a wedged server can be detected."""
+
+    def __init__(self, timeout: float):
+        """Create the transport with a timeout in seconds."""
+        super().__init__()
+        self.timeout = timeout
+
+    def make_connection(self, host) -> http.client.HTTPConnection:
+        """Create the connection with the timeout applied."""
+        connection = super().make_connection(host)
+        connection.timeout = self.timeout
+        return connection
+
+
+class ConversionServer:
+    """
+    A long lived headless LibreOffice, run by unoserver and bound to local ports.
+
+    Each server has its own LibreOffice profile so that several can run side by side.
+    """
+
+    def __init__(self, command: str = UNOSERVER_COMMAND, timeout: float = LIBREOFFICE_TIMEOUT):
+        """Create a server that is started with start()."""
+        self.command = command
+        self.timeout = timeout
+
+        self.process: Optional[subprocess.Popen] = None
+        self.port: Optional[int] = None
+        self.profile_dir: Optional[str] = None
+
+    def proxy(self, timeout: Optional[float] = None) -> xmlrpc.client.ServerProxy:
+        """Return an xmlrpc proxy to this server."""
+        transport = TimeoutTransport(timeout=timeout or self.timeout)
+        return xmlrpc.client.ServerProxy(
+            f"http://127.0.0.1:{self.port}", transport=transport, allow_none=True
+        )
+
+    def start(self, startup_timeout: float = 60):
+        """Start LibreOffice and wait until it accepts conversions."""
+        self.port = find_free_port()
+        uno_port = find_free_port()
+        self.profile_dir = tempfile.mkdtemp(prefix="autodoc-libreoffice-")
+
+        command = [
+            *shlex.split(self.command),
+            "--interface",
+            "127.0.0.1",
+            "--port",
+            str(self.port),
+            "--uno-port",
+            str(uno_port),
+            "--user-installation",
+            Path(self.profile_dir).as_uri(),
+        ]
+        logger.info(f"Starting LibreOffice conversion server: {command}")
+        self.process = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+        deadline = time.monotonic() + startup_timeout
+        while time.monotonic() < deadline:
+            if self.is_healthy():
+                return
+            time.sleep(0.5)
+
+        self.stop()
+        raise RuntimeError(f"LibreOffice conversion server did not start within {startup_timeout}s")
+
+    def is_healthy(self) -> bool:
+        """Return if the server process is running and answering requests."""
+        if not self.process or self.process.poll() is not None:
+            return False
+
+        try:
+            self.proxy(timeout=5).info()
+            return True
+        except (OSError, xmlrpc.client.Error):
+            return False
+
+    def convert(self, in_path: Path, out_path: Path) -> None:
+        """Convert the Word document at in_path to a pdf at out_path."""
+        self.proxy().convert(str(in_path), None, str(out_path), "pdf", None, [], True, WORD_FILTER)
+
+    def stop(self):
+        """Stop LibreOffice and remove its profile."""
+        if self.process and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+                self.process.wait()
+
+        if self.profile_dir:
+            shutil.rmtree(self.profile_dir, ignore_errors=True)
+
+        self.process = None
+        self.profile_dir = None
+
+    def restart(self):
+        """Replace a wedged or dead server with a fresh one."""
+        logger.warning(f"Restarting LibreOffice conversion server on port {self.port}")
+        self.stop()
+        self.start()
+
+
+class ConversionServerPool:
+    """
+    A pool of ConversionServers shared by everything converting in this process.
+
+    Servers are started on first use. A server is health checked as it is handed out
+    and restarted if it has died, and a conversion that fails with a connection error
+    or timeout restarts the server and is retried once.
+    """
+
+    def __init__(self, size: int, server_class=ConversionServer):
+        """Create a pool of size servers."""
+        self.size = size
+        self.server_class = server_class
+
+        self.servers: list = []
+        self.idle: queue.Queue = queue.Queue()
+        self.lock = threading.Lock()
+
+    def start(self):
+        """Start the servers if they haven't been started yet."""
+        with self.lock:
+            if self.servers:
+                return
+
+            for _ in range(self.size):
+                server = self.server_class()
+                server.start()
+                self.servers.append(server)
+                self.idle.put(server)
+
+    def convert(self, in_path: Path, out_path: Path) -> None:
+        """Convert a Word document to pdf on the next free server."""
+        self.start()
+        server = self.idle.get()
+
+        try:
+            if not server.is_healthy():
+                server.restart()
+
+            try:
+                server.convert(in_path, out_path)
+            except OSError as e:
+                logger.warning(f"Conversion of {in_path} failed with {e!r}, retrying")
+                server.restart()
+                server.convert(in_path, out_path)
+        finally:
+            self.idle.put(server)
+
+    def close(self):
+        """Stop all servers."""
+        with self.lock:
+            for server in self.servers:
+                server.stop()
+
+            self.servers = []
+            self.idle = queue.Queue()
+
+
+_pool: Optional[ConversionServerPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> Optional[ConversionServerPool]:
+    """Return this process's conversion server pool, or None if servers are disabled."""
+    global _pool
+
+    if LIBREOFFICE_SERVERS < 1:
+        return None
+
+    with _pool_lock:
+        if _pool is None:
+            _pool = ConversionServerPool(size=LIBREOFFICE_SERVERS)
+            atexit.register(_pool.close)
+
+    return _pool
+
+
+def convert_to_pdf(path: Path) -> Path:
+    """
+    Convert the Word document at path to a pdf alongside it and return the pdf path.
+
+    The pdf is named path + ".pdf". Conversion goes through the conversion server pool
+    when LIBREOFFICE_SERVERS is set, otherwise a one-off LibreOffice is started.
+    """
+    pdf_path = path.with_name(path.name + ".pdf")
+    pool = get_pool()
+
+    if pool:
+        pool.convert(path, pdf_path)
+    else:
+        # libreoffice replaces the suffix rather than appending to it.
+        convert_with_subprocess(path, outdir=path.parent)
+        converted = path.with_suffix(".pdf")
+        if converted != pdf_path and converted.exists():
+            converted.rename(pdf_path)
+
+    return pdf_path
+
@@ -2,10 +2,13 @@
 
 from abc import ABC, abstractmethod
 from pathlib import Path
+from typing import Hashable, Optional
 
-from autodoc.storage_service import StorageService, get_storage_service
+from autodoc.storage_service import LinuxStorageService, StorageService, get_storage_service
 from autodoc.data.tables import Outcome
 
+from .template_fields import combine, path_fields
+
 
 class OutcomeService(ABC):
     """Service layer for an Outcome."""
@@ -52,6 +55,72 @@ class OutcomeService(ABC):
         # if self.output_storage_service:
         #     self.template_path = self.output_storage_service.get_file()
 
+    @staticmethod
+    def template_source(
+        outcome: Outcome, template_uploaded_filename: Optional[str]
+    ) -> tuple[Hashable, Optional[StorageService]]:
+        """Return the template cache key and storage service of the outcome's input template."""
+        if template_uploaded_filename:
+            return template_uploaded_filename, LinuxStorageService(
+                root=".", relative=template_uploaded_filename
+            )
+
+        template = outcome.input_file_template
+        if not template or template.is_download:
+            return outcome.InputFileTemplateId, None
+
+        return outcome.InputFileTemplateId, get_storage_service(file_template=template)
+
+    @classmethod
+    def template_fields(
+        cls, outcome: Outcome, template_uploaded_filename: Optional[str] = None
+    ) -> Optional[frozenset[str]]:
+        """Return the context fields the outcome's template reads, or None if it may read any."""
+        return None
+
+    @classmethod
+    def required_fields(
+        cls, outcome: Outcome, template_uploaded_filename: Optional[str] = None
+    ) -> Optional[frozenset[str]]:
+        """Return the context fields the template and output path read, or None if unknown."""
+        return combine(
+            [cls.template_fields(outcome, template_uploaded_filename), path_fields(outcome)]
+        )
+
+    def reset(self) -> None:
+        """
+        Clear the state of the document last rendered, ready to render the next.
+
+        A service is created once per outcome per run and renders every document of
+        it, so only per document state is reset; templates and storage clients are kept.
+        """
+        if self.output_storage_service:
+            self.output_storage_service.reset()
+
+    def flush(self) -> None:
+        """Wait for the documents saved to finish saving, such as uploads in the background."""
+        if self.output_storage_service:
+            self.output_storage_service.flush()
+
+    def pending_saves(self) -> int:
+        """Return the number of documents from the oldest still saving, raising if one failed."""
+        if not self.output_storage_service:
+            return 0
+
+        return self.output_storage_service.pending_saves()
+
+    def save_copy(self, data: dict, source: Path) -> None:
+        """Save a copy of a document already rendered to source, at the output path for data."""
+        self.output_storage_service.render(data=data)
+        self.output_storage_service.save_copy(source)
+
+    def saved_file(self) -> Optional[Path]:
+        """Return a local file holding the document last saved, if one is kept."""
+        if not self.output_storage_service:
+            return None
+
+        return self.output_storage_service.local_copy()
+
     @abstractmethod
     def render(self, data: dict) -> None:
         """Render the outcome with the given data."""
@@ -1,6 +1,5 @@
 """Outcome for creating PDF Files."""
 
-import subprocess
 from pathlib import Path
 from typing import Optional
 
@@ -11,6 +10,8 @@ from autodoc.data.tables import Outcome
 from autodoc.outcome.outcome import OutcomeService
 from autodoc.storage_service import LinuxStorageService
 from .docx_service import DocxTemplateService
+from .libreoffice import convert_to_pdf
+from .template_cache import DocxTemplateEntry, template_cache
 
 
 class PDFOutcomeService(OutcomeService):
@@ -18,7 +19,8 @@ class PDFOutcomeService(OutcomeService):
     PDF Outcome.
 
     Based almost completely on the Word Outcome, but at the end uses
-    libreoffice to convert to pdf.
+    libreoffice to convert to pdf, through long lived conversion servers if
+    they are configured.
     """
 
     is_combination = False
@@ -38,9 +40,11 @@ class PDFOutcomeService(OutcomeService):
             self.input_storage_service = LinuxStorageService(
                 root=".", relative=template_uploaded_filename
             )
+            self.template_key = template_uploaded_filename
 
         else:
             self.set_input_storage_service()
+            self.template_key = outcome.InputFileTemplateId
 
         if outcome.is_download:
             logger.info("using a download storage service.")
@@ -52,14 +56,41 @@ class PDFOutcomeService(OutcomeService):
         else:
             self.set_output_storage_service()
 
-        self.document = DocxTemplate(self.input_storage_service.get_file())
+        # loaded on the first render, then kept for every document of the run.
+        self.template: Optional[DocxTemplateEntry] = None
+        self.document: Optional[DocxTemplate] = None
+
+    @classmethod
+    def template_fields(
+        cls, outcome: Outcome, template_uploaded_filename: Optional[str] = None
+    ) -> Optional[frozenset[str]]:
+        """Return the context fields the template reads, or None if unknown."""
+        key, storage_service = cls.template_source(outcome, template_uploaded_filename)
+        if storage_service is None:
+            return None
+
+        template = template_cache.get_docx(key=key, storage_service=storage_service)
+        return template.fields
 
     def render(self, data: dict) -> None:
         """Render the given data to the document."""
-        document_service = DocxTemplateService(document=self.document)
+        if self.template is None:
+            self.template = template_cache.get_docx(
+                key=self.template_key, storage_service=self.input_storage_service
+            )
+
+        self.document = self.template.new_document()
+        document_service = DocxTemplateService(
+            document=self.document, jinja_env=self.template.jinja_env
+        )
         document_service.render(data)
         self.output_storage_service.render(data=data)
 
+    def reset(self) -> None:
+        """Clear the document last rendered, ready to render the next."""
+        super().reset()
+        self.document = None
+
     def save(self) -> None:
         """Save the document."""
         temp_file = self.output_storage_service.temp_file()  # docx file
@@ -67,20 +98,7 @@ class PDFOutcomeService(OutcomeService):
 
         self.document.save(temp_file)  # docx file
 
-        temp_file_parent = str(Path(temp_file).parent)
-
-        command = [
-            "libreoffice",
-            "--headless",
-            "--infilter='MS Word 2007 XML'",
-            "--convert-to",
-            "pdf",
-            temp_file,
-            "--outdir",
-            temp_file_parent,
-        ]
-        logger.info(f"running headless libreoffice command: {command}")
-
-        subprocess.run(command)
-        self.output_storage_service.temp_file_name += ".pdf"
+        pdf_path = convert_to_pdf(Path(temp_file))
+
+        self.output_storage_service.temp_file_name = str(pdf_path)
         self.output_storage_service.save_file()
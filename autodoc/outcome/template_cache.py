@@ -0,0 +1,157 @@
+"""Define a process wide cache of parsed and compiled outcome templates."""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from io import BytesIO
+from typing import Hashable, Optional
+
+from docxtpl import DocxTemplate
+from jinja2 import Environment, Template
+from jinja2.utils import LRUCache
+from loguru import logger
+
+from autodoc.config import TEMPLATE_CACHE_SIZE
+from autodoc.storage_service import StorageService
+
+from .template_fields import docx_fields, find_fields
+
+
+class CompilingEnvironment(Environment):
+    """
+    A jinja2 Environment that compiles each distinct template source only once.
+
+    docxtpl compiles the xml of every document part with from_string on every render,
+    which is most of the cost of rendering a Word document. The source of each part
+    is the same for every render of a template, so the compiled Template is reused.
+    """
+
+    def __init__(self, max_templates: int = 64):
+        """Create the environment with the default jinja2 settings used by docxtpl."""
+        super().__init__()
+        self.compiled = LRUCache(max_templates)
+
+    def from_string(self, source, globals=None, template_class=None) -> Template:
+        """Return the compiled template for source, compiling it on first use."""
+        if globals or template_class or not isinstance(source, str):
+            return super().from_string(source, globals=globals, template_class=template_class)
+
+        template = self.compiled.get(source)
+        if template is None:
+            template = super().from_string(source)
+            self.compiled[source] = template
+
+        return template
+
+
+class DocxTemplateEntry:
+    """A cached Word template: the raw bytes and an environment holding its compiled parts."""
+
+    def __init__(self, data: bytes):
+        """Create the entry from the bytes of a .docx file."""
+        self.data = data
+        self.jinja_env = CompilingEnvironment()
+        self._fields: Optional[frozenset[str]] = None
+        self._fields_found = False
+
+    @property
+    def fields(self) -> Optional[frozenset[str]]:
+        """Return the context fields the template reads, or None if they can't be found."""
+        if not self._fields_found:
+            self._fields = docx_fields(self.data, jinja_env=self.jinja_env)
+            self._fields_found = True
+
+        return self._fields
+
+    def new_document(self) -> DocxTemplate:
+        """Return a fresh DocxTemplate that can be rendered and saved independently."""
+        return DocxTemplate(BytesIO(self.data))
+
+
+class TemplateCache:
+    """
+    LRU cache of outcome templates, keyed by template and version.
+
+    The key is usually the FileTemplate Id (or the uploaded file path) and the version
+    comes from the storage service, such as an ETag or modification time, so a changed
+    template is picked up on the next run. If the storage service can't provide a
+    version, the content is fetched and hashed instead, which still saves parsing and
+    compiling it again.
+    """
+
+    def __init__(self, max_entries: int = TEMPLATE_CACHE_SIZE):
+        """Create an empty cache holding at most max_entries templates."""
+        self.max_entries = max_entries
+        self.entries: OrderedDict = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get_docx(self, key: Hashable, storage_service: StorageService) -> DocxTemplateEntry:
+        """Return the cached Word template for key, loading it if new or changed."""
+
+        def load(data: Optional[bytes]) -> DocxTemplateEntry:
+            return DocxTemplateEntry(data if data is not None else read_bytes(storage_service))
+
+        return self._get(("docx", key), storage_service, load)
+
+    def get_text(self, key: Hashable, storage_service: StorageService) -> Template:
+        """Return the compiled text template for key, loading it if new or changed."""
+
+        def load(data: Optional[bytes]) -> Template:
+            text = data.decode() if data is not None else storage_service.get_text()
+            return Template(text)
+
+        return self._get(("text", key), storage_service, load)
+
+    def get_text_fields(
+        self, key: Hashable, storage_service: StorageService
+    ) -> Optional[frozenset[str]]:
+        """Return the context fields the text template for key reads, or None if unknown."""
+
+        def load(data: Optional[bytes]) -> Optional[frozenset[str]]:
+            return find_fields(data.decode() if data is not None else storage_service.get_text())
+
+        return self._get(("text_fields", key), storage_service, load)
+
+    def clear(self):
+        """Remove all cached templates."""
+        with self.lock:
+            self.entries.clear()
+
+    def _get(self, key: tuple, storage_service: StorageService, load):
+        """Look up key at the storage service's current version, calling load on a miss."""
+        data = None
+        version = storage_service.get_version()
+        if version is None:
+            data = read_bytes(storage_service)
+            version = hashlib.sha256(data).hexdigest()
+
+        cache_key = (*key, version)
+
+        with self.lock:
+            if cache_key in self.entries:
+                self.entries.move_to_end(cache_key)
+                return self.entries[cache_key]
+
+        logger.info(f"Loading template {key} at version {version}")
+        entry = load(data)
+
+        with self.lock:
+            # drop older versions of the same template as well as the least recently used.
+            for existing in [k for k in self.entries if k[:-1] == key]:
+                del self.entries[existing]
+
+            self.entries[cache_key] = entry
+
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+        return entry
+
+
+def read_bytes(storage_service: StorageService) -> bytes:
+    """Read the raw bytes of the file behind a storage service."""
+    with open(storage_service.get_file(), "rb") as f:
+        return f.read()
+
+
+template_cache = TemplateCache()
@@ -0,0 +1,80 @@
+"""Find the context fields an outcome's templates read, so only those are passed to it."""
+
+import zipfile
+from io import BytesIO
+from typing import Iterable, Optional
+
+from docxtpl import DocxTemplate
+from jinja2 import Environment, TemplateSyntaxError, meta
+from loguru import logger
+
+from autodoc.data.tables import Outcome
+
+# the core properties docxtpl renders as templates, as well as the xml parts.
+DOCX_PROPERTIES = ("author", "comments", "identifier", "language", "subject", "title")
+
+# the functions docx_service adds to the context for inline images.
+DOCX_HELPERS = frozenset({"_image_file", "_image_url"})
+
+
+def find_fields(
+    text: Optional[str], jinja_env: Optional[Environment] = None
+) -> Optional[frozenset[str]]:
+    """Return the variables a jinja2 template reads, or None if it can't be parsed."""
+    try:
+        parsed = (jinja_env or Environment()).parse(text or "")
+        return frozenset(meta.find_undeclared_variables(parsed))
+    except TemplateSyntaxError as e:
+        logger.info(f"Can't find the fields of a template that doesn't parse: {e}")
+        return None
+
+
+def combine(fields: Iterable[Optional[frozenset[str]]]) -> Optional[frozenset[str]]:
+    """Return the union of fields, or None if any of them is unknown."""
+    combined: frozenset[str] = frozenset()
+    for field_set in fields:
+        if field_set is None:
+            return None
+        combined |= field_set
+
+    return combined
+
+
+def docx_fields(data: bytes, jinja_env: Optional[Environment] = None) -> Optional[frozenset[str]]:
+    """
+    Return the variables the xml parts and properties of a .docx template read.
+
+    Every part under word/ is read (the body, headers, footers and footnotes), after
+    docxtpl's own tags such as {%p ... %} are turned into plain jinja2.
+    """
+    document = DocxTemplate(BytesIO(data))
+    document.init_docx()
+
+    with zipfile.ZipFile(BytesIO(data)) as archive:
+        parts = [
+            document.patch_xml(archive.read(name).decode("utf-8"))
+            for name in archive.namelist()
+            if name.startswith("word/") and name.endswith(".xml")
+        ]
+
+    properties = [getattr(document.docx.core_properties, name) for name in DOCX_PROPERTIES]
+
+    fields = combine(find_fields(text, jinja_env) for text in parts + properties)
+    return fields - DOCX_HELPERS if fields is not None else None
+
+
+def path_fields(outcome: Outcome) -> Optional[frozenset[str]]:
+    """Return the variables the output path of outcome reads, its DownloadName or Location."""
+    if outcome.is_download:
+        return find_fields(outcome.DownloadName)
+
+    template = outcome.output_file_template
+    return combine([find_fields(template.Location), find_fields(template.get_root())])
+
+
+def project(context: dict, fields: Optional[frozenset[str]]) -> dict:
+    """Return only the fields of context an outcome reads, or all of it if they are unknown."""
+    if fields is None:
+        return context
+
+    return {field: context[field] for field in fields if field in context}
@@ -3,7 +3,6 @@
 from pathlib import Path
 from typing import Optional
 
-from jinja2 import Template
 from loguru import logger
 
 from autodoc.data.tables import Outcome
@@ -11,6 +10,8 @@ from autodoc.data.tables import Outcome
 from autodoc.outcome.outcome import OutcomeService
 from autodoc.storage_service import LinuxStorageService
 
+from .template_cache import template_cache
+
 
 class TextOutcomeService(OutcomeService):
     """Text Document Outcome Service."""
@@ -37,9 +38,11 @@ class TextOutcomeService(OutcomeService):
             self.input_storage_service = LinuxStorageService(
                 root=".", relative=template_uploaded_filename
             )
+            template_key = template_uploaded_filename
 
         else:
             self.set_input_storage_service()
+            template_key = outcome.InputFileTemplateId
 
         if outcome.is_download:
             logger.info("using a download storage service.")
@@ -51,7 +54,25 @@ class TextOutcomeService(OutcomeService):
         else:
             self.set_output_storage_service()
 
-        self.template = Template(self.input_storage_service.get_text())
+        self.template = template_cache.get_text(
+            key=template_key, storage_service=self.input_storage_service
+        )
+
+    @classmethod
+    def template_fields(
+        cls, outcome: Outcome, template_uploaded_filename: Optional[str] = None
+    ) -> Optional[frozenset[str]]:
+        """Return the context fields the template reads, or None if unknown."""
+        key, storage_service = cls.template_source(outcome, template_uploaded_filename)
+        if storage_service is None:
+            return None
+
+        return template_cache.get_text_fields(key=key, storage_service=storage_service)
+
+    def reset(self) -> None:
+        """Clear the text last rendered, ready to render the next."""
+        super().reset()
+        self.rendered_text = ""
 
     def render(self, data: dict) -> None:
         """Render the Text document using jinja2."""
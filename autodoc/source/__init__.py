@@ -2,6 +2,7 @@
 
 from .csv_source import CSVSourceService
 from .excel_source import ExcelSourceService
+from .parquet_source import ParquetSourceService
 from .source import SourceService as SourceService
 from .sql_source import DatabaseSourceService
 from .llm_source import LLMSourceService
@@ -10,5 +11,6 @@ source_service_map = {
     "Database": DatabaseSourceService,
     "CSV": CSVSourceService,
     "Excel": ExcelSourceService,
+    "Parquet": ParquetSourceService,
     "LLM": LLMSourceService,
 }
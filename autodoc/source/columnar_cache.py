@@ -0,0 +1,148 @@
+"""Define a cache of CSV and Excel sources as Arrow files, shared by every process on the host."""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Callable, Optional
+
+import pandas as pd
+import pyarrow as pa
+from loguru import logger
+from pyarrow import feather
+
+from autodoc.config import SOURCE_CACHE_DIR, SOURCE_CACHE_MAX_MB
+
+SUFFIX = ".arrow"
+
+
+def make_key(*parts) -> str:
+    """Return the cache key of a file at a version, read with the given options."""
+    return hashlib.sha256(json.dumps(parts, default=str).encode()).hexdigest()
+
+
+class ColumnarCache:
+    """
+    A directory of Arrow IPC files, each a parsed CSV or Excel source, evicted by least recent use.
+
+    Parsing a large workbook takes far longer than reading the same table back from an
+    uncompressed Arrow file, which is memory mapped rather than read. Files are keyed by
+    the source file's location and version (size and modification time, or ETag) and the
+    options it was read with, so a changed file is simply a new key. When the files grow
+    past max_bytes, the least recently read are removed until they fit again.
+    """
+
+    def __init__(self, directory: Path, max_bytes: int = SOURCE_CACHE_MAX_MB * 2**20):
+        """Use, or create, the cache directory."""
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def path(self, key: str) -> Path:
+        """Return the path of the Arrow file for key."""
+        return self.directory / f"{key}{SUFFIX}"
+
+    def get(self, key: str) -> Optional[pd.DataFrame]:
+        """Return the cached dataframe for key, or None if it isn't cached."""
+        path = self.path(key)
+
+        try:
+            table = feather.read_table(path, memory_map=True)
+            # the modification time records when it was last used, for eviction.
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        except (OSError, pa.ArrowException) as e:
+            logger.warning(f"Ignoring unreadable source cache file {path}: {e}")
+            return None
+
+        return table.to_pandas()
+
+    def put(self, key: str, dataframe: pd.DataFrame) -> bool:
+        """
+        Store dataframe for key, evicting the least recently used if over size.
+
+        Dataframes Arrow can't represent the same, such as columns of mixed types or
+        headings that aren't text, aren't cached. Returns if it was stored.
+        """
+        if not all(isinstance(column, str) for column in dataframe.columns):
+            return False
+
+        # written to a temporary file first, so other processes never read half a file.
+        with tempfile.NamedTemporaryFile(dir=self.directory, suffix=".tmp", delete=False) as temp_file:
+            temp_path = Path(temp_file.name)
+
+        try:
+            feather.write_feather(dataframe, temp_path, compression="uncompressed")
+            os.replace(temp_path, self.path(key))
+        except (pa.ArrowException, TypeError, ValueError) as e:
+            logger.info(f"Not caching source with columns Arrow can't store: {e}")
+            temp_path.unlink(missing_ok=True)
+            return False
+
+        with self.lock:
+            self.evict()
+
+        return True
+
+    def evict(self):
+        """Remove the least recently used files until the cache is under max_bytes."""
+        files = []
+        for path in self.directory.glob(f"*{SUFFIX}"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in files)
+
+        for _, size, path in sorted(files):
+            if total <= self.max_bytes:
+                break
+
+            path.unlink(missing_ok=True)
+            total -= size
+
+    def clear(self):
+        """Remove every cached file."""
+        for path in self.directory.glob(f"*{SUFFIX}"):
+            path.unlink(missing_ok=True)
+
+    def read(self, key: str, read: Callable[[], pd.DataFrame]) -> pd.DataFrame:
+        """Return the dataframe for key, calling read and caching its result on a miss."""
+        dataframe = self.get(key)
+
+        if dataframe is None:
+            dataframe = read()
+            self.put(key, dataframe)
+        else:
+            logger.info(f"Read source from cache {self.path(key)}")
+
+        return dataframe
+
+
+_cache: Optional[ColumnarCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_source_cache() -> Optional[ColumnarCache]:
+    """Return this process's source cache, or None if it is disabled or can't be created."""
+    global _cache
+
+    if not SOURCE_CACHE_DIR:
+        return None
+
+    with _cache_lock:
+        if _cache is None:
+            try:
+                _cache = ColumnarCache(directory=Path(SOURCE_CACHE_DIR))
+            except OSError as e:
+                logger.warning(f"Source cache at {SOURCE_CACHE_DIR} is unavailable: {e}")
+                return None
+
+    return _cache
@@ -20,6 +20,7 @@ class ExcelSourceService(SourceService):
     """
 
     is_multi_record = True
+    context_fields = frozenset()
 
     def __init__(self, source: Source, uploaded_filename=None) -> None:
         """
@@ -30,16 +31,17 @@ class ExcelSourceService(SourceService):
         self.data = []
         self.source = source
         if uploaded_filename:
-            self.file_access = LinuxStorageService(root=".", relative=uploaded_filename)
-            self.path = self.file_access.get_file()
+            self.storage_service = LinuxStorageService(root=".", relative=uploaded_filename)
+            self.path = self.storage_service.get_file()
+            self.file_location = str(self.path.resolve())
 
         else:
             self.set_storage_service()
 
     def load_data(self, current_data: dict) -> None:
         """Load the data to a pandas dataframe and then to records."""
-        self.dataframe = pd.read_excel(
-            self.path,
+        self.dataframe = self.read_dataframe(
+            pd.read_excel,
             sheet_name=self.source.SheetName,
             header=self.source.HeaderRow - 1,
         )
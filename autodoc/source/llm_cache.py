@@ -0,0 +1,174 @@
+"""Define a persistent cache of LLM responses, shared by every process on the host."""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+from loguru import logger
+
+from autodoc.config import LLM_CACHE_MAX_MB, LLM_CACHE_PATH, LLM_CACHE_TTL
+
+
+def make_key(provider: str, model_name: str, system_prompt: Optional[str], prompt: str) -> str:
+    """Return the cache key of a prompt sent to a model."""
+    parts = json.dumps([provider, model_name, system_prompt or "", prompt])
+    return hashlib.sha256(parts.encode()).hexdigest()
+
+
+class LLMResponseCache:
+    """
+    An SQLite backed cache of LLM responses, evicted by age and least recent use.
+
+    Entries older than ttl seconds are ignored and removed (a ttl of 0 keeps them
+    forever). When the responses stored grow past max_bytes, the least recently used
+    are removed until they fill no more than evict_to of it, so a full cache isn't
+    evicted again on every put.
+
+    The total size is kept in the database by triggers, so it is the same for every
+    process sharing the cache, and a put doesn't sum every response.
+    """
+
+    evict_to = 0.9
+
+    def __init__(self, path: Path, ttl: float = LLM_CACHE_TTL, max_bytes: int = LLM_CACHE_MAX_MB * 2**20):
+        """Open, or create, the cache database at path."""
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+
+        self.connection = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS Response (
+                Key TEXT PRIMARY KEY,
+                Response TEXT NOT NULL,
+                Size INTEGER NOT NULL,
+                CreatedAt REAL NOT NULL,
+                UsedAt REAL NOT NULL
+            )
+            """
+        )
+        self.connection.execute("CREATE INDEX IF NOT EXISTS ResponseUsedAt ON Response (UsedAt)")
+        self.connection.execute(
+            "CREATE INDEX IF NOT EXISTS ResponseCreatedAt ON Response (CreatedAt)"
+        )
+        self.create_size_total()
+
+    def create_size_total(self):
+        """Create the table holding the total size of the responses, and the triggers keeping it."""
+        with self.lock:
+            self.connection.execute("BEGIN IMMEDIATE")
+            try:
+                self.connection.execute(
+                    "CREATE TABLE IF NOT EXISTS ResponseTotal "
+                    "(Id INTEGER PRIMARY KEY, Size INTEGER NOT NULL)"
+                )
+                # a cache created before the total was kept starts from the size of its responses.
+                self.connection.execute(
+                    "INSERT OR IGNORE INTO ResponseTotal (Id, Size) "
+                    "SELECT 1, COALESCE(SUM(Size), 0) FROM Response"
+                )
+                for trigger in (
+                    "ResponseInserted AFTER INSERT ON Response BEGIN "
+                    "UPDATE ResponseTotal SET Size = Size + NEW.Size; END",
+                    "ResponseUpdated AFTER UPDATE OF Size ON Response BEGIN "
+                    "UPDATE ResponseTotal SET Size = Size + NEW.Size - OLD.Size; END",
+                    "ResponseDeleted AFTER DELETE ON Response BEGIN "
+                    "UPDATE ResponseTotal SET Size = Size - OLD.Size; END",
+                ):
+                    self.connection.execute(f"CREATE TRIGGER IF NOT EXISTS {trigger}")
+                self.connection.execute("COMMIT")
+            except sqlite3.Error:
+                self.connection.execute("ROLLBACK")
+                raise
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached response for key, or None if missing or expired."""
+        now = time.time()
+
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT Response, CreatedAt FROM Response WHERE Key = ?", (key,)
+            ).fetchone()
+
+            if row is None:
+                return None
+
+            response, created_at = row
+            if self.ttl and now - created_at > self.ttl:
+                self.connection.execute("DELETE FROM Response WHERE Key = ?", (key,))
+                return None
+
+            self.connection.execute("UPDATE Response SET UsedAt = ? WHERE Key = ?", (now, key))
+
+        return response
+
+    def put(self, key: str, response: str):
+        """Store the response for key, evicting the least recently used if over size."""
+        now = time.time()
+        size = len(response.encode())
+
+        with self.lock:
+            # an upsert rather than a replace, as a replace doesn't fire the delete trigger.
+            self.connection.execute(
+                "INSERT INTO Response (Key, Response, Size, CreatedAt, UsedAt) "
+                "VALUES (?, ?, ?, ?, ?) ON CONFLICT (Key) DO UPDATE SET "
+                "Response = excluded.Response, Size = excluded.Size, "
+                "CreatedAt = excluded.CreatedAt, UsedAt = excluded.UsedAt",
+                (key, response, size, now, now),
+            )
+            self.evict()
+
+    def evict(self):
+        """Remove expired responses, then if over max_bytes the least recently used."""
+        if self.ttl:
+            self.connection.execute("DELETE FROM Response WHERE CreatedAt < ?", (time.time() - self.ttl,))
+
+        (total,) = self.connection.execute("SELECT Size FROM ResponseTotal").fetchone()
+        if total <= self.max_bytes:
+            return
+
+        # keep the most recently used responses that fit within evict_to of max_bytes.
+        self.connection.execute(
+            """
+            DELETE FROM Response WHERE Key IN (
+                SELECT Key FROM (
+                    SELECT Key, SUM(Size) OVER (ORDER BY UsedAt DESC, Key) AS Kept FROM Response
+                ) WHERE Kept > ?
+            )
+            """,
+            (self.max_bytes * self.evict_to,),
+        )
+
+    def clear(self):
+        """Remove every cached response."""
+        with self.lock:
+            self.connection.execute("DELETE FROM Response")
+
+
+_cache: Optional[LLMResponseCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> Optional[LLMResponseCache]:
+    """Return this process's LLM response cache, or None if it is disabled or can't be opened."""
+    global _cache
+
+    if not LLM_CACHE_PATH:
+        return None
+
+    with _cache_lock:
+        if _cache is None:
+            try:
+                _cache = LLMResponseCache(path=Path(LLM_CACHE_PATH))
+            except sqlite3.Error as e:
+                logger.warning(f"LLM response cache at {LLM_CACHE_PATH} is unavailable: {e}")
+                return None
+
+    return _cache
@@ -0,0 +1,148 @@
+"""Run many LLM calls concurrently within a provider's rate limits."""
+
+import asyncio
+import random
+import time
+from typing import Any, Awaitable, Callable, Optional
+
+from loguru import logger
+
+from autodoc.config import (
+    LLM_MAX_CONCURRENCY,
+    LLM_MAX_RETRIES,
+    LLM_PROVIDER_LIMITS,
+    LLM_TOKENS_PER_MINUTE,
+)
+
+
+def parse_provider_limits(text: str) -> dict[str, tuple[int, int]]:
+    """
+    Parse per provider limits, such as "openai=8:90000,anthropic=4:40000".
+
+    Each provider is given as name=max in flight calls:tokens per minute, where the
+    tokens per minute can be left out or 0 for no limit.
+    """
+    limits = {}
+    for part in text.split(","):
+        if not part.strip():
+            continue
+
+        name, _, values = part.partition("=")
+        max_in_flight, _, tokens_per_minute = values.partition(":")
+        limits[name.strip()] = (int(max_in_flight), int(tokens_per_minute or 0))
+
+    return limits
+
+
+def get_provider_limits(provider: str) -> tuple[int, int]:
+    """Return the (max in flight calls, tokens per minute) for provider."""
+    return parse_provider_limits(LLM_PROVIDER_LIMITS).get(
+        provider, (LLM_MAX_CONCURRENCY, LLM_TOKENS_PER_MINUTE)
+    )
+
+
+def estimate_tokens(text: str) -> int:
+    """Roughly estimate the number of tokens in text, at about 4 characters a token."""
+    return max(1, len(text) // 4)
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    """Return if error is a provider telling us to slow down, such as a HTTP 429."""
+    status = getattr(error, "status_code", None) or getattr(
+        getattr(error, "response", None), "status_code", None
+    )
+    if status == 429:
+        return True
+
+    message = str(error).lower()
+    return "429" in message or "rate limit" in message or "ratelimit" in type(error).__name__.lower()
+
+
+def get_retry_after(error: Exception) -> Optional[float]:
+    """Return the seconds a rate limit error asks us to wait, if it says."""
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """
+    A tokens per minute limit, refilled continuously.
+
+    A call larger than the whole minute's budget is let through once the bucket is full,
+    rather than waiting forever.
+    """
+
+    def __init__(self, tokens_per_minute: int):
+        """Create a full bucket."""
+        self.capacity = tokens_per_minute
+        self.tokens = float(tokens_per_minute)
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    def refill(self):
+        """Add the tokens earned since the last refill."""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.capacity / 60)
+        self.updated = now
+
+    async def acquire(self, tokens: int):
+        """Wait until tokens are available and take them."""
+        tokens = min(tokens, self.capacity)
+
+        async with self.lock:
+            self.refill()
+            while self.tokens < tokens:
+                await asyncio.sleep((tokens - self.tokens) * 60 / self.capacity)
+                self.refill()
+
+            self.tokens -= tokens
+
+
+class ProviderLimiter:
+    """
+    Limit the calls made to one provider: how many are in flight and tokens per minute.
+
+    Calls that are rate limited by the provider are retried with exponential backoff
+    and jitter, honouring a Retry-After header when there is one.
+    """
+
+    def __init__(
+        self,
+        max_in_flight: int = LLM_MAX_CONCURRENCY,
+        tokens_per_minute: int = LLM_TOKENS_PER_MINUTE,
+        max_retries: int = LLM_MAX_RETRIES,
+        base_delay: float = 1.0,
+    ):
+        """Create a limiter. A tokens_per_minute of 0 doesn't limit tokens."""
+        self.semaphore = asyncio.Semaphore(max(max_in_flight, 1))
+        self.bucket = TokenBucket(tokens_per_minute) if tokens_per_minute > 0 else None
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+
+    @classmethod
+    def for_provider(cls, provider: str) -> "ProviderLimiter":
+        """Create a limiter with the configured limits of provider."""
+        max_in_flight, tokens_per_minute = get_provider_limits(provider)
+        return cls(max_in_flight=max_in_flight, tokens_per_minute=tokens_per_minute)
+
+    async def call(self, make_call: Callable[[], Awaitable[Any]], tokens: int) -> Any:
+        """Await make_call() within the limits, retrying it if rate limited."""
+        for attempt in range(self.max_retries + 1):
+            if self.bucket:
+                await self.bucket.acquire(tokens)
+
+            async with self.semaphore:
+                try:
+                    return await make_call()
+                except Exception as e:
+                    if not is_rate_limit_error(e) or attempt == self.max_retries:
+                        raise
+                    error = e
+
+            delay = get_retry_after(error) or self.base_delay * 2**attempt
+            delay += random.uniform(0, delay / 2)
+            logger.warning(f"Rate limited ({error}), retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
@@ -0,0 +1,128 @@
+"""Keep LLM chat models, and the event loop their async clients run on, alive for the process."""
+
+import asyncio
+import atexit
+import hashlib
+import threading
+from concurrent.futures import Future
+from typing import Any, Coroutine, Optional
+
+from langchain.chat_models import init_chat_model
+from langchain_core.language_models import BaseChatModel
+from loguru import logger
+
+from autodoc.data.tables import LLM
+
+from .llm_limits import ProviderLimiter
+
+
+def model_settings(llm: LLM) -> tuple:
+    """Return the settings a chat model of llm is created with, with the API key hashed."""
+    api_key = hashlib.sha256((llm.APIKey or "").encode()).hexdigest()
+    provider = llm.provider.LangChainName if llm.provider else None
+    return (llm.ModelName, provider, llm.BaseURL, api_key)
+
+
+class ChatModelRegistry:
+    """
+    The chat models of this process, one per LLM.
+
+    Creating a model builds a new HTTP client, so each source and check would otherwise
+    open fresh connections to the provider. A model is created the first time its LLM is
+    used, and replaced if the LLM's settings have changed since.
+    """
+
+    def __init__(self):
+        """Create an empty registry."""
+        self.models: dict[int, tuple[tuple, BaseChatModel]] = {}
+        self.lock = threading.Lock()
+
+    def get(self, llm: LLM) -> BaseChatModel:
+        """Return the chat model of llm, creating it if it is new or its settings changed."""
+        settings = model_settings(llm)
+
+        with self.lock:
+            cached = self.models.get(llm.Id)
+            if cached and cached[0] == settings:
+                return cached[1]
+
+            logger.debug(f"Creating chat model {llm.ModelName} for LLM {llm.Id}")
+            model = init_chat_model(
+                llm.ModelName,
+                model_provider=llm.provider.LangChainName,
+                api_key=llm.APIKey,
+                base_url=llm.BaseURL,
+            )
+            self.models[llm.Id] = (settings, model)
+            return model
+
+    def invalidate(self, llm_id: int):
+        """Forget the chat model of an LLM, such as when it is deleted."""
+        with self.lock:
+            self.models.pop(llm_id, None)
+
+    def clear(self):
+        """Forget every chat model."""
+        with self.lock:
+            self.models = {}
+
+
+chat_models = ChatModelRegistry()
+
+
+class ProviderLimiterRegistry:
+    """
+    The rate limiters of this process, one per provider.
+
+    Every call to a provider goes through the same limiter on the LLM event loop, so its
+    in flight and tokens per minute limits hold across sources, runs and threads rather
+    than each call getting its own full budget.
+    """
+
+    def __init__(self):
+        """Create an empty registry."""
+        self.limiters: dict[str, ProviderLimiter] = {}
+        self.lock = threading.Lock()
+
+    def get(self, provider: str) -> ProviderLimiter:
+        """Return the limiter of provider, creating it with its configured limits on first use."""
+        with self.lock:
+            if provider not in self.limiters:
+                self.limiters[provider] = ProviderLimiter.for_provider(provider)
+
+            return self.limiters[provider]
+
+    def clear(self):
+        """Forget every limiter."""
+        with self.lock:
+            self.limiters = {}
+
+
+provider_limiters = ProviderLimiterRegistry()
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_lock = threading.Lock()
+
+
+def get_loop() -> asyncio.AbstractEventLoop:
+    """
+    Return this process's LLM event loop, running on a daemon thread.
+
+    Async clients hold connections bound to the loop that opened them, so models reused
+    across calls must always be awaited on the same loop rather than a new asyncio.run.
+    """
+    global _loop
+
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="autodoc-llm", daemon=True).start()
+            atexit.register(_loop.call_soon_threadsafe, _loop.stop)
+
+    return _loop
+
+
+def run_async(coroutine: Coroutine) -> Any:
+    """Run coroutine on the LLM event loop, wait for it and return its result."""
+    future: Future = asyncio.run_coroutine_threadsafe(coroutine, get_loop())
+    return future.result()
@@ -1,17 +1,28 @@
 """Define the LLMSource Sources."""
 
+import asyncio
 from typing import Optional
 
-from jinja2 import Template, TemplateSyntaxError
-from langchain.chat_models import init_chat_model
+from jinja2 import Environment, Template, TemplateSyntaxError, meta
 from langchain_core.messages import HumanMessage, SystemMessage
 from loguru import logger
 
 from autodoc.data.tables import Source
 
+from .llm_cache import get_llm_cache, make_key
+from .llm_limits import estimate_tokens
+from .llm_models import chat_models, provider_limiters, run_async
 from .source import SourceService
 
 
+def get_template_fields(template_text: str) -> Optional[frozenset[str]]:
+    """Return the variables a jinja2 template reads, or None if it can't be parsed."""
+    try:
+        return frozenset(meta.find_undeclared_variables(Environment().parse(template_text or "")))
+    except TemplateSyntaxError:
+        return None
+
+
 class LLMSourceService(SourceService):
     """A Response from an LLM."""
 
@@ -23,34 +34,122 @@ class LLMSourceService(SourceService):
         self.source = source
         self.data = {}
 
-    def load_data(self, current_data: dict | None = None) -> None:
-        """Set the response to the llm key."""
-        prompt_template_text = self.source.LLMPromptTemplate
-        prompt_template = Template(prompt_template_text)
-        rendered_prompt_text = prompt_template.render(**current_data or {})
+        self.context_fields = get_template_fields(self.source.LLMPromptTemplate)
 
-        model = init_chat_model(
-            self.source.llm.ModelName,
-            model_provider=self.source.llm.provider.LangChainName,
-            api_key=self.source.llm.APIKey,
-            base_url=self.source.llm.BaseURL,
-        )
+        # load the LLM now, so loading on a worker thread doesn't lazy load it.
+        self.llm = source.llm
+        self.provider = self.llm.provider if self.llm else None
+
+        self.cache = get_llm_cache()
+        if self.cache:
+            self.cache_hits = 0
+            self.cache_misses = 0
+
+    @property
+    def output_fields(self) -> Optional[frozenset[str]]:
+        """Return the field the response is added to the context as."""
+        return frozenset({self.source.FieldName})
+
+    def get_model(self):
+        """Return the process's chat model of this source's LLM."""
+        return chat_models.get(self.source.llm)
+
+    def build_messages(self, current_data: dict | None) -> list:
+        """Return the system message and the prompt rendered with current_data."""
+        prompt_template = Template(self.source.LLMPromptTemplate)
+        rendered_prompt_text = prompt_template.render(**current_data or {})
 
         system_message = SystemMessage(
             content=self.source.LLMSystemPrompt or self.source.llm.SystemPrompt
         )
-
         human_message = HumanMessage(content=rendered_prompt_text)
-        messages = [system_message, human_message]
 
-        logger.info(
-            f"Calling LLM with System Message {system_message} and Human Message {human_message}"
+        return [system_message, human_message]
+
+    def cache_key(self, messages: list) -> str:
+        """Return the response cache key of messages sent to this source's model."""
+        return make_key(
+            provider=self.source.llm.provider.LangChainName,
+            model_name=self.source.llm.ModelName,
+            system_prompt=messages[0].content,
+            prompt=messages[1].content,
         )
 
-        response = model.invoke(messages).content
+    def get_cached(self, messages: list) -> Optional[str]:
+        """Return the cached response to messages, counting the hit or miss."""
+        if not self.cache:
+            return None
+
+        response = None if self.source.BypassCache else self.cache.get(self.cache_key(messages))
+
+        if response is None:
+            self.cache_misses += 1
+        else:
+            self.cache_hits += 1
+
+        return response
+
+    def store(self, messages: list, response: str):
+        """Cache the response to messages."""
+        if self.cache:
+            self.cache.put(self.cache_key(messages), response)
+
+    def load_data(self, current_data: dict | None = None) -> None:
+        """Set the response to the llm key."""
+        messages = self.build_messages(current_data)
+
+        response = self.get_cached(messages)
+
+        if response is None:
+            logger.info(
+                f"Calling LLM with System Message {messages[0]} and Human Message {messages[1]}"
+            )
+            response = self.get_model().invoke(messages).content
+            self.store(messages, response)
 
         self.data[self.source.FieldName] = response
 
+    def load_data_many(self, contexts: list[dict]) -> list[dict | list]:
+        """
+        Call the LLM for every context concurrently, and return each response.
+
+        The prompts are rendered up front, contexts giving the same prompt variables share
+        a call, and the calls are run within the provider's in flight and tokens per
+        minute limits, backing off when rate limited. Cached responses aren't sent.
+        """
+        keys = [self.context_key(context) for context in contexts]
+        if any(key is None for key in keys):
+            keys = list(range(len(contexts)))
+
+        distinct = dict(zip(keys, contexts, strict=True))
+        message_lists = [self.build_messages(context) for context in distinct.values()]
+        responses = [self.get_cached(messages) for messages in message_lists]
+        uncached = [index for index, response in enumerate(responses) if response is None]
+
+        logger.info(f"Calling LLM for {len(contexts)} contexts with {len(uncached)} prompts")
+
+        if uncached:
+            provider = self.source.llm.provider.LangChainName
+            called = run_async(
+                invoke_all(
+                    self.get_model(), [message_lists[i] for i in uncached], provider=provider
+                )
+            )
+            for index, response in zip(uncached, called, strict=True):
+                responses[index] = response
+                self.store(message_lists[index], response)
+
+        data_by_key = {
+            key: {self.source.FieldName: response}
+            for key, response in zip(distinct, responses, strict=True)
+        }
+        results: list[dict | list] = [data_by_key[key] for key in keys]
+
+        if results:
+            self.data = dict(results[-1])
+
+        return results
+
     def check(self) -> tuple[bool, Optional[str]]:
         """Check if this source can be loaded. Returns (can be loaded, reason why not)."""
         llm = self.source.llm
@@ -68,14 +167,22 @@ class LLMSourceService(SourceService):
         except TemplateSyntaxError as e:
             return False, f"Invalid Jinja2 template: {e}"
 
+        # the model is only created the first time its settings are checked or used.
         try:
-            _ = init_chat_model(
-                llm.ModelName,
-                model_provider=llm.provider.LangChainName,
-                api_key=llm.APIKey,
-                base_url=llm.BaseURL,
-            )
+            chat_models.get(llm)
         except Exception as e:
             return False, f"Failed to initialize model: {e}"
 
         return True, None
+
+
+async def invoke_all(model, message_lists: list[list], provider: str) -> list[str]:
+    """Invoke model with each list of messages concurrently and return the responses in order."""
+    limiter = provider_limiters.get(provider)
+
+    async def invoke(messages: list) -> str:
+        tokens = sum(estimate_tokens(str(message.content)) for message in messages)
+        response = await limiter.call(lambda: model.ainvoke(messages), tokens=tokens)
+        return response.content
+
+    return list(await asyncio.gather(*(invoke(messages) for messages in message_lists)))
@@ -0,0 +1,185 @@
+"""Define the Parquet Source."""
+
+import json
+import operator
+import re
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+import pyarrow as pa
+import pyarrow.dataset as ds
+from loguru import logger
+
+from autodoc.config import PARQUET_BATCH_SIZE
+from autodoc.data.tables import ParquetSource
+from autodoc.storage_service import LinuxStorageService
+
+from .source import SourceService
+
+OPERATORS: dict[str, Callable[[Any, Any], Any]] = {
+    "=": operator.eq,
+    "==": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+}
+
+CONDITION_PATTERN = re.compile(r"^\s*(.+?)\s*(==|!=|<=|>=|=|<|>)\s*(.+?)\s*$")
+
+
+def parse_columns(text: Optional[str]) -> Optional[list[str]]:
+    """Return the comma separated column names in text, or None to read every column."""
+    columns = [column.strip() for column in (text or "").split(",") if column.strip()]
+    return columns or None
+
+
+def parse_filters(text: Optional[str]) -> list[tuple[str, str, str]]:
+    """
+    Return the (column, operator, value) conditions in text, one per line.
+
+    A value is a :field from the context, a JSON literal such as 2024 or "North", or
+    otherwise taken as text. Raises ValueError for a line that isn't a condition.
+    """
+    conditions = []
+    for line in (text or "").splitlines():
+        if not line.strip():
+            continue
+
+        match = CONDITION_PATTERN.match(line)
+        if not match:
+            raise ValueError(f"'{line.strip()}' is not a condition like: Region = \"North\"")
+
+        conditions.append((match[1], match[2], match[3]))
+
+    return conditions
+
+
+def parse_value(text: str, context: dict) -> Any:
+    """
+    Return the value of a condition, looking up a :field in context.
+
+    Raises ValueError if the field isn't in the context.
+    """
+    if text.startswith(":"):
+        field = text[1:]
+        if field not in context:
+            raise ValueError(f"Filter field '{field}' is not in the context")
+        return context[field]
+
+    try:
+        return json.loads(text)
+    except ValueError:
+        return text
+
+
+class ParquetSourceService(SourceService):
+    """
+    A multirecord Parquet table.
+
+    Only the configured columns are read, and a splitter only reads those that later
+    sources or the outcomes' templates use. Filters are pushed down to the file, so
+    row groups whose statistics rule out every row are skipped. A splitter streams its
+    rows a record batch at a time.
+    """
+
+    is_multi_record = True
+
+    def __init__(self, source: ParquetSource, uploaded_filename=None) -> None:
+        """Create a ParquetSourceService with the path to the parquet file."""
+        self.data = []
+        self.source = source
+        if uploaded_filename:
+            self.storage_service = LinuxStorageService(root=".", relative=uploaded_filename)
+            self.path = self.storage_service.get_file()
+
+        else:
+            self.set_storage_service()
+
+        self.columns = parse_columns(source.Columns)
+
+        self.filter_error: Optional[str] = None
+        try:
+            self.conditions = parse_filters(source.Filters)
+        except ValueError as e:
+            self.conditions = []
+            self.filter_error = str(e)
+
+        self.context_fields = frozenset(
+            value[1:] for _, _, value in self.conditions if value.startswith(":")
+        )
+
+    def dataset(self) -> ds.Dataset:
+        """Return the parquet file as a dataset, which reads only what is scanned."""
+        return ds.dataset(self.path, format="parquet")
+
+    def read_columns(self, dataset: ds.Dataset) -> Optional[list[str]]:
+        """
+        Return the columns of dataset to read, or None to read every column.
+
+        A splitter merges its columns into the context, so only those read once it is
+        loaded are needed. Grouped records are read through their FieldName, so all of
+        their configured columns are kept.
+        """
+        fields = self.downstream_fields
+        if not self.source.IsSplitter or fields is None:
+            return self.columns
+
+        return [column for column in self.columns or dataset.schema.names if column in fields]
+
+    def filter(self, current_data: dict) -> Optional[ds.Expression]:
+        """Return the filter expression for current_data, or None if there are no filters."""
+        expression = None
+        for column, op, value in self.conditions:
+            condition = OPERATORS[op](ds.field(column), parse_value(value, current_data))
+            expression = condition if expression is None else expression & condition
+
+        return expression
+
+    def load_data(self, current_data: dict) -> None:
+        """Load the filtered rows of the selected columns to records."""
+        dataset = self.dataset()
+        table = dataset.to_table(columns=self.read_columns(dataset), filter=self.filter(current_data))
+        self.data = table.to_pylist()
+
+    def stream_data(self, current_data: dict) -> Iterable:
+        """
+        Return the records for current_data, read a record batch at a time if splitting.
+
+        Grouped records are attached to the context as a whole, so they are loaded as usual.
+        """
+        if not self.source.IsSplitter:
+            return super().stream_data(current_data=current_data)
+
+        return self.iter_records(current_data)
+
+    def iter_records(self, current_data: dict) -> Iterator[dict]:
+        """Yield the filtered rows, PARQUET_BATCH_SIZE rows at a time."""
+        dataset = self.dataset()
+        batches = dataset.to_batches(
+            columns=self.read_columns(dataset),
+            filter=self.filter(current_data),
+            batch_size=PARQUET_BATCH_SIZE,
+        )
+        for batch in batches:
+            yield from batch.to_pylist()
+
+    def check(self) -> tuple[bool, Optional[str]]:
+        """Check if this source can be loaded. Returns (can be loaded, reason why not)."""
+        if not self.file_exists():
+            logger.info(f"File does not exist, so source can not be loaded (path is {self.path})")
+            return False, f"File does not exist: {self.path}"
+
+        if self.filter_error:
+            return False, f"Invalid filter: {self.filter_error}"
+
+        try:
+            names = set(self.dataset().schema.names)
+        except (OSError, pa.ArrowException) as e:
+            return False, f"Not a readable parquet file: {e}"
+
+        required = set(self.columns or []) | {column for column, _, _ in self.conditions}
+        if missing := sorted(required - names):
+            return False, f"Columns not in the parquet file: {', '.join(missing)}"
+
+        return True, None
@@ -1,10 +1,16 @@
 """Create a base class for sources."""
 
+import copy
 from abc import ABC, abstractmethod
-from typing import Optional
+from collections import OrderedDict
+from typing import Callable, Hashable, Iterable, Optional
+
+import pandas as pd
 
 from autodoc.data.tables import Source
-from autodoc.storage_service import get_storage_service
+from autodoc.storage_service import StorageService, get_storage_service
+
+from .columnar_cache import get_source_cache, make_key
 
 
 class SourceService(ABC):
@@ -12,8 +18,28 @@ class SourceService(ABC):
 
     data: dict | list
     is_multi_record: bool
+
+    # the context fields this source reads when loading. An empty set means the data is
+    # the same for every context, and None that it may depend on any of the context.
+    context_fields: Optional[frozenset[str]] = None
+
+    # the context fields read once this source is loaded, by later sources and the
+    # outcomes, set by the SourceLoader. None means any of them may be read.
+    downstream_fields: Optional[frozenset[str]] = None
+
+    # responses served from and missing from a cache while loading, if the source has one.
+    cache_hits: Optional[int] = None
+    cache_misses: Optional[int] = None
+
+    # data already loaded in this run, by the values of its context_fields.
+    memo: Optional[OrderedDict] = None
+    memo_size = 256
+
+    # the storage of the source's file, if it has one, and where the file is within it.
+    storage_service: Optional[StorageService] = None
+    file_location: Optional[str] = None
+
     # is_multi_record: bool
-    # storage_service: StorageService | None
     # path: Path
 
     def __init__(self, source: Source, uploaded_filename=None) -> None:
@@ -29,10 +55,27 @@ class SourceService(ABC):
             return
 
         self.storage_service = get_storage_service(file_template=template)
+        self.file_location = f"{template.StorageInstanceId}:{template.Bucket}:{template.Location}"
 
         if self.storage_service:
             self.path = self.storage_service.get_file()
 
+    def read_dataframe(self, read: Callable[..., pd.DataFrame], **options) -> pd.DataFrame:
+        """
+        Return read(self.path, **options), from the source cache if the file is unchanged.
+
+        The cache is keyed by the file's location and its version from the storage
+        service, and how it is read, so a changed file or option reads it again.
+        """
+        cache = get_source_cache()
+        version = self.storage_service.get_version() if cache and self.storage_service else None
+
+        if version is None:
+            return read(self.path, **options)
+
+        key = make_key(type(self).__name__, self.file_location, version, options)
+        return cache.read(key, lambda: read(self.path, **options))
+
     def file_exists(self) -> Optional[bool]:
         """Return if the source file exists."""
         print(f"Checking this path: {self.path}")
@@ -63,3 +106,80 @@ class SourceService(ABC):
         current_data is passed because some Sources require current data to complete,
         for example as params for a SQL Query.
         """
+
+    @property
+    def output_fields(self) -> Optional[frozenset[str]]:
+        """
+        Return the fields this source adds to the context, or None if only known once loaded.
+
+        Grouped records are added under the FieldName, whereas a splitter or single
+        record adds the fields of whatever records it loads.
+        """
+        if self.is_multi_record and not self.source.IsSplitter:
+            return frozenset({self.source.FieldName})
+
+        return None
+
+    def load_data_many(self, contexts: list[dict]) -> list[dict | list]:
+        """
+        Load the data of the source for each of contexts and return it in the same order.
+
+        Sources that can load many contexts more cheaply than one at a time override
+        this. By default each context is loaded in turn and its data copied, as some
+        Sources update their data in place.
+        """
+        return [self.load_memoised(context) for context in contexts]
+
+    def context_key(self, context: dict) -> Optional[Hashable]:
+        """
+        Return the values of context_fields in context, or None if they can't be used as a key.
+
+        Contexts with the same key load the same data.
+        """
+        if self.context_fields is None:
+            return None
+
+        key = tuple(sorted((field, context[field]) for field in self.context_fields if field in context))
+
+        try:
+            hash(key)
+        except TypeError:
+            return None
+
+        return key
+
+    def load_memoised(self, context: dict) -> dict | list:
+        """
+        Return the data for context, loading it only if no context with the same key has.
+
+        The data is copied, as some Sources update their data in place, and is shared
+        between contexts with the same key so it must not be changed.
+        """
+        key = self.context_key(context)
+
+        if self.memo is None:
+            self.memo = OrderedDict()
+
+        if key is not None and key in self.memo:
+            self.memo.move_to_end(key)
+            return self.memo[key]
+
+        self.load_data(current_data=context)
+        data = copy.copy(self.data)
+
+        if key is not None:
+            self.memo[key] = data
+            while len(self.memo) > self.memo_size:
+                self.memo.popitem(last=False)
+
+        return data
+
+    def stream_data(self, current_data: dict) -> Iterable:
+        """
+        Load the data of the source for current_data and return it.
+
+        Splitting sources that can produce their records lazily override this, so a
+        stream of contexts doesn't need every record in memory at once. The returned
+        data must be consumed before the source is loaded again.
+        """
+        return self.load_memoised(current_data)
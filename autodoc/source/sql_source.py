@@ -1,9 +1,12 @@
 """Define SQL based Sources."""
 
-from typing import Optional
+from typing import Iterable, Optional
 
 import regex as re
 
+from loguru import logger
+
+from autodoc.config import SQL_BATCH_SIZE, SQL_YIELD_PER
 from autodoc.data.tables import Source
 from autodoc.metasource import MetaDatabase
 
@@ -71,6 +74,7 @@ class DatabaseSourceService(SourceService):
         self.database_id = source.DatabaseId
 
         self.field_names = get_sql_fields(sql=self.sql)
+        self.context_fields = frozenset(self.field_names)
         self.is_multi_record = True
 
         self.meta_database = MetaDatabase(database=self.source.database)
@@ -92,6 +96,63 @@ class DatabaseSourceService(SourceService):
 
         self.data = recordset.data
 
+    def load_data_many(self, contexts: list[dict]) -> list[dict | list]:
+        """
+        Load the records for every context with as few queries as possible.
+
+        Contexts that give the same parameters share a single result, so a query that
+        doesn't depend on the context runs once. The distinct parameter sets are sent
+        to the database SQL_BATCH_SIZE at a time and the records fanned back out.
+        """
+        param_sets = [
+            {k: v for k, v in context.items() if k in self.field_names} for context in contexts
+        ]
+
+        try:
+            keys = [tuple(sorted(params.items())) for params in param_sets]
+            distinct = dict(zip(keys, param_sets, strict=True))
+        except TypeError:
+            # parameters that can't be hashed can't be deduplicated, but can still be batched.
+            keys = list(range(len(param_sets)))
+            distinct = dict(zip(keys, param_sets, strict=True))
+
+        logger.info(
+            f"Loading {len(contexts)} contexts with {len(distinct)} distinct parameter sets"
+        )
+
+        recordsets = self.meta_database.recordsets(
+            sql=self.sql,
+            param_sets=list(distinct.values()),
+            batch_size=SQL_BATCH_SIZE,
+        )
+        data_by_key = {
+            key: recordset.data for key, recordset in zip(distinct, recordsets, strict=True)
+        }
+
+        # each context gets its own list, as they are attached to contexts separately.
+        results: list[dict | list] = [list(data_by_key[key]) for key in keys]
+
+        if results:
+            self.data = results[-1]
+
+        return results
+
+    def stream_data(self, current_data: dict) -> Iterable:
+        """
+        Return the records for current_data, streamed from the database if splitting.
+
+        A splitter only needs one record at a time, so its rows are fetched SQL_YIELD_PER
+        at a time from a server side cursor. Grouped records are attached to the context
+        as a whole, so they are loaded as usual.
+        """
+        if not self.source.IsSplitter:
+            return super().stream_data(current_data=current_data)
+
+        params = {k: v for k, v in current_data.items() if k in self.field_names}
+        return self.meta_database.iter_records(
+            sql=self.sql, params=params, yield_per=SQL_YIELD_PER
+        )
+
     def check(self) -> tuple[bool, Optional[str]]:
         """Check if this source can be loaded. Returns (can be loaded, reason why not)."""
         is_connected = self.meta_database.check_connection()
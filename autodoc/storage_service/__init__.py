@@ -3,6 +3,7 @@
 from autodoc.data.tables import FileTemplate
 
 from .base import StorageService
+from .clients import storage_clients as storage_clients
 # from .dropbox import DropboxStorageService
 from .linux import LinuxStorageService
 from .s3 import S3StorageService
@@ -32,6 +33,7 @@ def get_storage_service(file_template: FileTemplate) -> StorageService:
         url=file_template.storage_instance.URL,
         username=file_template.storage_instance.Username,
         password=file_template.storage_instance.Password,
+        instance_id=file_template.StorageInstanceId,
     )
 
     return storage_service
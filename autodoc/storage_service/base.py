@@ -1,12 +1,13 @@
 """Define the base template for storage services."""
 
 import os
+import shutil
 import tempfile
 from abc import ABC, abstractmethod
 from pathlib import Path
 from typing import Optional
 
-from autodoc.config import OUTPUT_FILE_PERMISSION
+from autodoc.config import DEDUP_HARD_LINKS, OUTPUT_FILE_PERMISSION
 
 from loguru import logger
 
@@ -30,6 +31,7 @@ class StorageService(ABC):
         url: Optional[str] = None,
         username: Optional[str] = None,
         password: Optional[str] = None,
+        instance_id: Optional[int] = None,
     ):
         """
         Initialise.
@@ -39,6 +41,7 @@ class StorageService(ABC):
             url: the url of some storage options
             username: username or access key
             password: password or secret key
+            instance_id: the StorageInstance, so its clients can be shared
         """
         self.temp_file_name: str
 
@@ -63,6 +66,39 @@ class StorageService(ABC):
     def save_file(self):
         """Save the temporary file to storage."""
 
+    def flush(self) -> None:  # noqa: B027
+        """Wait for any saves still in progress to finish."""
+
+    def pending_saves(self) -> int:
+        """Return the number of saves from the oldest still in progress, raising if one failed."""
+        return 0
+
+    def reset(self) -> None:
+        """Forget the document last saved, so the next is saved to a new temp file."""
+        self.temp_file_name = ""
+
+    def local_copy(self) -> Optional[Path]:
+        """Return a local file holding the document last saved, if one is kept."""
+        return Path(self.temp_file_name) if self.temp_file_name else None
+
+    def save_copy(self, source: Path) -> None:
+        """Save a copy of a document already rendered to the local file source."""
+        temp_file_name = self.temp_file_name
+        self.temp_file_name = str(source)
+        try:
+            self.save_file()
+        finally:
+            self.temp_file_name = temp_file_name
+
+    def get_version(self) -> Optional[str]:
+        """
+        Return an identifier for the current version of the raw (unrendered) file.
+
+        This lets caches tell if a file has changed without fetching its contents.
+        Storage services that can't cheaply provide one return None.
+        """
+        return None
+
     @abstractmethod
     def render(self, data: dict):
         """Render the appropriate fields in this class with the finalised data."""
@@ -80,3 +116,39 @@ class StorageService(ABC):
         """Remove any temporary files."""
         if self.temp_file_name:
             os.remove(self.temp_file_name)
+
+
+def unlink_shared(path: Path) -> None:
+    """
+    Remove path if it is hard linked to another file.
+
+    Saving writes into a file in place, so a document hard linked by copy_file must be
+    removed first, or saving it would change every document linked to it.
+    """
+    try:
+        if os.stat(path).st_nlink > 1:
+            os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+def copy_file(source: Path, destination: Path) -> None:
+    """
+    Copy source to destination, replacing it.
+
+    With DEDUP_HARD_LINKS the destination is hard linked to source instead, so both are the
+    same file, falling back to a copy where a link can't be made, such as across devices.
+    """
+    if DEDUP_HARD_LINKS:
+        link = destination.with_name(f".{destination.name}.link")
+        try:
+            link.unlink(missing_ok=True)
+            os.link(source, link)
+            os.replace(link, destination)
+            return
+        except OSError as e:
+            logger.info(f"Can't hard link {destination} to {source}, copying instead: {e}")
+            link.unlink(missing_ok=True)
+
+    unlink_shared(destination)
+    shutil.copy(source, destination)
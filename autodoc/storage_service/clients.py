@@ -0,0 +1,202 @@
+"""Keep S3 clients and SharePoint contexts alive for the process, one per storage instance."""
+
+import hashlib
+import os
+import threading
+import time
+import weakref
+from typing import Any, Callable, Hashable, Optional
+
+import boto3
+from botocore.config import Config
+from loguru import logger
+from office365.runtime.auth.user_credential import UserCredential
+from office365.sharepoint.client_context import ClientContext
+
+from autodoc.config import S3_MAX_POOL_CONNECTIONS, STORAGE_CLIENT_IDLE_SECONDS
+
+
+def client_settings(url: Optional[str], username: Optional[str], password: Optional[str]) -> tuple:
+    """Return the settings a client is created with, with the password hashed."""
+    return (url, username, hashlib.sha256((password or "").encode()).hexdigest())
+
+
+def close_client(client: Any):
+    """Close a client's connections, if it can be closed."""
+    close = getattr(client, "close", None)
+    if callable(close):
+        try:
+            close()
+        except Exception as e:
+            logger.debug(f"Ignoring error closing storage client: {e}")
+
+
+class RegisteredClient:
+    """A client in the registry, with the number of services still using it."""
+
+    def __init__(self, settings: tuple, client: Any, used_at: float):
+        """Register client, created with settings, as last used at used_at."""
+        self.settings = settings
+        self.client = client
+        self.used_at = used_at
+        self.users = 0
+        self.owners: weakref.WeakSet = weakref.WeakSet()
+        # set once the client is replaced or forgotten, so it is closed when last released.
+        self.retired = False
+
+
+class StorageClientRegistry:
+    """
+    The storage clients of this process, by kind and storage instance.
+
+    Creating an S3 client or logging in to SharePoint is slow, and each new client opens
+    fresh connections. A client is created the first time its storage instance is used,
+    replaced if the instance's credentials have changed since, and closed once it has
+    been idle for idle_seconds.
+
+    A client is in use until every service it was given to has been garbage collected,
+    and one in use is never closed: if it is replaced or forgotten meanwhile, it is
+    closed when the last of its services is done with it.
+    """
+
+    def __init__(self, idle_seconds: float = STORAGE_CLIENT_IDLE_SECONDS):
+        """Create an empty registry."""
+        self.idle_seconds = idle_seconds
+        self.clients: dict[Hashable, RegisteredClient] = {}
+        # reentrant, as a service may be garbage collected, and release its client, while
+        # the registry is locked.
+        self.lock = threading.RLock()
+        self.pid = os.getpid()
+
+    def get(
+        self,
+        kind: str,
+        instance_id: Optional[int],
+        settings: tuple,
+        create: Callable[[], Any],
+        owner: Any = None,
+        scope: Hashable = None,
+    ) -> Any:
+        """
+        Return the client of a storage instance, calling create if it is new or changed.
+
+        Storage instances without an id share clients by their settings instead. scope
+        separates clients that can't be shared, such as one per thread. The client is in
+        use by owner, if given, until owner is garbage collected.
+        """
+        key = (kind, instance_id if instance_id is not None else settings, scope)
+        now = time.monotonic()
+
+        with self.lock:
+            if self.pid != os.getpid():
+                # connections can't be shared with the parent of a forked process.
+                self.clients = {}
+                self.pid = os.getpid()
+
+            self.evict_idle(now)
+
+            registered = self.clients.get(key)
+            if not registered or registered.settings != settings:
+                if registered:
+                    self.retire(registered)
+
+                logger.debug(f"Creating {kind} client for storage instance {instance_id}")
+                registered = RegisteredClient(settings, create(), now)
+                self.clients[key] = registered
+
+            registered.used_at = now
+            if owner is not None and owner not in registered.owners:
+                registered.owners.add(owner)
+                registered.users += 1
+                weakref.finalize(owner, self.release, registered)
+
+        return registered.client
+
+    def release(self, registered: RegisteredClient):
+        """Stop a service using a client, closing it if it was retired while in use."""
+        with self.lock:
+            registered.users -= 1
+            registered.used_at = time.monotonic()
+
+            if registered.retired and not registered.users:
+                close_client(registered.client)
+
+    def retire(self, registered: RegisteredClient):
+        """Close a client no longer in the registry, or once its services are done with it."""
+        registered.retired = True
+        if not registered.users:
+            close_client(registered.client)
+
+    def evict_idle(self, now: float):
+        """Close and forget the clients no service has used for idle_seconds."""
+        if not self.idle_seconds:
+            return
+
+        for key, registered in list(self.clients.items()):
+            if not registered.users and now - registered.used_at > self.idle_seconds:
+                self.retire(self.clients.pop(key))
+
+    def invalidate(self, instance_id: int):
+        """Forget the clients of a storage instance, such as when it is deleted."""
+        with self.lock:
+            for key in [key for key in self.clients if key[1] == instance_id]:
+                self.retire(self.clients.pop(key))
+
+    def clear(self):
+        """Close and forget every client."""
+        with self.lock:
+            for registered in self.clients.values():
+                close_client(registered.client)
+            self.clients = {}
+
+
+storage_clients = StorageClientRegistry()
+
+
+def s3_client(
+    url: str, username: str, password: str, instance_id: Optional[int] = None, owner: Any = None
+):
+    """
+    Return the process's S3 client for an endpoint and credentials, shared between threads.
+
+    owner: the service using the client, which is kept open until owner is garbage collected.
+    """
+
+    def create():
+        return boto3.client(
+            "s3",
+            endpoint_url=url,
+            aws_access_key_id=username,
+            aws_secret_access_key=password,
+            config=Config(signature_version="s3v4", max_pool_connections=S3_MAX_POOL_CONNECTIONS),
+        )
+
+    return storage_clients.get(
+        "s3", instance_id, client_settings(url, username, password), create, owner=owner
+    )
+
+
+def sharepoint_context(
+    url: str, username: str, password: str, instance_id: Optional[int] = None, owner: Any = None
+) -> ClientContext:
+    """
+    Return this thread's SharePoint context for a site and credentials.
+
+    A ClientContext queues up requests until they are executed, so it is never shared
+    between threads, and must be looked up on the thread making the request rather
+    than kept. owner: the service using the context, as for s3_client.
+    """
+
+    def create():
+        return ClientContext(url).with_credentials(
+            UserCredential(user_name=username, password=password)
+        )
+
+    return storage_clients.get(
+        "sharepoint",
+        instance_id,
+        client_settings(url, username, password),
+        create,
+        owner=owner,
+        scope=threading.get_ident(),
+    )
@@ -0,0 +1,183 @@
+"""Keep local copies of remote files, shared by every process on the host."""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Iterator, Optional
+
+from loguru import logger
+
+from autodoc.config import REMOTE_FILE_CACHE_DIR, REMOTE_FILE_CACHE_MAX_MB
+
+try:
+    import fcntl
+except ImportError:  # Windows, where only the threads of a process share a download.
+    fcntl = None
+
+SUFFIX = ".file"
+
+
+def make_key(*parts) -> str:
+    """Return the cache key of a remote file at a version."""
+    return hashlib.sha256(json.dumps(parts, default=str).encode()).hexdigest()
+
+
+class FileCache:
+    """
+    A directory of downloaded remote files, evicted by least recent use.
+
+    Files are keyed by their storage instance, bucket or library, path and version (the
+    ETag), so a changed file is simply a new key, and the old one is evicted in time.
+    Each file is downloaded once, while holding a lock file other processes wait on, then
+    moved into place whole. When the files grow past max_bytes, the least recently used
+    are removed until they fit again, never the one just returned.
+    """
+
+    def __init__(self, directory: Path, max_bytes: int = REMOTE_FILE_CACHE_MAX_MB * 2**20):
+        """Use, or create, the cache directory."""
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def path(self, key: str) -> Path:
+        """Return the path of the cached file for key."""
+        return self.directory / f"{key}{SUFFIX}"
+
+    @contextmanager
+    def locked(self, name: str) -> Iterator[None]:
+        """Hold the lock called name, across the threads and processes using the cache."""
+        if fcntl is None:
+            with self.lock:
+                yield
+            return
+
+        # each open of the lock file is locked separately, so this also excludes threads.
+        with open(self.directory / f"{name}.lock", "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def used(self, path: Path) -> bool:
+        """Mark a cached file as just used, returning False if it isn't cached."""
+        try:
+            # the modification time records when it was last used, for eviction.
+            os.utime(path)
+        except FileNotFoundError:
+            return False
+        return True
+
+    def get(self, location: tuple, version: str, download: Callable[[Path], None]) -> Path:
+        """Return the cached file of location at version, calling download(path) on a miss."""
+        key = make_key(*location, version)
+        path = self.path(key)
+
+        if self.used(path):
+            logger.info(f"Read {location} from the remote file cache")
+            return path
+
+        # one lock per leading hex digit of the key, so there are never more than 16.
+        with self.locked(key[0]):
+            # another process may have downloaded it while this one waited.
+            if self.used(path):
+                return path
+
+            with tempfile.NamedTemporaryFile(dir=self.directory, suffix=".tmp", delete=False) as f:
+                temp_path = Path(f.name)
+
+            try:
+                download(temp_path)
+                os.replace(temp_path, path)
+            finally:
+                temp_path.unlink(missing_ok=True)
+
+        logger.info(f"Cached {location} at version {version}")
+
+        with self.locked("evict"):
+            self.evict(keep=path)
+
+        return path
+
+    def evict(self, keep: Optional[Path] = None):
+        """Remove the least recently used files, other than keep, until under max_bytes."""
+        files = []
+        for path in self.directory.glob(f"*{SUFFIX}"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in files)
+
+        for _, size, path in sorted(files):
+            if total <= self.max_bytes:
+                break
+
+            if path != keep:
+                path.unlink(missing_ok=True)
+                total -= size
+
+    def clear(self):
+        """Remove every cached file."""
+        for path in self.directory.glob(f"*{SUFFIX}"):
+            path.unlink(missing_ok=True)
+
+
+_cache: Optional[FileCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_remote_file_cache() -> Optional[FileCache]:
+    """Return this process's remote file cache, or None if it is disabled or can't be created."""
+    global _cache
+
+    if not REMOTE_FILE_CACHE_DIR:
+        return None
+
+    with _cache_lock:
+        if _cache is None:
+            try:
+                _cache = FileCache(directory=Path(REMOTE_FILE_CACHE_DIR))
+            except OSError as e:
+                logger.warning(f"Remote file cache at {REMOTE_FILE_CACHE_DIR} is unavailable: {e}")
+                return None
+
+    return _cache
+
+
+def read_through(
+    location: tuple, get_version: Callable[[], Optional[str]], download: Callable[[Path], None]
+) -> Path:
+    """
+    Return a local copy of a remote file, from the cache if its version is unchanged.
+
+    The version is checked on every call, so a changed file is always downloaded again.
+    If the cache is disabled or the version can't be found, the file is downloaded to a
+    new temporary file instead.
+    """
+    cache = get_remote_file_cache()
+
+    version = None
+    if cache is not None:
+        try:
+            version = get_version()
+        except Exception as e:
+            logger.warning(f"Not caching {location}, its version can't be found: {e}")
+
+    if cache is None or version is None:
+        with tempfile.NamedTemporaryFile(delete=False) as temp_file:
+            temp_path = Path(temp_file.name)
+            logger.debug(f"Temporary file created: {temp_path}")
+
+        download(temp_path)
+        return temp_path
+
+    return cache.get(location, version, download)
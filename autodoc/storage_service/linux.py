@@ -2,11 +2,12 @@
 
 import shutil
 from pathlib import Path
+from typing import Optional
 
 from jinja2 import Template
 from loguru import logger
 
-from .base import StorageService
+from .base import StorageService, copy_file, unlink_shared
 
 
 class LinuxStorageService(StorageService):
@@ -55,8 +56,14 @@ class LinuxStorageService(StorageService):
         """Get the path of the file."""
         return Path(self.root_path_raw) / Path(self.relative_path_raw)
 
+    def get_version(self) -> str:
+        """Return the size and modification time of the file."""
+        stat = self.get_file().stat()
+        return f"{stat.st_size}-{stat.st_mtime_ns}"
+
     def save_text(self, text) -> None:
         """Save a text to storage."""
+        unlink_shared(self.path)
         with open(self.path, "w") as f:
             logger.info(f"Saving to {self.path}")
             f.write(text)
@@ -66,7 +73,23 @@ class LinuxStorageService(StorageService):
         if not self.temp_file_name:
             return
 
+        unlink_shared(self.path)
         shutil.copy(self.temp_file_name, self.path)
         logger.info(f"Saved {self.temp_file_name} to {self.path}")
 
         self.update_permissions(path=self.path)
+
+    def local_copy(self) -> Optional[Path]:
+        """Return the document last saved, as it is saved locally."""
+        path = getattr(self, "path", None)
+        return path if path and path.exists() else None
+
+    def save_copy(self, source: Path) -> None:
+        """Save a copy of a document already rendered to the local file source."""
+        if self.path.resolve() == Path(source).resolve():
+            return
+
+        copy_file(source, self.path)
+        logger.info(f"Saved a copy of {source} to {self.path}")
+
+        self.update_permissions(path=self.path)
@@ -1,21 +1,45 @@
 """Define the S3 compatiable file access class."""
 
+import os
 import tempfile
 from pathlib import Path
+from typing import Optional
 
-import boto3
-from botocore.config import Config
+from boto3.s3.transfer import TransferConfig
 from jinja2 import Template
 from loguru import logger
 
+from autodoc.config import S3_MULTIPART_CHUNK_MB, S3_MULTIPART_THRESHOLD_MB, S3_UPLOAD_CONCURRENCY
+
 from .base import StorageService
+from .clients import s3_client
+from .file_cache import read_through
+from .uploads import UploadQueue
 
+TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=S3_MULTIPART_THRESHOLD_MB * 2**20,
+    multipart_chunksize=S3_MULTIPART_CHUNK_MB * 2**20,
+    max_concurrency=S3_UPLOAD_CONCURRENCY,
+)
 
-class S3StorageService(StorageService):
-    """Accessing files on S3 compatible object storage."""
 
-    def __init__(self, root: str, relative: str, url: str, username: str, password: str):
-        """Initialise with the root and relative paths."""
+class S3StorageService(StorageService):
+    """
+    Accessing files on S3 compatible object storage.
+
+    Saves are uploaded in the background, so flush must be called to wait for them.
+    """
+
+    def __init__(
+        self,
+        root: str,
+        relative: str,
+        url: str,
+        username: str,
+        password: str,
+        instance_id: Optional[int] = None,
+    ):
+        """Initialise with the root and relative paths, using the process's client for url."""
         self.bucket = root
         self.filename_raw = relative
 
@@ -24,13 +48,11 @@ class S3StorageService(StorageService):
         if not url.startswith(("http://", "https://")):
             url = f"https://{url}"
 
-        self.client = boto3.client(
-            "s3",
-            endpoint_url=url,
-            aws_access_key_id=username,
-            aws_secret_access_key=password,
-            config=Config(signature_version="s3v4"),
-        )
+        # identifies the object in the remote file cache.
+        self.location = ("s3", instance_id if instance_id is not None else url, root, relative)
+
+        self.client = s3_client(url, username, password, instance_id=instance_id, owner=self)
+        self.uploads = UploadQueue()
 
         self.filename = ""
 
@@ -40,15 +62,18 @@ class S3StorageService(StorageService):
         return Path(self.filename)
 
     def get_file(self) -> Path:
-        """Get a file, return a path that can be used in an open() function."""
-        with tempfile.NamedTemporaryFile(delete=False) as temp_file:
-            temp_file_name = temp_file.name
-            logger.debug(f"Temporary file created: {temp_file_name}")
+        """
+        Get a file, return a path that can be used in an open() function.
 
-        self.client.download_file(self.bucket, self.filename_raw, temp_file_name)
-        logger.info(f"File downloaded from bucket: {self.bucket}, filename: {self.filename_raw}")
+        The file is read through the remote file cache, so it is only downloaded again
+        once its ETag changes. The path must not be written to.
+        """
+        return read_through(self.location, self.get_version, self.download)
 
-        return Path(temp_file_name)
+    def download(self, path: Path):
+        """Download the file to path."""
+        self.client.download_file(self.bucket, self.filename_raw, str(path))
+        logger.info(f"File downloaded from bucket: {self.bucket}, filename: {self.filename_raw}")
 
     def get_text(self) -> str:
         """Get the text content of a file."""
@@ -66,26 +91,47 @@ class S3StorageService(StorageService):
 
         return text
 
-    def save_text(self, text) -> None:
-        """Save some text to storage."""
-        with tempfile.NamedTemporaryFile(delete=True) as temp_file:
-            temp_file_name = temp_file.name
-            logger.info(f"Temporary file created: {temp_file_name}")
-
-            with open(temp_file_name, "w") as f:
-                f.write(text)
+    def get_version(self) -> str:
+        """Return the ETag of the object without downloading it."""
+        response = self.client.head_object(Bucket=self.bucket, Key=self.filename_raw)
+        return response["ETag"]
 
-            self.client.upload_file(temp_file_name, self.bucket, self.filename)
+    def save_text(self, text) -> None:
+        """Save some text to storage, straight from memory."""
+        body, bucket, key = text.encode(), self.bucket, self.filename
+        self.uploads.submit(lambda: self.client.put_object(Bucket=bucket, Key=key, Body=body))
+        logger.info(f"uploading text to s3: {bucket=}, {key=}")
 
     def save_file(self):
-        """Save the temporary file to storage."""
+        """
+        Save the temporary file to storage.
+
+        Small files are read into memory and sent in one request, larger ones are sent as
+        a multipart upload of concurrent parts.
+        """
         if not self.temp_file_name:
             return
 
-        self.client.upload_file(self.temp_file_name, self.bucket, self.filename)
-        logger.info(
-            f"uploading file to s3: {self.temp_file_name=}, {self.bucket=}, {self.filename=}"
-        )
+        temp_file_name, bucket, key = self.temp_file_name, self.bucket, self.filename
+
+        if os.path.getsize(temp_file_name) <= TRANSFER_CONFIG.multipart_threshold:
+            with open(temp_file_name, "rb") as f:
+                body = f.read()
+            self.uploads.submit(lambda: self.client.put_object(Bucket=bucket, Key=key, Body=body))
+        else:
+            self.uploads.submit(
+                lambda: self.client.upload_file(temp_file_name, bucket, key, Config=TRANSFER_CONFIG)
+            )
+
+        logger.info(f"uploading file to s3: {temp_file_name=}, {bucket=}, {key=}")
+
+    def flush(self) -> None:
+        """Wait for the uploads still in progress, raising if any failed."""
+        self.uploads.wait()
+
+    def pending_saves(self) -> int:
+        """Return the number of uploads from the oldest still in progress, raising if one failed."""
+        return self.uploads.in_progress()
 
     def render(self, data: dict):
         """Render the appropriate fields in this class with the finalised data."""
@@ -1,20 +1,24 @@
 """Define the SharePoint compatiable file access class."""
 
+import os
 import tempfile
 from pathlib import Path
 
 from jinja2 import Template
 from loguru import logger
-from office365.runtime.auth.user_credential import UserCredential
 from office365.sharepoint.client_context import ClientContext
 
+from autodoc.config import SHAREPOINT_CHUNK_MB
+
 from .base import StorageService
+from .clients import sharepoint_context
+from .file_cache import read_through
 
 
 class SharePointSiteStorageService(StorageService):
     """Accessing files on Microsoft SharePoint."""
 
-    def __init__(self, root, relative, url, username, password):
+    def __init__(self, root, relative, url, username, password, instance_id=None):
         """
         Initialise with the root and relative paths.
 
@@ -22,19 +26,38 @@ class SharePointSiteStorageService(StorageService):
         url: sharepoint url + site e.g. https://malkinautomation.sharepoint.com/sites/MySite
         relative: the file within that library: /templates/Template.docx
         username + password: for UserContext
+        instance_id: the StorageInstance, whose login is shared by the process's services
         """
         self.url = url
+        self.username = username
+        self.password = password
+        self.instance_id = instance_id
         self.library = root
         self.relative_file_path = relative
 
-        user_credentials = UserCredential(user_name=username, password=password)
-        self.ctx = ClientContext(url).with_credentials(user_credentials)
-
-        logger.info("request context created")
+        # identifies the file in the remote file cache.
+        self.location = (
+            "sharepoint", instance_id if instance_id is not None else url, root, relative
+        )
 
         self.filename = ""
         self.temp_file_name = ""
 
+        # the folders this service has already ensured exist.
+        self.ensured_folders: set[str] = set()
+
+    @property
+    def ctx(self) -> ClientContext:
+        """
+        Return the SharePoint context of the calling thread.
+
+        A source's service is created on one thread and may be loaded on another, so
+        the context is looked up for each request.
+        """
+        return sharepoint_context(
+            self.url, self.username, self.password, instance_id=self.instance_id, owner=self
+        )
+
     @property
     def path(self) -> Path:
         """For consistency."""
@@ -46,19 +69,22 @@ class SharePointSiteStorageService(StorageService):
         logger.info("Rendering the filename to {self.filename=}")
 
     def get_file(self) -> Path:
-        """Get a file, return a path that can be used in an open() function."""
-        with tempfile.NamedTemporaryFile(delete=False) as temp_file:
-            temp_file_name = temp_file.name
-            logger.info(f"Temporary file created: {temp_file_name}")
+        """
+        Get a file, return a path that can be used in an open() function.
+
+        The file is read through the remote file cache, so it is only downloaded again
+        once its ETag changes. The path must not be written to.
+        """
+        return read_through(self.location, self.get_version, self.download)
 
+    def download(self, path: Path):
+        """Download the file to path."""
         relative_file_url = str(Path(self.library) / self.relative_file_path)
         logger.info(f"{relative_file_url=}")
 
-        with open(temp_file_name, "wb") as local_file:
+        with open(path, "wb") as local_file:
             (self.ctx.web.get_file_by_server_relative_path(relative_file_url).download(local_file).execute_query())
-            logger.info(f"file has been downloaded into: {temp_file_name}")
-
-        return Path(temp_file_name)
+            logger.info(f"file has been downloaded into: {path}")
 
     def get_text(self) -> str:
         """Get the text content of a file."""
@@ -76,17 +102,40 @@ class SharePointSiteStorageService(StorageService):
 
         return text
 
-    def ensure_dir(self):
-        """Ensure the directory structure exists for file path: path."""
-        logger.info("Ensuring directory structure exists")
+    def get_version(self) -> str | None:
+        """Return the ETag of the file without downloading it."""
+        relative_file_url = str(Path(self.library) / self.relative_file_path)
+        file = self.ctx.web.get_file_by_server_relative_path(relative_file_url).get().execute_query()
+        return file.properties.get("ETag")
+
+    def ensure_dir(self) -> str:
+        """
+        Ensure the folder of the rendered file path exists, returning it.
+
+        Each folder is only ensured once by a service, which lasts a run, so documents
+        saved to the same folder don't each check it again.
+        """
+        parent_path = str((Path(self.library) / self.filename).parent)
 
-        full_path = Path(self.library) / Path(self.relative_file_path)
+        if parent_path not in self.ensured_folders:
+            logger.info(f"Ensuring the {parent_path=}")
+            _ = self.ctx.web.ensure_folder_path(parent_path).get().select(["ServerRelativePath"]).execute_query()
+            self.ensured_folders.add(parent_path)
 
-        parent_path = str(full_path.parent)
-        logger.info(f"Ensuring the {parent_path=}")
-        _ = self.ctx.web.ensure_folder_path(parent_path).get().select(["ServerRelativePath"]).execute_query()
         return parent_path
 
+    def upload(self, content: bytes):
+        """
+        Upload content to the rendered file path.
+
+        The request is sent straight away, as the context is shared by the thread's
+        services and anything left queued on it would be sent by whichever executes next.
+        """
+        folder = self.ctx.web.get_folder_by_server_relative_url(self.ensure_dir())
+        file_name = Path(self.filename).name
+        folder.files.add(file_name, content, True).execute_query()
+        logger.info(f"uploaded {file_name=}")
+
     def save_text(self, text) -> None:
         """Save some text to storage. Must render first."""
         if not self.filename:
@@ -94,36 +143,28 @@ class SharePointSiteStorageService(StorageService):
             return
 
         logger.info(f"rendered filename is {self.filename}")
-
-        parent_path = self.ensure_dir()
-
-        with tempfile.NamedTemporaryFile(delete=True) as temp_file:
-            temp_file_name = temp_file.name
-            logger.info(f"Temporary file created: {temp_file_name}")
-
-            with open(temp_file_name, "w") as f:
-                f.write(text)
-
-            with open(temp_file_name, "rb") as file_content:
-                folder = self.ctx.web.get_folder_by_server_relative_url(parent_path)
-                file_name = Path(self.filename).name
-                logger.info(f"{file_name=}")
-                file = folder.files.upload(file_content, file_name=file_name).execute_query()
-                logger.info(f"File uploaded into: {file.serverRelativeUrl}")
+        self.upload(text.encode())
 
     def save_file(self) -> None:
-        """Save a file to storage."""
+        """
+        Save a file to storage.
+
+        Small files are read into memory and uploaded in one request, larger ones are
+        uploaded in chunks.
+        """
         if not self.temp_file_name or not self.filename:
             logger.warning("Make sure render is called first.")
             return
 
         logger.info(f"saving {self.temp_file_name=} to {self.filename=}")
 
-        parent_path = self.ensure_dir()
+        if os.path.getsize(self.temp_file_name) <= SHAREPOINT_CHUNK_MB * 2**20:
+            with open(self.temp_file_name, "rb") as f:
+                self.upload(f.read())
+            return
 
-        with open(self.temp_file_name, "rb") as file_content:
-            folder = self.ctx.web.get_folder_by_server_relative_url(parent_path)
-            file_name = Path(self.filename).name
-            logger.info(f"{file_name=}")
-            file = folder.files.upload(file_content, file_name=file_name).execute_query()
-            logger.info(f"File uploaded into: {file.serverRelativeUrl}")
+        folder = self.ctx.web.get_folder_by_server_relative_url(self.ensure_dir())
+        file = folder.files.create_upload_session(
+            self.temp_file_name, SHAREPOINT_CHUNK_MB * 2**20, file_name=Path(self.filename).name
+        ).execute_query()
+        logger.info(f"File uploaded into: {file.serverRelativeUrl}")
@@ -0,0 +1,78 @@
+"""Run uploads in the background, so the next document is rendered while the last is sent."""
+
+import os
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Optional
+
+from autodoc.config import S3_UPLOAD_WORKERS
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_pid: Optional[int] = None
+_executor_lock = threading.Lock()
+
+
+def get_upload_executor() -> ThreadPoolExecutor:
+    """
+    Return the process's upload threads, starting them on first use.
+
+    Threads don't survive a fork, so a forked pool process starts its own.
+    """
+    global _executor, _executor_pid
+
+    with _executor_lock:
+        if _executor is None or _executor_pid != os.getpid():
+            _executor = ThreadPoolExecutor(
+                max_workers=S3_UPLOAD_WORKERS, thread_name_prefix="autodoc-upload"
+            )
+            _executor_pid = os.getpid()
+
+    return _executor
+
+
+class UploadQueue:
+    """
+    The uploads of a storage service still in progress.
+
+    Uploads run on the process's upload threads. At most max_pending are in progress
+    at once, after which adding another waits for the oldest, so rendering never gets
+    far ahead of uploading. With 0 workers, uploads run straight away instead.
+    """
+
+    def __init__(self, workers: int = S3_UPLOAD_WORKERS):
+        """Create an empty queue."""
+        self.workers = workers
+        self.max_pending = workers * 2
+        self.pending: deque[Future] = deque()
+
+    def submit(self, upload: Callable[[], None]):
+        """Start upload in the background, or run it now if there are no upload threads."""
+        if self.workers <= 0:
+            upload()
+            return
+
+        while len(self.pending) >= self.max_pending:
+            self.pending.popleft().result()
+
+        self.pending.append(get_upload_executor().submit(upload))
+
+    def in_progress(self) -> int:
+        """Return the number of uploads from the oldest still in progress, raising if one failed."""
+        while self.pending and self.pending[0].done():
+            self.pending.popleft().result()
+
+        return len(self.pending)
+
+    def wait(self):
+        """Wait for every upload in progress, raising the error of the first that failed."""
+        error: Optional[BaseException] = None
+
+        while self.pending:
+            try:
+                self.pending.popleft().result()
+            except Exception as e:
+                error = error or e
+
+        if error:
+            raise error
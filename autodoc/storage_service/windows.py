@@ -2,16 +2,18 @@
 
 import shutil
 from pathlib import Path, PureWindowsPath
+from typing import Optional
 
 from jinja2 import Template
+from loguru import logger
 
-from .base import StorageService
+from .base import StorageService, copy_file, unlink_shared
 
 
 class WindowsStorageService(StorageService):
     """Accessing files on Windows based file shares."""
 
-    def __init__(self, root, relative, url=None, username=None, password=None):
+    def __init__(self, root, relative, url=None, username=None, password=None, instance_id=None):
         """Initialise with the root and relative paths."""
         self.root_path_raw = root
         self.relative_path_raw = relative
@@ -48,8 +50,14 @@ class WindowsStorageService(StorageService):
         """Get the path of the file."""
         return self.get_raw_file_path()
 
+    def get_version(self) -> str:
+        """Return the size and modification time of the file."""
+        stat = self.get_raw_file_path().stat()
+        return f"{stat.st_size}-{stat.st_mtime_ns}"
+
     def save_text(self, text) -> None:
         """Save a text to storage."""
+        unlink_shared(self.path)
         with open(self.path, "w") as f:
             f.write(text)
 
@@ -58,6 +66,22 @@ class WindowsStorageService(StorageService):
         if not self.temp_file_name:
             return
 
+        unlink_shared(self.path)
         shutil.copy(self.temp_file_name, self.path)
 
         self.update_permissions(path=self.path)
+
+    def local_copy(self) -> Optional[Path]:
+        """Return the document last saved, as it is saved locally."""
+        path = getattr(self, "path", None)
+        return path if path and path.exists() else None
+
+    def save_copy(self, source: Path) -> None:
+        """Save a copy of a document already rendered to the local file source."""
+        if self.path.resolve() == Path(source).resolve():
+            return
+
+        copy_file(source, self.path)
+        logger.info(f"Saved a copy of {source} to {self.path}")
+
+        self.update_permissions(path=self.path)
@@ -1,25 +1,126 @@
 """Handle the zipping and finalisation of generated outcomes."""
 
+import os
 import zipfile
 from pathlib import Path
+from typing import Optional
+
+from loguru import logger
+
+# formats that are already compressed, so are stored in the zip rather than compressed again.
+STORED_SUFFIXES = frozenset(
+    {".docx", ".xlsx", ".pptx", ".pdf", ".zip", ".gz", ".png", ".jpg", ".jpeg", ".gif", ".webp"}
+)
+
+
+def compression_for(path: Path) -> int:
+    """Return the zip compression of a file, storing it if it is already compressed."""
+    return zipfile.ZIP_STORED if path.suffix.lower() in STORED_SUFFIXES else zipfile.ZIP_DEFLATED
+
+
+def file_version(path: Path) -> tuple[int, int]:
+    """Return the size and modification time of a file, to tell if it has changed."""
+    stat = path.stat()
+    return stat.st_size, stat.st_mtime_ns
 
 
 class Archiver:
-    """Service class."""
+    """
+    Service class.
+
+    Documents can be added to the zip as each one is saved, between start and
+    zip_downloads, so the zip is ready as soon as the last document is. It is written
+    to a .part file and only renamed to the .zip once complete.
+    """
+
+    def __init__(self):
+        """Create an archiver with no zip open."""
+        self.zip_file: Optional[zipfile.ZipFile] = None
+        self.download_dir: Optional[Path] = None
+        self.added: dict[str, tuple[int, int]] = {}
+        self.stale = False
+
+    @staticmethod
+    def zip_path(download_dir: Path) -> Path:
+        """Return the path of the zip of a download directory."""
+        return download_dir.parent / (download_dir.name + ".zip")
+
+    @classmethod
+    def part_path(cls, download_dir: Path) -> Path:
+        """Return the path the zip of a download directory is written to until complete."""
+        return cls.zip_path(download_dir).with_suffix(".zip.part")
+
+    def start(self, download_dir: Path):
+        """Open the zip of download_dir, so documents can be added as they are saved."""
+        self.download_dir = download_dir.resolve()
+        self.added = {}
+        self.stale = False
+        self.zip_file = zipfile.ZipFile(
+            self.part_path(download_dir), "w", zipfile.ZIP_DEFLATED, allowZip64=True
+        )
+
+    def add(self, path: Optional[Path]):
+        """Add a saved document to the zip, if it is one of the downloads."""
+        if self.zip_file is None or path is None:
+            return
+
+        path = Path(path)
+        if path.resolve().parent != self.download_dir or not path.is_file():
+            return
+
+        if path.name in self.added:
+            # saved over an earlier document, which can't be taken back out of the zip.
+            self.stale = True
+            return
+
+        version = file_version(path)
+        self.zip_file.write(path, arcname=path.name, compress_type=compression_for(path))
+        self.added[path.name] = version
 
     def zip_downloads(self, download_dir: Path):
         """
         Zip downloads into a downloadable file.
 
         All files found in the download dir are for this instance, so can be
-        zipped together. A future update could check each filename.
+        zipped together. Any not already added as they were saved are added now. If a
+        file was saved over after being added, the zip is written again from scratch.
         """
+        if self.zip_file is None:
+            self.start(download_dir)
+
         files_to_zip = [f for f in download_dir.iterdir() if f.is_file()]
 
-        if files_to_zip:
-            zip_filename = download_dir.name + ".zip"
-            zip_filepath = download_dir.parent / zip_filename
+        for file_path in files_to_zip:
+            version = self.added.get(file_path.name)
+            if version is None:
+                self.add(file_path)
+            elif version != file_version(file_path):
+                self.stale = True
+
+        if self.stale:
+            logger.info(f"Downloads in {download_dir} changed after being zipped, zipping again")
+            self.discard()
+            self.start(download_dir)
+            for file_path in files_to_zip:
+                self.add(file_path)
+
+        assert self.zip_file is not None
+        self.zip_file.close()
+        self.zip_file = None
+
+        if self.added:
+            os.replace(self.part_path(download_dir), self.zip_path(download_dir))
+            logger.info(f"Zipped {len(self.added)} downloads to {self.zip_path(download_dir)}")
+        else:
+            self.part_path(download_dir).unlink(missing_ok=True)
+
+    def discard(self):
+        """Close and remove a zip that is being written, such as when the run fails."""
+        if self.zip_file is None:
+            return
+
+        self.zip_file.close()
+        self.zip_file = None
 
-            with zipfile.ZipFile(zip_filepath, "w", zipfile.ZIP_DEFLATED) as zipf:
-                for file_path in files_to_zip:
-                    zipf.write(file_path, arcname=file_path.name)
+        assert self.download_dir is not None
+        self.part_path(self.download_dir).unlink(missing_ok=True)
@@ -1,30 +1,109 @@
 """Handle generating documents, represented by Outcomes."""
 
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from itertools import islice
 from pathlib import Path
+from typing import Iterable, Iterator, Optional, Sequence
 
 from loguru import logger
 
+from autodoc.config import CONTEXT_BATCH_SIZE, DB_PATH
 from autodoc.data import DatabaseManager
 from autodoc.data.tables import Outcome, OutcomeInstance, WorkflowInstance
+from autodoc.outcome import OutcomeService
+from autodoc.outcome.template_fields import combine, path_fields, project
 
+from .archiver import Archiver
 from .outcome_service_factory import OutcomeServiceFactory
+from .render_dedup import RenderedDocuments, render_key
+from .status_buffer import OutcomeStatusBuffer
+
+# each process in the pool has its own database session and factory, set by _init_worker,
+# and builds each outcome's service once, on its first document.
+_worker_manager: Optional[DatabaseManager] = None
+_worker_factory: Optional[OutcomeServiceFactory] = None
+_worker_services: dict[tuple, OutcomeService] = {}
+
+
+def _init_worker(db_file: str) -> None:
+    """Create the database manager and outcome service factory for a pool process."""
+    global _worker_manager, _worker_factory
+    _worker_manager = DatabaseManager(db_file=db_file)
+    _worker_factory = OutcomeServiceFactory()
+    _worker_services.clear()
+
+
+def _render_in_worker(
+    outcome_id: int, context: dict, download_dir: Optional[Path], uploaded_filename: Optional[str]
+) -> tuple[str, Optional[Path]]:
+    """
+    Render and save a single outcome inside a pool process.
+
+    Returns the rendered name so the parent process can update the OutcomeInstance, and
+    the local file of the document, if one is kept, so identical documents can be copied.
+    """
+    assert _worker_manager is not None and _worker_factory is not None
+
+    service_key = (outcome_id, download_dir, uploaded_filename)
+    if service_key not in _worker_services:
+        _worker_services[service_key] = _worker_factory.create(
+            outcome=_worker_manager.outcomes.get(outcome_id=outcome_id),
+            download_dir=download_dir,
+            template_uploaded_filename=uploaded_filename,
+        )
+
+    outcome_service = _worker_services[service_key]
+    outcome_service.reset()
+
+    outcome_service.render(data=context)
+    outcome_service.save()
+    # the pool already renders in parallel, so each worker waits for its own upload.
+    outcome_service.flush()
+
+    return outcome_service.output_storage_service.path.name, outcome_service.saved_file()
 
 
 class OutcomeProcessor:
     """Processor of outcomes."""
 
-    def __init__(self, outcome_service_factory: OutcomeServiceFactory, manager: DatabaseManager):
-        """Create an OutcomeProcessor with a service factory and manager instance."""
+    def __init__(
+        self,
+        outcome_service_factory: OutcomeServiceFactory,
+        manager: DatabaseManager,
+        workers: int = 1,
+        db_file: str = DB_PATH,
+        batch_size: int = CONTEXT_BATCH_SIZE,
+    ):
+        """
+        Create an OutcomeProcessor with a service factory and manager instance.
+
+        workers: the number of processes used to render outcomes. With 1 worker,
+        outcomes are rendered one after another in this process.
+        db_file: the database each pool process connects to, to load its Outcomes.
+        batch_size: the number of streamed contexts to create outcome instances for at once.
+        """
         self.factory = outcome_service_factory
         self.manager = manager
+        self.workers = workers
+        self.db_file = db_file
+        self.batch_size = batch_size
+
+        # the outcome services of the current run, by Outcome Id.
+        self.services: dict[int, OutcomeService] = {}
+        # the instances each service has saved, oldest first, that may still be uploading.
+        self.saving: dict[int, deque[tuple[int, str]]] = {}
 
     def process(
         self,
         outcomes: list[Outcome],
-        contexts: list[dict],
+        contexts: Iterable[dict],
         workflow_instance: WorkflowInstance,
         upload_mapping: dict,
         download_dir: Path,
+        archiver: Optional[Archiver] = None,
+        fields: Optional[dict[int, Optional[frozenset[str]]]] = None,
+        template_fields: Optional[dict[int, Optional[frozenset[str]]]] = None,
     ):
         """
         Create all outcomes for each context.
@@ -32,44 +111,269 @@ class OutcomeProcessor:
         We create the outcome instances first before processing because it is
         being continuously queried by the user on the dashboard, so we want to
         load them all as "unfinished" so the user can see ok there are 100
-        outcomes to be processed.
+        outcomes to be processed. If contexts is a stream rather than a list, they
+        are instead created a batch of contexts at a time, as the contexts arrive.
+
+        Then we go through and actually process them, either in this process or
+        across a pool of processes if more than one worker is configured. Completed
+        instances are written back in batches by an OutcomeStatusBuffer, once their
+        saves, which may upload in the background, have finished. Each outcome
+        is only given the context fields its templates read, and a document identical
+        to one already rendered is copied rather than rendered again.
+
+        If an archiver is given, each download is added to its zip as soon as it is saved.
+        fields and template_fields are as returned by find_fields, which is called if
+        they aren't given.
+        """
+        outcome_array = self.iter_outcome_instances(outcomes, contexts, workflow_instance)
+
+        status_buffer = OutcomeStatusBuffer(manager=self.manager)
+        if fields is None or template_fields is None:
+            fields, template_fields = self.find_fields(outcomes, upload_mapping)
+        self.services = {}
+        self.saving = {}
+
+        try:
+            if self.workers > 1:
+                self.process_parallel(
+                    outcome_array,
+                    upload_mapping,
+                    download_dir,
+                    status_buffer,
+                    fields=fields,
+                    template_fields=template_fields,
+                    archiver=archiver,
+                )
+            else:
+                self.process_serial(
+                    outcome_array,
+                    upload_mapping,
+                    download_dir,
+                    status_buffer,
+                    fields=fields,
+                    template_fields=template_fields,
+                    archiver=archiver,
+                )
+
+            # saves may still be uploading in the background.
+            for outcome_id, outcome_service in self.services.items():
+                outcome_service.flush()
+                self.record_saved(outcome_id, status_buffer)
+        finally:
+            status_buffer.flush()
+            self.services = {}
+            self.saving = {}
+
+    def get_service(
+        self, outcome: Outcome, upload_mapping: dict, download_dir: Path
+    ) -> OutcomeService:
+        """
+        Return the outcome's service, ready to render its next document.
+
+        Each outcome's service is built once per run, so its templates and storage
+        clients are reused for every document, and only its per document state is reset.
+        """
+        if outcome.Id not in self.services:
+            self.services[outcome.Id] = self.factory.create(
+                outcome=outcome,
+                download_dir=download_dir if outcome.is_download else None,
+                template_uploaded_filename=upload_mapping.get(outcome.Name),
+            )
+
+        outcome_service = self.services[outcome.Id]
+        outcome_service.reset()
+        return outcome_service
+
+    def saved(
+        self, outcome_id: int, instance_id: int, rendered_name: str, status_buffer: OutcomeStatusBuffer
+    ):
+        """Record an outcome instance saved by the outcome's service, once its save finishes."""
+        self.saving.setdefault(outcome_id, deque()).append((instance_id, rendered_name))
+        self.record_saved(outcome_id, status_buffer)
+
+    def record_saved(self, outcome_id: int, status_buffer: OutcomeStatusBuffer):
+        """
+        Record the outcome's instances whose saves have finished as complete.
+
+        The service's pending saves count from the oldest still in progress, so every
+        instance saved before those has finished. Raises if a save failed.
+        """
+        saving = self.saving.get(outcome_id, deque())
+        pending = self.services[outcome_id].pending_saves()
+
+        while len(saving) > pending:
+            instance_id, rendered_name = saving.popleft()
+            status_buffer.add(outcome_instance_id=instance_id, rendered_name=rendered_name)
+
+    def find_fields(
+        self, outcomes: list[Outcome], upload_mapping: dict
+    ) -> tuple[dict[int, Optional[frozenset[str]]], dict[int, Optional[frozenset[str]]]]:
+        """
+        Return the context fields each outcome reads, and those its template reads, by Outcome Id.
+
+        Each template is fetched and parsed once, and the fields of the output path added
+        to its own. None means the fields aren't known, such as for a template that
+        doesn't parse, and the outcome is given the whole context.
+        """
+        fields: dict[int, Optional[frozenset[str]]] = {}
+        template_fields: dict[int, Optional[frozenset[str]]] = {}
+        for outcome in outcomes:
+            try:
+                template_fields[outcome.Id] = self.factory.template_fields(
+                    outcome=outcome, template_uploaded_filename=upload_mapping.get(outcome.Name)
+                )
+                fields[outcome.Id] = combine([template_fields[outcome.Id], path_fields(outcome)])
+            except Exception as e:
+                logger.warning(f"Can't find the fields of outcome {outcome.Id}, passing all: {e}")
+                fields[outcome.Id] = None
+                template_fields.setdefault(outcome.Id, None)
+
+            logger.info(f"Outcome {outcome.Id} reads fields {fields[outcome.Id]}")
+
+        return fields, template_fields
+
+    def process_serial(
+        self,
+        outcome_array: Iterable[dict],
+        upload_mapping: dict,
+        download_dir: Path,
+        status_buffer: OutcomeStatusBuffer,
+        fields: Optional[dict[int, Optional[frozenset[str]]]] = None,
+        template_fields: Optional[dict[int, Optional[frozenset[str]]]] = None,
+        archiver: Optional[Archiver] = None,
+    ):
+        """
+        Render each outcome instance one after another in this process.
 
-        Then we go through and actually process them.
+        A document whose template reads the same values as one already rendered is
+        copied from it instead.
         """
-        outcome_array = self.build_outcome_instance_array(outcomes, contexts, workflow_instance)
-        logger.info(f"Total outcome instances to process: {len(outcome_array)}")
+        fields = fields or {}
+        template_fields = template_fields or {}
+        documents = RenderedDocuments()
 
         for outcome_info in outcome_array:
             outcome = outcome_info["outcome"]
             outcome_instance = outcome_info["instance"]
-            context = outcome_info["context"]
+            context = project(outcome_info["context"], fields.get(outcome.Id))
+            key = render_key(outcome.Id, context, template_fields.get(outcome.Id))
 
             logger.debug(f"Processing {outcome_instance.Id=}, with context {context}")
 
-            uploaded_filename = upload_mapping.get(outcome.Name)
+            outcome_service = self.get_service(outcome, upload_mapping, download_dir)
 
-            outcome_service = self.factory.create(
-                outcome=outcome,
-                download_dir=download_dir if outcome.is_download else None,
-                template_uploaded_filename=uploaded_filename,
-            )
+            if source := documents.get(key):
+                logger.debug(f"Copying identical document {source}")
+                outcome_service.save_copy(data=context, source=source)
+                documents.overwritten(outcome_service.saved_file())
+            else:
+                outcome_service.render(data=context)
+                outcome_service.save()
+                documents.add(key, outcome_service.saved_file())
 
-            outcome_service.render(data=context)
-            outcome_service.save()
+            if archiver:
+                archiver.add(outcome_service.saved_file())
 
-            self.manager.outcome_instances.set_complete(outcome_instance_id=outcome_instance.Id)
-            self.manager.outcome_instances.set_rendered_name(
-                outcome_instance_id=outcome_instance.Id,
-                rendered_name=outcome_service.output_storage_service.path.name,
+            self.saved(
+                outcome.Id,
+                outcome_instance.Id,
+                outcome_service.output_storage_service.path.name,
+                status_buffer,
             )
 
-            self.manager.commit()
+    def save_copy(
+        self,
+        outcome: Outcome,
+        context: dict,
+        source: Path,
+        upload_mapping: dict,
+        download_dir: Path,
+    ) -> tuple[str, Optional[Path]]:
+        """Save a copy of the document at source for context. Returns its name and local file."""
+        outcome_service = self.get_service(outcome, upload_mapping, download_dir)
+        outcome_service.save_copy(data=context, source=source)
+
+        return outcome_service.output_storage_service.path.name, outcome_service.saved_file()
+
+    def process_parallel(
+        self,
+        outcome_array: Iterable[dict],
+        upload_mapping: dict,
+        download_dir: Path,
+        status_buffer: OutcomeStatusBuffer,
+        fields: Optional[dict[int, Optional[frozenset[str]]]] = None,
+        template_fields: Optional[dict[int, Optional[frozenset[str]]]] = None,
+        archiver: Optional[Archiver] = None,
+    ):
+        """
+        Render the outcome instances across a pool of processes.
+
+        Each process builds its own OutcomeService from the Outcome Id, so only the
+        Id, the context fields the outcome reads and paths are sent to it. Completion
+        is recorded here as each document finishes, so the dashboard progress updates
+        as it would serially.
+
+        Only a couple of documents per worker are submitted ahead, so a streamed
+        outcome_array is not pulled into memory faster than it can be rendered.
+
+        A document whose template reads the same values as one already rendered is
+        copied from it here instead. If that document is still being rendered, the
+        copy waits for it.
+        """
+        logger.info(f"Rendering outcomes with {self.workers} worker processes")
+        max_in_flight = self.workers * 2
+        fields = fields or {}
+        template_fields = template_fields or {}
+
+        with ProcessPoolExecutor(
+            max_workers=self.workers, initializer=_init_worker, initargs=(self.db_file,)
+        ) as executor:
+            run = ParallelRun(self, executor, upload_mapping, download_dir, status_buffer, archiver)
+
+            for outcome_info in outcome_array:
+                run.wait(max_in_flight - 1)
+
+                outcome = outcome_info["outcome"]
+                context = project(outcome_info["context"], fields.get(outcome.Id))
+                run.add(
+                    outcome_info["instance"].Id,
+                    outcome,
+                    context,
+                    key=render_key(outcome.Id, context, template_fields.get(outcome.Id)),
+                )
+
+            run.wait(0)
+
+    def iter_outcome_instances(
+        self, outcomes: list[Outcome], contexts: Iterable[dict], workflow_instance: WorkflowInstance
+    ) -> Iterator[dict]:
+        """
+        Yield each outcome and context to build, creating the outcome instances as needed.
+
+        A list of contexts has all its outcome instances created up front. Any other
+        iterable is consumed batch_size contexts at a time, so a stream of contexts is
+        never held in memory all at once.
+        """
+        if isinstance(contexts, list):
+            outcome_array = self.build_outcome_instance_array(outcomes, contexts, workflow_instance)
+            logger.info(f"Total outcome instances to process: {len(outcome_array)}")
+            yield from outcome_array
+            return
+
+        contexts = iter(contexts)
+        while batch := list(islice(contexts, self.batch_size)):
+            outcome_array = self.build_outcome_instance_array(outcomes, batch, workflow_instance)
+            logger.info(f"Outcome instances to process in batch: {len(outcome_array)}")
+            yield from outcome_array
 
     def build_outcome_instance_array(
         self, outcomes: list[Outcome], contexts: list[dict], workflow_instance: WorkflowInstance
     ) -> list[dict]:
-        """Return a full expanded list of each outcome and the context used to build it."""
-        outcome_array = []
+        """
+        Return a full expanded list of each outcome and the context used to build it.
+
+        All the outcome instances are inserted in one statement and committed once.
+        """
         """
         each outcome array is: {
             outcome: Outcome,
@@ -77,23 +381,118 @@ class OutcomeProcessor:
             context: context,
         }
         """
-        for outcome in outcomes:
-            for context in contexts:
-                outcome_instance: OutcomeInstance = self.manager.outcome_instances.add(
-                    outcome_id=outcome.Id, instance_id=workflow_instance.Id
-                )
-                self.manager.commit()
-
-                outcome_array.append(
-                    {
-                        "outcome": outcome,
-                        "instance": outcome_instance,
-                        "context": context,
-                    }
-                )
+        pairs = [(outcome, context) for outcome in outcomes for context in contexts]
 
-        return outcome_array
+        outcome_instances: Sequence[OutcomeInstance] = self.manager.outcome_instances.add_all(
+            outcome_ids=[outcome.Id for outcome, _ in pairs], instance_id=workflow_instance.Id
+        )
+        self.manager.commit()
+
+        return [
+            {
+                "outcome": outcome,
+                "instance": outcome_instance,
+                "context": context,
+            }
+            for (outcome, context), outcome_instance in zip(pairs, outcome_instances, strict=True)
+        ]
 
     def downloads_exist(self, outcomes: list[Outcome]) -> bool:
         """Return whether downloads exist in the outcomes and therefore need to be zipped."""
         return any([outcome.DownloadName for outcome in outcomes])
+
+
+class ParallelRun:
+    """
+    The documents of a parallel run still being rendered by the pool.
+
+    A document whose render key matches one still being rendered waits for it, and is
+    then copied from it, or rendered after all if it left no local file to copy.
+    """
+
+    def __init__(
+        self,
+        processor: OutcomeProcessor,
+        executor: ProcessPoolExecutor,
+        upload_mapping: dict,
+        download_dir: Path,
+        status_buffer: OutcomeStatusBuffer,
+        archiver: Optional[Archiver] = None,
+    ):
+        """Start a run with nothing submitted to executor."""
+        self.processor = processor
+        self.executor = executor
+        self.upload_mapping = upload_mapping
+        self.download_dir = download_dir
+        self.status_buffer = status_buffer
+        self.archiver = archiver
+        self.documents = RenderedDocuments()
+
+        self.futures: dict[Future, tuple[int, Optional[str]]] = {}
+        # render key -> the instances waiting for the document of that key to be rendered.
+        self.waiting: dict[str, list[tuple[int, Outcome, dict]]] = {}
+
+    def add(self, instance_id: int, outcome: Outcome, context: dict, key: Optional[str]):
+        """Render an outcome instance, or copy it from an identical document."""
+        if source := self.documents.get(key):
+            self.copy(instance_id, outcome, context, source=source)
+        elif key in self.waiting:
+            self.waiting[key].append((instance_id, outcome, context))
+        else:
+            if key is not None:
+                self.waiting[key] = []
+            self.submit(instance_id, outcome, context, key=key)
+
+    def submit(self, instance_id: int, outcome: Outcome, context: dict, key: Optional[str]):
+        """Send an outcome instance to the pool to be rendered."""
+        future = self.executor.submit(
+            _render_in_worker,
+            outcome_id=outcome.Id,
+            context=context,
+            download_dir=self.download_dir if outcome.is_download else None,
+            uploaded_filename=self.upload_mapping.get(outcome.Name),
+        )
+        self.futures[future] = (instance_id, key)
+
+    def copy(self, instance_id: int, outcome: Outcome, context: dict, source: Path):
+        """Save an outcome instance as a copy of the identical document at source."""
+        rendered_name, saved = self.processor.save_copy(
+            outcome, context, source, self.upload_mapping, self.download_dir
+        )
+        self.documents.overwritten(saved)
+
+        # the copy is saved here, so may still be uploading.
+        self.processor.saved(outcome.Id, instance_id, rendered_name, self.status_buffer)
+        if self.archiver:
+            self.archiver.add(saved)
+
+    def complete(self, future: Future):
+        """Record a document rendered by the pool, and copy those waiting for it."""
+        instance_id, key = self.futures.pop(future)
+        rendered_name, saved = future.result()
+        self.finished(instance_id, rendered_name, saved)
+
+        if key is None:
+            self.documents.overwritten(saved)
+            return
+
+        self.documents.add(key, saved)
+        for duplicate in self.waiting.pop(key, []):
+            if source := self.documents.get(key):
+                self.copy(*duplicate, source=source)
+            else:
+                # nothing local to copy from, so it is rendered after all.
+                self.submit(*duplicate, key=None)
+
+    def finished(self, instance_id: int, rendered_name: str, saved: Optional[Path]):
+        """Record an outcome instance rendered and saved by the pool, and add its download to the zip."""
+        self.status_buffer.add(outcome_instance_id=instance_id, rendered_name=rendered_name)
+        if self.archiver:
+            self.archiver.add(saved)
+
+    def wait(self, in_flight: int):
+        """Complete documents as they finish, until no more than in_flight are rendering."""
+        while len(self.futures) > in_flight:
+            done, _ = wait(self.futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                self.complete(future)
@@ -11,16 +11,38 @@ from autodoc.outcome.outcome import OutcomeService as OutcomeServiceInterface
 class OutcomeServiceFactory:
     """The outcome service factory."""
 
-    def create(
-        self, outcome: Outcome, download_dir: Optional[Path], template_uploaded_filename: str | None
-    ) -> OutcomeServiceInterface:
-        """Create and return an outcome service instance."""
+    def get_class(self, outcome: Outcome) -> type[OutcomeServiceInterface]:
+        """Return the outcome service class of the outcome's type."""
         outcome_type_name = outcome.outcome_type.Name
         service_class = outcome_service_map.get(outcome_type_name)
 
         if not service_class:
             raise ValueError(f"Unknown outcome type: {outcome_type_name}")
 
+        return service_class
+
+    def template_fields(
+        self, outcome: Outcome, template_uploaded_filename: str | None
+    ) -> Optional[frozenset[str]]:
+        """Return the context fields the outcome's template reads, or None if it may read any."""
+        return self.get_class(outcome).template_fields(
+            outcome=outcome, template_uploaded_filename=template_uploaded_filename
+        )
+
+    def required_fields(
+        self, outcome: Outcome, template_uploaded_filename: str | None
+    ) -> Optional[frozenset[str]]:
+        """Return the context fields the outcome reads, or None if it may read any of them."""
+        return self.get_class(outcome).required_fields(
+            outcome=outcome, template_uploaded_filename=template_uploaded_filename
+        )
+
+    def create(
+        self, outcome: Outcome, download_dir: Optional[Path], template_uploaded_filename: str | None
+    ) -> OutcomeServiceInterface:
+        """Create and return an outcome service instance."""
+        service_class = self.get_class(outcome)
+
         return service_class(
             outcome=outcome,
             download_dir=download_dir,
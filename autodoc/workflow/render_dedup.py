@@ -0,0 +1,86 @@
+"""Remember the documents rendered in a run, so identical ones are copied rather than rendered."""
+
+import hashlib
+import json
+import os
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+from autodoc.config import RENDER_DEDUP_SIZE
+from autodoc.outcome.template_fields import project
+
+
+def render_key(outcome_id: int, context: dict, fields: Optional[frozenset[str]]) -> Optional[str]:
+    """
+    Return a hash of the outcome and the context fields its template reads.
+
+    Contexts with the same key render byte for byte the same document. None if the fields
+    the template reads aren't known, or their values can't be hashed.
+    """
+    if fields is None:
+        return None
+
+    try:
+        inputs = json.dumps([outcome_id, project(context, fields)], sort_keys=True, default=repr)
+    except (TypeError, ValueError):
+        return None
+
+    return hashlib.sha256(inputs.encode()).hexdigest()
+
+
+class RenderedDocuments:
+    """
+    The local files of the documents rendered in a run, by render key.
+
+    At most max_entries are remembered, forgetting the least recently copied first. A
+    document is also forgotten once its file is overwritten by a later one.
+    """
+
+    def __init__(self, max_entries: int = RENDER_DEDUP_SIZE):
+        """Create an empty record of documents."""
+        self.max_entries = max_entries
+        self.entries: OrderedDict[str, Path] = OrderedDict()
+        self.keys_by_path: dict[str, str] = {}
+
+    def get(self, key: Optional[str]) -> Optional[Path]:
+        """Return the file of the document rendered for key, if it still exists."""
+        if key is None or key not in self.entries:
+            return None
+
+        path = self.entries[key]
+        if not path.exists():
+            self.forget(key)
+            return None
+
+        self.entries.move_to_end(key)
+        return path
+
+    def add(self, key: Optional[str], path: Optional[Path]):
+        """Remember the file of the document rendered for key."""
+        self.overwritten(path)
+
+        if key is None or path is None or self.max_entries <= 0:
+            return
+
+        self.forget(key)
+        self.entries[key] = path
+        self.keys_by_path[os.path.abspath(path)] = key
+
+        while len(self.entries) > self.max_entries:
+            self.forget(next(iter(self.entries)))
+
+    def overwritten(self, path: Optional[Path]):
+        """Forget the document whose file was at path, as another was saved over it."""
+        if path is None or not self.entries:
+            return
+
+        key = self.keys_by_path.get(os.path.abspath(path))
+        if key is not None:
+            self.forget(key)
+
+    def forget(self, key: str):
+        """Forget the document rendered for key."""
+        path = self.entries.pop(key, None)
+        if path is not None:
+            self.keys_by_path.pop(os.path.abspath(path), None)
@@ -1,7 +1,12 @@
 """Handle source list based processes, like checking and building contexts."""
 
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Iterator, Optional
+
 from loguru import logger
 
+from autodoc.config import SOURCE_WORKERS
+from autodoc.containers import Context
 from autodoc.data import DatabaseManager
 from autodoc.data.tables import Source, WorkflowInstance
 from autodoc.source import SourceService
@@ -12,10 +17,20 @@ from .source_service_factory import SourceServiceFactory
 class SourceLoader:
     """Service class for SourceService based processes."""
 
-    def __init__(self, source_service_factory: SourceServiceFactory, manager: DatabaseManager):
-        """Create this service."""
+    def __init__(
+        self,
+        source_service_factory: SourceServiceFactory,
+        manager: DatabaseManager,
+        workers: int = SOURCE_WORKERS,
+    ):
+        """
+        Create this service.
+
+        workers: the number of independent sources loaded at the same time.
+        """
         self.factory = source_service_factory
         self.manager = manager
+        self.workers = workers
 
     def check(self, sources: list[Source], upload_mapping: dict) -> tuple[bool, list[str]]:
         """
@@ -41,55 +56,239 @@ class SourceLoader:
         workflow_instance: WorkflowInstance,
         initial_data: dict,
         upload_mapping: dict,
-    ) -> list[dict]:
+        outcome_fields: Optional[frozenset[str]] = None,
+    ) -> list[Context]:
         """
         Build the contexts using cartesian expansion.
 
+        Each source is loaded for all the contexts so far in one call, so sources such
+        as Database sources can batch their queries across contexts. Sources that don't
+        depend on each other (see group_independent) are loaded at the same time on a
+        pool of worker threads, and merged in their original order, so the contexts are
+        the same as loading them one after another.
+
+        The source instances are all created, and committed, before any source is
+        created or loaded. Each group's instances are set as loaded as soon as it has
+        loaded, committing without expiring the Sources, as the worker threads of later
+        groups must not lazy load them from the session.
+
         initial_data: Is assumed to be cleaned of unusable data, such as FileStorage
         parts of a Form.
+        outcome_fields: the context fields the outcomes read, or None if they may read any.
         """
-        contexts = [initial_data]
+        contexts = [Context(initial_data)]
         logger.info(f"Building contexts for {workflow_instance.Id=} with {initial_data=}")
 
-        for source in sources:
-            logger.info(f"processing {source.Id=}: {source.source_type.Name}")
+        source_instances = {
+            source.Id: self.manager.source_instances.add(
+                source_id=source.Id, instance_id=workflow_instance.Id
+            )
+            for source in sources
+        }
+        self.manager.commit()
 
-            uploaded_filename = upload_mapping.get(source.Name)
-            source_service: SourceService = self.factory.create(
-                source=source, uploaded_filename=uploaded_filename
+        source_services = [self.create_service(source, upload_mapping) for source in sources]
+        self.set_downstream_fields(source_services, outcome_fields)
+
+        for group in self.group_independent(source_services):
+            logger.info(f"Loading sources {[service.source.Id for service in group]} together")
+            loaded = self.load_group(group, contexts)
+
+            contexts = [
+                merged
+                for index, context in enumerate(contexts)
+                for merged in self.merge_group(
+                    source_services=group, context=context, data=[data[index] for data in loaded]
+                )
+            ]
+            self.set_loaded(group, source_instances)
+
+        return contexts
+
+    def set_loaded(self, source_services: list[SourceService], source_instances: dict) -> None:
+        """
+        Set the instances of source_services as loaded, by Source Id, and commit.
+
+        The Sources aren't expired, so worker threads can go on reading them.
+        """
+        for source_service in source_services:
+            self.manager.source_instances.set_loaded(
+                source_instance_id=source_instances[source_service.source.Id].Id,
+                cache_hits=source_service.cache_hits,
+                cache_misses=source_service.cache_misses,
             )
-            assert isinstance(source_service, SourceService)
+        self.manager.commit(expire=False)
 
-            source_instance = self.manager.source_instances.add(
-                source_id=source.Id, instance_id=workflow_instance.Id
+    def create_service(self, source: Source, upload_mapping: dict) -> SourceService:
+        """Create the SourceService of source."""
+        logger.info(f"processing {source.Id=}: {source.source_type.Name}")
+
+        uploaded_filename = upload_mapping.get(source.Name)
+        source_service: SourceService = self.factory.create(
+            source=source, uploaded_filename=uploaded_filename
+        )
+        assert isinstance(source_service, SourceService)
+        return source_service
+
+    @staticmethod
+    def set_downstream_fields(
+        source_services: list[SourceService], outcome_fields: Optional[frozenset[str]]
+    ) -> None:
+        """
+        Set the context fields read after each source is loaded.
+
+        These are the fields the outcomes read and those read by every later source,
+        so a source can skip loading fields nothing reads.
+        """
+        fields = outcome_fields
+        for source_service in reversed(source_services):
+            source_service.downstream_fields = fields
+
+            reads = source_service.context_fields
+            fields = None if fields is None or reads is None else fields | reads
+
+    @staticmethod
+    def depends_on(source_service: SourceService, earlier: SourceService) -> bool:
+        """
+        Return if source_service may read a field that earlier adds to the context.
+
+        A source that could read any field, such as one with an unparsable template,
+        depends on everything before it, as does any source reading fields after one
+        whose fields are only known once it's loaded, such as a splitter.
+        """
+        reads = source_service.context_fields
+        if reads is None:
+            return True
+        if not reads:
+            return False
+
+        adds = earlier.output_fields
+        return adds is None or bool(reads & adds)
+
+    def group_independent(self, source_services: list[SourceService]) -> list[list[SourceService]]:
+        """
+        Split source_services into consecutive groups that can be loaded together.
+
+        A group is a run of sources of the same Step where none reads a field another
+        in the group adds, matching the parameters of Database sources and the variables
+        of LLM prompts against the fields earlier sources add. With one worker every
+        source is a group of its own.
+        """
+        groups: list[list[SourceService]] = []
+
+        for source_service in source_services:
+            group = groups[-1] if groups else None
+            if (
+                group
+                and self.workers > 1
+                and group[0].source.Step == source_service.source.Step
+                and not any(self.depends_on(source_service, earlier) for earlier in group)
+            ):
+                group.append(source_service)
+            else:
+                groups.append([source_service])
+
+        return groups
+
+    def load_group(self, source_services: list[SourceService], contexts: list[Context]) -> list[list]:
+        """Load each source for all of contexts, at the same time if there are several."""
+        if len(source_services) == 1:
+            return [source_services[0].load_data_many(contexts)]
+
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(source_services))) as executor:
+            return list(
+                executor.map(lambda source_service: source_service.load_data_many(contexts), source_services)
             )
-            self.manager.commit()
 
-            next_contexts = []
+    def merge_group(
+        self, source_services: list[SourceService], context: Context, data: list
+    ) -> Iterator[Context]:
+        """Yield the contexts made by merging each source's data into context, in order."""
+        if not source_services:
+            yield context
+            return
 
-            for context in contexts:
-                source_service.load_data(current_data=context)
+        source_service, *remaining = source_services
+        first, *rest = data
 
-                if source_service.is_multi_record:
-                    if source_service.source.IsSplitter:
-                        for record in source_service.data:
-                            merged = context.copy()
-                            merged.update(record)
-                            next_contexts.append(merged)
+        for merged in self.merge(source_service=source_service, context=context, data=first):
+            yield from self.merge_group(source_services=remaining, context=merged, data=rest)
 
-                    else:
-                        merged = context.copy()
-                        merged.update({source_service.source.FieldName: source_service.data})
-                        next_contexts.append(merged)
+    def stream_contexts(
+        self,
+        sources: list[Source],
+        workflow_instance: WorkflowInstance,
+        initial_data: dict,
+        upload_mapping: dict,
+        outcome_fields: Optional[frozenset[str]] = None,
+    ) -> Iterator[Context]:
+        """
+        Lazily yield the same contexts as build_contexts, one at a time.
 
-                else:
-                    merged = context.copy()
-                    merged.update(source_service.data)
-                    next_contexts.append(merged)
+        The cartesian expansion is walked depth first: a context is yielded as soon as
+        every source has been loaded for it, so outcomes can start after one pass
+        through the sources, and only the current branch of the expansion is held in
+        memory rather than the whole product.
 
-            contexts = next_contexts
+        As sources keep loading until the last context is yielded, their instances are
+        only set as loaded once the generator is exhausted.
+        """
+        logger.info(f"Streaming contexts for {workflow_instance.Id=} with {initial_data=}")
 
-            self.manager.source_instances.set_loaded(source_instance_id=source_instance.Id)
-            self.manager.commit()
+        source_services = []
+        source_instances = []
 
-        return contexts
+        for source in sources:
+            source_services.append(self.create_service(source, upload_mapping))
+
+            source_instances.append(
+                self.manager.source_instances.add(source_id=source.Id, instance_id=workflow_instance.Id)
+            )
+
+        self.manager.commit()
+        self.set_downstream_fields(source_services, outcome_fields)
+
+        yield from self.expand(source_services=source_services, context=Context(initial_data))
+
+        for source_service, source_instance in zip(source_services, source_instances, strict=True):
+            self.manager.source_instances.set_loaded(
+                source_instance_id=source_instance.Id,
+                cache_hits=source_service.cache_hits,
+                cache_misses=source_service.cache_misses,
+            )
+        self.manager.commit()
+
+    def expand(self, source_services: list[SourceService], context: Context) -> Iterator[Context]:
+        """Load the first source for context and recursively expand what it merges into."""
+        if not source_services:
+            yield context
+            return
+
+        source_service, *remaining = source_services
+        data = source_service.stream_data(current_data=context)
+
+        for merged in self.merge(source_service=source_service, context=context, data=data):
+            yield from self.expand(source_services=remaining, context=merged)
+
+    @staticmethod
+    def merge(source_service: SourceService, context: Context, data: Iterable) -> Iterator[Context]:
+        """
+        Yield the contexts made by merging data loaded by a source into context.
+
+        A splitter yields one context per record, a grouped multi-record source adds
+        its records under its FieldName, and a single record is merged in directly.
+        Each is a new layer over context, so earlier sources' data is shared rather
+        than copied. Records are merged as they are read, so a streamed splitter is
+        never held in memory.
+        """
+        if source_service.is_multi_record:
+            if source_service.source.IsSplitter:
+                for record in data:
+                    yield context.merge(record)
+                return
+
+            yield context.merge({source_service.source.FieldName: data})
+            return
+
+        # a single record service may update its data in place on the next load.
+        yield context.merge(dict(data))
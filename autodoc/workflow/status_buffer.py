@@ -0,0 +1,50 @@
+"""Handle writing the completion of outcome instances to the database in batches."""
+
+import time
+
+from autodoc.config import OUTCOME_STATUS_FLUSH_COUNT, OUTCOME_STATUS_FLUSH_SECONDS
+from autodoc.data import DatabaseManager
+
+
+class OutcomeStatusBuffer:
+    """
+    Buffer completed outcome instances and write them in a single transaction.
+
+    Committing per document means an fsync per document on SQLite, and locks out the
+    dashboard while it polls for progress. Instead completions are flushed once
+    max_count have built up, or max_seconds have passed since the last flush, so the
+    dashboard still sees steady progress.
+    """
+
+    def __init__(
+        self,
+        manager: DatabaseManager,
+        max_count: int = OUTCOME_STATUS_FLUSH_COUNT,
+        max_seconds: float = OUTCOME_STATUS_FLUSH_SECONDS,
+    ):
+        """Create an empty buffer for the given manager."""
+        self.manager = manager
+        self.max_count = max_count
+        self.max_seconds = max_seconds
+
+        self.pending: dict[int, str] = {}
+        self.last_flush = time.monotonic()
+
+    def add(self, outcome_instance_id: int, rendered_name: str):
+        """Record an outcome instance as complete, flushing if the batch is due."""
+        self.pending[outcome_instance_id] = rendered_name
+
+        is_full = len(self.pending) >= self.max_count
+        is_stale = time.monotonic() - self.last_flush >= self.max_seconds
+
+        if is_full or is_stale:
+            self.flush()
+
+    def flush(self):
+        """Write all pending completions and commit."""
+        if self.pending:
+            self.manager.outcome_instances.set_complete_many(rendered_names=self.pending)
+            self.manager.commit()
+            self.pending = {}
+
+        self.last_flush = time.monotonic()
@@ -10,6 +10,7 @@ from werkzeug.datastructures import FileStorage
 from autodoc.config import DOWNLOAD_DIRECTORY
 from autodoc.data.manager import DatabaseManager
 from autodoc.data.tables import Outcome, Source, Workflow, WorkflowInstance
+from autodoc.outcome.template_fields import combine
 
 from .archiver import Archiver
 from .outcome_processor import OutcomeProcessor
@@ -31,8 +32,14 @@ class WorkflowRunner:
         archiver: Archiver,
         form_data: Optional[dict] = None,
         upload_mapping: Optional[dict] = None,
+        stream_contexts: bool = False,
     ) -> None:
-        """Create a Runner with an instance id."""
+        """
+        Create a Runner with an instance id.
+
+        stream_contexts: render outcomes for each context as soon as it is built, rather
+        than after all contexts have been built.
+        """
         self.manager: DatabaseManager = manager
         self.instance: WorkflowInstance = manager.workflow_instances.get(instance_id=instance_id)
         self.workflow: Workflow = self.instance.workflow
@@ -46,6 +53,7 @@ class WorkflowRunner:
         else:
             self.initial_data = {}
         self.upload_mapping = upload_mapping or {}
+        self.stream_contexts = stream_contexts
 
         self.source_loader = source_loader
         self.outcome_processor = outcome_processor
@@ -96,25 +104,54 @@ class WorkflowRunner:
             self.process_failure(reasons=reasons)
             return
 
-        # Build the context
-        self.set_instance_status("Building Context from Sources")
-        contexts = self.source_loader.build_contexts(
-            sources=self.sources,
-            workflow_instance=self.instance,
-            initial_data=self.initial_data,
-            upload_mapping=self.upload_mapping,
+        # the fields the outcomes read are found once, so sources only load those.
+        fields, template_fields = self.outcome_processor.find_fields(
+            outcomes=self.outcomes, upload_mapping=self.upload_mapping
         )
+        outcome_fields = combine(fields.values())
 
-        self.set_instance_status("Creating Outcomes")
-        self.outcome_processor.process(
-            outcomes=self.outcomes,
-            contexts=contexts,
-            workflow_instance=self.instance,
-            upload_mapping=self.upload_mapping,
-            download_dir=self.download_dir,
-        )
+        # Build the context
+        if self.stream_contexts:
+            # sources are loaded while the outcomes are created.
+            contexts = self.source_loader.stream_contexts(
+                sources=self.sources,
+                workflow_instance=self.instance,
+                initial_data=self.initial_data,
+                upload_mapping=self.upload_mapping,
+                outcome_fields=outcome_fields,
+            )
+        else:
+            self.set_instance_status("Building Context from Sources")
+            contexts = self.source_loader.build_contexts(
+                sources=self.sources,
+                workflow_instance=self.instance,
+                initial_data=self.initial_data,
+                upload_mapping=self.upload_mapping,
+                outcome_fields=outcome_fields,
+            )
+
+        # downloads are added to the zip as they are saved, so it is ready with the last one.
+        downloads_exist = self.outcome_processor.downloads_exist(outcomes=self.outcomes)
+        if downloads_exist:
+            self.archiver.start(download_dir=self.download_dir)
 
-        if self.outcome_processor.downloads_exist(outcomes=self.outcomes):
+        self.set_instance_status("Creating Outcomes")
+        try:
+            self.outcome_processor.process(
+                outcomes=self.outcomes,
+                contexts=contexts,
+                workflow_instance=self.instance,
+                upload_mapping=self.upload_mapping,
+                download_dir=self.download_dir,
+                archiver=self.archiver if downloads_exist else None,
+                fields=fields,
+                template_fields=template_fields,
+            )
+        except Exception:
+            self.archiver.discard()
+            raise
+
+        if downloads_exist:
             self.set_instance_status("Zipping Outcomes for Download")
             self.archiver.zip_downloads(download_dir=self.download_dir)
 
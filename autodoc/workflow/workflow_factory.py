@@ -2,6 +2,7 @@
 
 from typing import Optional
 
+from autodoc.config import OUTCOME_WORKERS, STREAM_CONTEXTS
 from autodoc.data import DatabaseManager
 
 from .archiver import Archiver
@@ -31,7 +32,9 @@ class WorkflowRunnerFactory:
             manager=manager,
         )
         outcome_processor = OutcomeProcessor(
-            outcome_service_factory=outcome_service_factory, manager=manager
+            outcome_service_factory=outcome_service_factory,
+            manager=manager,
+            workers=OUTCOME_WORKERS,
         )
         archiver = Archiver()
 
@@ -43,4 +46,5 @@ class WorkflowRunnerFactory:
             archiver=archiver,
             form_data=form_data,
             upload_mapping=upload_mapping,
+            stream_contexts=STREAM_CONTEXTS,
         )
@@ -3,6 +3,8 @@
 from flask import Blueprint, redirect, render_template, request, url_for
 from loguru import logger
 
+from autodoc.outcome.template_fields import path_fields
+from autodoc.workflow.outcome_service_factory import OutcomeServiceFactory
 from dashboard.database import get_db_manager
 
 card_blueprint = Blueprint("card", "card_blueprint", url_prefix="/card")
@@ -34,6 +36,9 @@ def source_card(source_id: int):
     if source_type.Name == "Excel":
         return render_template("components/cards/sources/excel_card.html", source=source)
 
+    if source_type.Name == "Parquet":
+        return render_template("components/cards/sources/parquet_card.html", source=source)
+
     if source_type.Name == "Database" and source.database:
         return render_template("components/cards/sources/database_card.html", source=source)
 
@@ -114,6 +119,33 @@ def outcome_card(outcome_id: int):
     raise
 
 
+@card_blueprint.route("/outcome_fields_card/<int:outcome_id>")
+def outcome_fields_card(outcome_id: int):
+    """Return the context fields an outcome's template and output path read."""
+    manager = get_db_manager()
+    outcome = manager.outcomes.get(outcome_id=outcome_id)
+
+    # a template uploaded when the workflow is run can only be read then.
+    uploaded = not outcome.input_file_template or outcome.input_file_template.is_download
+
+    try:
+        if uploaded:
+            fields = path_fields(outcome)
+        else:
+            fields = OutcomeServiceFactory().required_fields(
+                outcome=outcome, template_uploaded_filename=None
+            )
+    except Exception as e:
+        logger.warning(f"Can't find the fields of outcome {outcome_id}: {e}")
+        return render_template("components/cards/outcomes/fields.html", fields=None, error=str(e))
+
+    return render_template(
+        "components/cards/outcomes/fields.html",
+        fields=sorted(fields) if fields is not None else None,
+        uploaded=uploaded,
+    )
+
+
 @card_blueprint.route("/input_storage_card/<int:outcome_id>")
 def outcome_input_storage_card(outcome_id: int):
     """Return a storage card for an outcome for it's input file template."""
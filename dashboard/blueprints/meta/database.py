@@ -6,6 +6,7 @@ from flask import Blueprint, redirect, render_template, url_for
 from flask_login import login_required
 from loguru import logger
 
+from autodoc.metasource import engine_registry
 from dashboard.database import get_db_manager
 
 from .forms import CreateMetaDatabase
@@ -43,6 +44,7 @@ def delete(database_id):
     manager = get_db_manager()
     manager.database_meta_sources.delete(database_id=database_id)
     manager.commit()
+    engine_registry.invalidate(database_id=int(database_id))
     return redirect(url_for("meta.db.manage"))
 
 
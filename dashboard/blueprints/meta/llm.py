@@ -4,6 +4,7 @@ from flask import Blueprint, redirect, render_template, url_for
 from flask_login import login_required
 from loguru import logger
 
+from autodoc.source.llm_models import chat_models
 from dashboard.database import get_db_manager
 
 from .forms import CreateLLM
@@ -38,6 +39,7 @@ def delete(llm_id):
     manager = get_db_manager()
     manager.llms.delete(llm_id=llm_id)
     manager.commit()
+    chat_models.invalidate(llm_id=int(llm_id))
     return redirect(url_for("meta.llm.manage"))
 
 
@@ -3,6 +3,7 @@
 from flask import Blueprint, redirect, render_template, url_for
 from flask_login import login_required
 
+from autodoc.storage_service import storage_clients
 from dashboard.database import get_db_manager
 
 from .forms import CreateMetaSharePoint
@@ -53,4 +54,5 @@ def delete(storage_instance_id: int):
     manager = get_db_manager()
     manager.storage_instances.delete(storage_instance_id=storage_instance_id)
     manager.commit()
+    storage_clients.invalidate(instance_id=int(storage_instance_id))
     return redirect(url_for("meta.sp.manage"))
@@ -6,7 +6,16 @@ from flask import Blueprint, flash, redirect, render_template, request, url_for
 from loguru import logger
 from werkzeug.wrappers.response import Response
 
-from autodoc.data.tables import CSVSource, DatabaseSource, ExcelSource, LLMSource, Source
+from autodoc.data.tables import (
+    LLM,
+    CSVSource,
+    DatabaseSource,
+    ExcelSource,
+    LLMSource,
+    ParquetSource,
+    Source,
+    SourceType,
+)
 from dashboard.constants import EXPLANATION_MAP
 from dashboard.database import get_db_manager
 
@@ -76,6 +85,15 @@ def _get_initial_data(source: Source) -> dict:
                 "location": source.file_template.Location if source.file_template else None,
                 "bucket": source.file_template.Bucket if source.file_template else None,
             }
+        case ParquetSource():
+            data |= {
+                "splitter_choice": "splitter" if source.IsSplitter else "field",
+                "field_name": source.FieldName,
+                "columns": source.Columns,
+                "filters": source.Filters,
+                "location": source.file_template.Location if source.file_template else None,
+                "bucket": source.file_template.Bucket if source.file_template else None,
+            }
         case DatabaseSource():
             data |= {
                 "database": source.DatabaseId,
@@ -88,6 +106,7 @@ def _get_initial_data(source: Source) -> dict:
                 "llm": source.LLMId,
                 "prompt_template": source.LLMPromptTemplate,
                 "system_prompt": source.LLMSystemPrompt,
+                "bypass_cache": source.BypassCache,
             }
         case _:
             raise ValueError(f"Unknown source type: {type(source)}")
@@ -97,6 +116,150 @@ def _get_initial_data(source: Source) -> dict:
     return data
 
 
+def _get_llm(manager, form) -> Optional[LLM]:
+    """Get the LLM selected on a form, if one is."""
+    return manager.llms.get(llm_id=int(form.llm.data)) if form.llm.data else None
+
+
+def _add_source(
+    manager,
+    form,
+    source_type: SourceType,
+    workflow_id: int,
+    step: int,
+    name: Optional[str],
+    file_template_id: Optional[int],
+    llm: Optional[LLM],
+) -> None:
+    """Add a source of source_type from the fields of its form."""
+    match source_type.Name:
+        case "CSV":
+            manager.sources.add_csv(
+                workflow_id=workflow_id,
+                source_type=source_type,
+                step=step,
+                name=name,
+                file_template_id=file_template_id,
+                is_splitter=form.splitter_choice.data == "splitter",
+                field_name=form.field_name.data,
+            )
+        case "Excel":
+            manager.sources.add_excel(
+                workflow_id=workflow_id,
+                source_type=source_type,
+                step=step,
+                name=name,
+                file_template_id=file_template_id,
+                is_splitter=form.splitter_choice.data == "splitter",
+                field_name=form.field_name.data,
+                sheet_name=form.sheet_name.data,
+                header_row=form.header_row.data,
+            )
+        case "Parquet":
+            manager.sources.add_parquet(
+                workflow_id=workflow_id,
+                source_type=source_type,
+                step=step,
+                name=name,
+                file_template_id=file_template_id,
+                is_splitter=form.splitter_choice.data == "splitter",
+                field_name=form.field_name.data,
+                columns=form.columns.data,
+                filters=form.filters.data,
+            )
+        case "Database":
+            manager.sources.add_database(
+                workflow_id=workflow_id,
+                source_type=source_type,
+                step=step,
+                name=name,
+                is_splitter=form.splitter_choice.data == "splitter",
+                field_name=form.field_name.data,
+                database_id=int(form.database.data),
+                sql_text=form.sql_text.data,
+            )
+        case "LLM":
+            manager.sources.add_llm(
+                workflow_id=workflow_id,
+                source_type=source_type,
+                step=step,
+                name=name,
+                llm=llm,
+                llm_prompt_template=form.prompt_template.data,
+                llm_system_prompt=form.system_prompt.data,
+                bypass_cache=form.bypass_cache.data,
+            )
+        case _:
+            raise ValueError(f"Unknown source type: {source_type.Name}")
+
+
+def _update_source(
+    manager,
+    form,
+    source_type: SourceType,
+    source_id: int,
+    step: int,
+    name: Optional[str],
+    file_template_id: Optional[int],
+    llm: Optional[LLM],
+) -> None:
+    """Update a source of source_type from the fields of its form."""
+    match source_type.Name:
+        case "CSV":
+            manager.sources.update_csv(
+                source_id=source_id,
+                step=step,
+                name=name,
+                file_template_id=file_template_id,
+                is_splitter=form.splitter_choice.data == "splitter",
+                field_name=form.field_name.data,
+            )
+        case "Excel":
+            manager.sources.update_excel(
+                source_id=source_id,
+                step=step,
+                name=name,
+                file_template_id=file_template_id,
+                is_splitter=form.splitter_choice.data == "splitter",
+                field_name=form.field_name.data,
+                sheet_name=form.sheet_name.data,
+                header_row=form.header_row.data,
+            )
+        case "Parquet":
+            manager.sources.update_parquet(
+                source_id=source_id,
+                step=step,
+                name=name,
+                file_template_id=file_template_id,
+                is_splitter=form.splitter_choice.data == "splitter",
+                field_name=form.field_name.data,
+                columns=form.columns.data,
+                filters=form.filters.data,
+            )
+        case "Database":
+            manager.sources.update_database(
+                source_id=source_id,
+                step=step,
+                name=name,
+                is_splitter=form.splitter_choice.data == "splitter",
+                field_name=form.field_name.data,
+                database_id=int(form.database.data),
+                sql_text=form.sql_text.data,
+            )
+        case "LLM":
+            manager.sources.update_llm(
+                source_id=source_id,
+                step=step,
+                name=name,
+                llm=llm,
+                llm_prompt_template=form.prompt_template.data,
+                llm_system_prompt=form.system_prompt.data,
+                bypass_cache=form.bypass_cache.data,
+            )
+        case _:
+            raise ValueError(f"Unknown source type: {source_type.Name}")
+
+
 @bp.route("/delete_source/<workflow_id>/<source_id>", methods=["GET", "POST"])
 def delete_source_view(workflow_id: int, source_id: int) -> Union[str, Response]:
     """Delete a source."""
@@ -135,57 +298,21 @@ def add_source_view(workflow_id: int, source_type_id: int) -> Union[str, Respons
                 )
             )
 
-        match source_type.Name:
-            case "CSV":
-                manager.sources.add_csv(
-                    workflow_id=workflow_id,
-                    source_type=source_type,
-                    step=step,
-                    name=name,
-                    file_template_id=file_template_id,
-                    is_splitter=form.splitter_choice.data == "splitter",
-                    field_name=form.field_name.data,
-                )
-            case "Excel":
-                manager.sources.add_excel(
-                    workflow_id=workflow_id,
-                    source_type=source_type,
-                    step=step,
-                    name=name,
-                    file_template_id=file_template_id,
-                    is_splitter=form.splitter_choice.data == "splitter",
-                    field_name=form.field_name.data,
-                    sheet_name=form.sheet_name.data,
-                    header_row=form.header_row.data,
-                )
-            case "Database":
-                manager.sources.add_database(
-                    workflow_id=workflow_id,
-                    source_type=source_type,
-                    step=step,
-                    name=name,
-                    is_splitter=form.splitter_choice.data == "splitter",
-                    field_name=form.field_name.data,
-                    database_id=int(form.database.data),
-                    sql_text=form.sql_text.data,
-                )
-            case "LLM":
-                llm = manager.llms.get(llm_id=int(form.llm.data)) if form.llm.data else None
-                if not llm:
-                    flash("Please select an LLM", "error")
-                    return redirect(url_for("top.workflow.workflow", workflow_id=workflow_id))
+        llm = _get_llm(manager, form) if source_type.Name == "LLM" else None
+        if source_type.Name == "LLM" and not llm:
+            flash("Please select an LLM", "error")
+            return redirect(url_for("top.workflow.workflow", workflow_id=workflow_id))
 
-                manager.sources.add_llm(
-                    workflow_id=workflow_id,
-                    source_type=source_type,
-                    step=step,
-                    name=name,
-                    llm=llm,
-                    llm_prompt_template=form.prompt_template.data,
-                    llm_system_prompt=form.system_prompt.data,
-                )
-            case _:
-                raise ValueError(f"Unknown source type: {source_type.Name}")
+        _add_source(
+            manager,
+            form,
+            source_type,
+            workflow_id=workflow_id,
+            step=step,
+            name=name,
+            file_template_id=file_template_id,
+            llm=llm,
+        )
 
         manager.commit()
         return redirect(url_for("top.workflow.workflow", workflow_id=workflow_id))
@@ -196,6 +323,7 @@ def add_source_view(workflow_id: int, source_type_id: int) -> Union[str, Respons
     title_mapper = {
         "CSV": "CSV",
         "Excel": "Excel",
+        "Parquet": "Parquet",
         "LLM": "AI Response",
         "Database": "Database Query",
     }
@@ -253,52 +381,21 @@ def edit_source_view(workflow_id: int, source_id: int) -> Union[str, Response]:
             flash("A Field Name is required when setting to Field", "error")
             return redirect(url_for("top.source.edit_source_view", workflow_id=workflow_id, source_id=source_id))
 
-        match source_type.Name:
-            case "CSV":
-                manager.sources.update_csv(
-                    source_id=source_id,
-                    step=step,
-                    name=name,
-                    file_template_id=file_template_id,
-                    is_splitter=form.splitter_choice.data == "splitter",
-                    field_name=form.field_name.data,
-                )
-            case "Excel":
-                manager.sources.update_excel(
-                    source_id=source_id,
-                    step=step,
-                    name=name,
-                    file_template_id=file_template_id,
-                    is_splitter=form.splitter_choice.data == "splitter",
-                    field_name=form.field_name.data,
-                    sheet_name=form.sheet_name.data,
-                    header_row=form.header_row.data,
-                )
-            case "Database":
-                manager.sources.update_database(
-                    source_id=source_id,
-                    step=step,
-                    name=name,
-                    is_splitter=form.splitter_choice.data == "splitter",
-                    field_name=form.field_name.data,
-                    database_id=int(form.database.data),
-                    sql_text=form.sql_text.data,
-                )
-            case "LLM":
-                llm = manager.llms.get(llm_id=int(form.llm.data)) if form.llm.data else None
-                if not llm:
-                    flash("Please select an LLM", "error")
-                    return redirect(url_for("top.workflow.workflow", workflow_id=workflow_id))
-                manager.sources.update_llm(
-                    source_id=source_id,
-                    step=step,
-                    name=name,
-                    llm=llm,
-                    llm_prompt_template=form.prompt_template.data,
-                    llm_system_prompt=form.system_prompt.data,
-                )
-            case _:
-                raise ValueError(f"Unknown source type: {source_type.Name}")
+        llm = _get_llm(manager, form) if source_type.Name == "LLM" else None
+        if source_type.Name == "LLM" and not llm:
+            flash("Please select an LLM", "error")
+            return redirect(url_for("top.workflow.workflow", workflow_id=workflow_id))
+
+        _update_source(
+            manager,
+            form,
+            source_type,
+            source_id=source_id,
+            step=step,
+            name=name,
+            file_template_id=file_template_id,
+            llm=llm,
+        )
 
         manager.commit()
         return redirect(url_for("top.workflow.workflow", workflow_id=workflow_id))
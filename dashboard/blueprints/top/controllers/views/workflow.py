@@ -255,12 +255,18 @@ def source_table(instance_id: int):
 
     num_complete = len(source_instances) - num_processing
 
+    cached = [s for s in source_instances if s.CacheHits is not None]
+    cache_hits = sum(s.CacheHits for s in cached) if cached else None
+    cache_misses = sum(s.CacheMisses or 0 for s in cached) if cached else None
+
     logger.info(f"The instance.Status is {instance.Status}")
     if instance.Status in ["Complete", "Failure"]:
         text = render_template(
             "components/sources_status.html",
             num_processing=num_processing,
             num_complete=num_complete,
+            cache_hits=cache_hits,
+            cache_misses=cache_misses,
             instance=instance,
         )
         response = make_response(text)
@@ -271,6 +277,8 @@ def source_table(instance_id: int):
         "components/sources_status.html",
         num_processing=num_processing,
         num_complete=num_complete,
+        cache_hits=cache_hits,
+        cache_misses=cache_misses,
         instance=instance,
     )
 
@@ -7,6 +7,7 @@ from .excel import CreateExcelSourceForm
 from .form_field import CreateFormFieldForm as CreateFormFieldForm
 from .llm import CreateLLMSourceForm as CreateLLMSourceForm
 from .meta import CreateMetaDatabase as CreateMetaDatabase
+from .parquet import CreateParquetSourceForm
 from .pdf import CreatePDFOutcomeForm as CreatePDFOutcomeForm
 
 from .sql import CreateDatabaseSourceForm
@@ -19,6 +20,7 @@ ADD_SOURCE_FORMS = {
     "Database": CreateDatabaseSourceForm,
     "CSV": CreateCSVSourceForm,
     "Excel": CreateExcelSourceForm,
+    "Parquet": CreateParquetSourceForm,
 }
 
 ADD_OUTCOME_FORMS = {
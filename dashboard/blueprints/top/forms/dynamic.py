@@ -56,6 +56,7 @@ def get_form(
     file_extension_mapping = {
         "CSV": ["csv"],
         "Excel": ["xlsx", "xls"],
+        "Parquet": ["parquet"],
     }
 
     class Form(WorkflowForm):
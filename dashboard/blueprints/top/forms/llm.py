@@ -1,7 +1,7 @@
 """Define LLM forms."""
 
 from flask_wtf import FlaskForm
-from wtforms import IntegerField, SelectField, StringField, SubmitField, TextAreaField
+from wtforms import BooleanField, IntegerField, SelectField, StringField, SubmitField, TextAreaField
 from wtforms.validators import InputRequired
 
 
@@ -27,6 +27,7 @@ class CreateLLMSourceForm(FlaskForm):
     prompt_template = TextAreaField("Prompt Template")
     system_prompt = TextAreaField("System Prompt Override")
     llm_field_name = StringField("Field Name")
+    bypass_cache = BooleanField("Bypass Response Cache")
 
     step = IntegerField("Step", validators=[InputRequired()], default=1)
     submit = SubmitField()
@@ -0,0 +1,24 @@
+"""Define Parquet forms."""
+
+from flask_wtf import FlaskForm
+from wtforms import (
+    IntegerField,
+    RadioField,
+    StringField,
+    SubmitField,
+    TextAreaField,
+)
+from wtforms.validators import InputRequired
+
+from .mixins import FileAccessorMixin
+
+
+class CreateParquetSourceForm(FlaskForm, FileAccessorMixin):
+    """Create a Parquet Form."""
+
+    columns = StringField("Columns")
+    filters = TextAreaField("Filters")
+    step = IntegerField("Step", validators=[InputRequired()], default=1)
+    splitter_choice = RadioField(choices=[("splitter", "splitter"), ("field", "field")])
+    field_name = StringField("Field Name")
+    submit = SubmitField()
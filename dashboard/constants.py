@@ -36,6 +36,25 @@ EXPLANATION_MAP = {
             "use in one template."
         ),
     ],
+    "Parquet": [
+        "Add one or more rows of data from a .parquet file.",
+        (
+            "List the Columns to read, separated by commas, to only read what the "
+            "templates use. Leave it empty to read every column."
+        ),
+        (
+            "Filters keep only the rows that meet every condition, one per line. A "
+            "value can be a number, text in quotes, or data from a previous Source "
+            "using :field syntax. For example:"
+        ),
+        "Region = \"North\"",
+        "ClientId = :client_id",
+        (
+            "These rows can either split the Workflow (creating an output "
+            "for each row) or be attached as a list to a single field for "
+            "use in one template."
+        ),
+    ],
     "LLM": [
         "Get a response from a Large Language Model (LLM) and add it to the workflow context.",
         ("Choose a pre-configured LLM and build a prompt template using data from previous steps."),
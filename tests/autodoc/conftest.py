@@ -64,6 +64,7 @@ def mock_outcome_processor():
     """Fixture for a mocked OutcomeProcessor."""
     processor = MagicMock(spec=OutcomeProcessor)
     processor.downloads_exist.return_value = True
+    processor.find_fields.return_value = ({1: frozenset({"client"})}, {1: frozenset()})
     return processor
 
 
@@ -84,6 +85,9 @@ def mock_source_service_factory():
 def mock_outcome_service_factory():
     """Fixture for a mocked SourceServiceFactory."""
     factory = MagicMock(spec=OutcomeServiceFactory)
+    # outcomes read every context field unless a test says otherwise
+    factory.required_fields.return_value = None
+    factory.template_fields.return_value = None
     return factory
 
 
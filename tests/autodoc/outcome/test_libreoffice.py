@@ -0,0 +1,89 @@
+"""Test the LibreOffice conversion server pool."""
+
+from pathlib import Path
+
+import pytest
+
+from autodoc.outcome.libreoffice import ConversionServerPool
+
+
+class FakeServer:
+    """A conversion server that records calls and can be made to fail."""
+
+    instances: list = []
+
+    def __init__(self):
+        """Create a healthy server."""
+        self.healthy = True
+        self.failures = 0
+        self.starts = 0
+        self.converted = []
+        FakeServer.instances.append(self)
+
+    def start(self):
+        """Record a start."""
+        self.starts += 1
+        self.healthy = True
+
+    def restart(self):
+        """Record a restart."""
+        self.start()
+
+    def stop(self):
+        """Mark as stopped."""
+        self.healthy = False
+
+    def is_healthy(self):
+        """Return the fake health."""
+        return self.healthy
+
+    def convert(self, in_path, out_path):
+        """Fail with a connection error while failures remain."""
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionRefusedError()
+        self.converted.append((in_path, out_path))
+
+
+@pytest.fixture
+def pool():
+    """Provide a pool of one fake server."""
+    FakeServer.instances = []
+    pool = ConversionServerPool(size=1, server_class=FakeServer)
+    yield pool
+    pool.close()
+
+
+def test_servers_started_once(pool):
+    """Test that the servers are started on first use and then reused."""
+    pool.convert(Path("a"), Path("a.pdf"))
+    pool.convert(Path("b"), Path("b.pdf"))
+
+    assert len(FakeServer.instances) == 1
+    server = FakeServer.instances[0]
+    assert server.starts == 1
+    assert server.converted == [(Path("a"), Path("a.pdf")), (Path("b"), Path("b.pdf"))]
+
+
+def test_dead_server_is_restarted(pool):
+    """Test that an unhealthy server is restarted before it is used."""
+    pool.convert(Path("a"), Path("a.pdf"))
+    server = FakeServer.instances[0]
+    server.healthy = False
+
+    pool.convert(Path("b"), Path("b.pdf"))
+
+    assert server.starts == 2
+    assert server.converted[-1] == (Path("b"), Path("b.pdf"))
+
+
+def test_wedged_conversion_is_retried(pool):
+    """Test that a connection error restarts the server and retries the conversion."""
+    pool.start()
+    server = FakeServer.instances[0]
+    server.failures = 1
+
+    pool.convert(Path("a"), Path("a.pdf"))
+
+    assert server.starts == 2
+    assert server.converted == [(Path("a"), Path("a.pdf"))]
@@ -0,0 +1,61 @@
+"""Test the TemplateCache."""
+
+import os
+
+from autodoc.outcome.template_cache import CompilingEnvironment, TemplateCache
+from autodoc.storage_service import LinuxStorageService
+
+
+def test_get_text_compiles_once(tmp_path):
+    """Test that an unchanged template is only loaded once."""
+    (tmp_path / "template.txt").write_text("Hello {{ name }}")
+    storage_service = LinuxStorageService(root=str(tmp_path), relative="template.txt")
+    cache = TemplateCache(max_entries=4)
+
+    first = cache.get_text(key=1, storage_service=storage_service)
+    second = cache.get_text(key=1, storage_service=storage_service)
+
+    assert first is second
+    assert first.render(name="World") == "Hello World"
+
+
+def test_get_text_reloads_changed_template(tmp_path):
+    """Test that a new version of the template replaces the old one."""
+    path = tmp_path / "template.txt"
+    path.write_text("Hello {{ name }}")
+    storage_service = LinuxStorageService(root=str(tmp_path), relative="template.txt")
+    cache = TemplateCache(max_entries=4)
+
+    cache.get_text(key=1, storage_service=storage_service)
+
+    path.write_text("Goodbye {{ name }}")
+    os.utime(path, ns=(0, 1))
+
+    template = cache.get_text(key=1, storage_service=storage_service)
+
+    assert template.render(name="World") == "Goodbye World"
+    assert len(cache.entries) == 1
+
+
+def test_least_recently_used_is_evicted(tmp_path):
+    """Test that the cache never holds more than max_entries templates."""
+    cache = TemplateCache(max_entries=2)
+    storage_services = {}
+    for key in (1, 2, 3):
+        (tmp_path / f"{key}.txt").write_text(f"{key}")
+        storage_services[key] = LinuxStorageService(root=str(tmp_path), relative=f"{key}.txt")
+
+    cache.get_text(key=1, storage_service=storage_services[1])
+    cache.get_text(key=2, storage_service=storage_services[2])
+    cache.get_text(key=1, storage_service=storage_services[1])
+    cache.get_text(key=3, storage_service=storage_services[3])
+
+    assert [entry[1] for entry in cache.entries] == [1, 3]
+
+
+def test_compiling_environment_reuses_templates():
+    """Test that the same source is only compiled once."""
+    env = CompilingEnvironment()
+
+    assert env.from_string("{{ a }}") is env.from_string("{{ a }}")
+    assert env.from_string("{{ a }}").render(a=1) == "1"
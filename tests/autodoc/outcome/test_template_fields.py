@@ -0,0 +1,65 @@
+"""Test finding the context fields outcome templates read."""
+
+from io import BytesIO
+from unittest.mock import MagicMock
+
+from docx import Document
+
+from autodoc.data.tables import FileTemplate, Outcome
+from autodoc.outcome.template_fields import docx_fields, find_fields, path_fields, project
+
+
+def make_docx(body: str, header: str = "", title: str = "") -> bytes:
+    """Return the bytes of a .docx with the given body, header and title."""
+    document = Document()
+    document.add_paragraph(body)
+    document.sections[0].header.paragraphs[0].text = header
+    document.core_properties.title = title
+
+    stream = BytesIO()
+    document.save(stream)
+    return stream.getvalue()
+
+
+def test_find_fields_reads_only_undeclared_variables():
+    """Test that loop variables and attributes aren't fields, but what they come from is."""
+    text = "{{ client.name }} {% for line in lines %}{{ line.total }} {{ currency }}{% endfor %}"
+
+    assert find_fields(text) == {"client", "lines", "currency"}
+
+
+def test_find_fields_of_invalid_template_is_unknown():
+    """Test that a template that doesn't parse gives None, so every field is passed."""
+    assert find_fields("{{ client.name ") is None
+
+
+def test_docx_fields_reads_every_part():
+    """Test that the body, headers and properties are read, but not the image helpers."""
+    data = make_docx(
+        body="Dear {{ name }}, {{ _image_url(logo) }}",
+        header="Invoice {{ invoice_number }}",
+        title="{{ title }}",
+    )
+
+    assert docx_fields(data) == {"name", "logo", "invoice_number", "title"}
+
+
+def test_path_fields_of_saved_and_downloaded_outcomes():
+    """Test that the output Location and root are read, or the DownloadName if downloaded."""
+    # 1. ARRANGE
+    template = MagicMock(spec=FileTemplate, Location="{{ client }}/{{ year }}.docx")
+    template.get_root.return_value = "/data/{{ region }}"
+    saved = MagicMock(spec=Outcome, is_download=False, output_file_template=template)
+    downloaded = MagicMock(spec=Outcome, is_download=True, DownloadName="{{ client }}.pdf")
+
+    # 2. ACT and 3. ASSERT
+    assert path_fields(saved) == {"client", "year", "region"}
+    assert path_fields(downloaded) == {"client"}
+
+
+def test_project_keeps_only_the_fields_read():
+    """Test that a context is cut down to the known fields, and kept whole otherwise."""
+    context = {"a": 1, "b": 2, "c": 3}
+
+    assert project(context, frozenset({"a", "c", "missing"})) == {"a": 1, "c": 3}
+    assert project(context, None) is context
@@ -0,0 +1,69 @@
+"""Test the LLM response cache."""
+
+import time
+
+from autodoc.source.llm_cache import LLMResponseCache, make_key
+
+
+def test_cache_round_trip_and_keys(tmp_path):
+    """Test that responses are stored under provider, model, system prompt and prompt."""
+    cache = LLMResponseCache(path=tmp_path / "cache.db", ttl=0)
+    key = make_key("openai", "gpt", "Be brief", "Summarise ACME")
+
+    assert cache.get(key) is None
+
+    cache.put(key, "ACME makes everything")
+
+    assert cache.get(key) == "ACME makes everything"
+    assert make_key("openai", "gpt", "Be verbose", "Summarise ACME") != key
+    assert make_key("openai", "other", "Be brief", "Summarise ACME") != key
+
+    # the cache is shared with other processes through the file.
+    assert LLMResponseCache(path=tmp_path / "cache.db", ttl=0).get(key) == "ACME makes everything"
+
+
+def test_cache_expires_entries(tmp_path):
+    """Test that responses older than the ttl are ignored."""
+    cache = LLMResponseCache(path=tmp_path / "cache.db", ttl=60)
+    cache.put("old", "response")
+    cache.connection.execute("UPDATE Response SET CreatedAt = ?", (time.time() - 120,))
+
+    assert cache.get("old") is None
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    """Test that the least recently used responses are removed once over size."""
+    cache = LLMResponseCache(path=tmp_path / "cache.db", ttl=0, max_bytes=25)
+    cache.put("first", "a" * 10)
+    cache.put("second", "b" * 10)
+    time.sleep(0.01)
+    cache.get("first")
+
+    cache.put("third", "c" * 10)
+
+    assert cache.get("first") == "a" * 10
+    assert cache.get("second") is None
+    assert cache.get("third") == "c" * 10
+
+
+def test_cache_keeps_a_running_total_of_its_size(tmp_path):
+    """Test that the total size follows inserts, replacements and evictions, in any process."""
+    # 1. ARRANGE
+    cache = LLMResponseCache(path=tmp_path / "cache.db", ttl=0, max_bytes=100)
+
+    def total(cache):
+        return cache.connection.execute("SELECT Size FROM ResponseTotal").fetchone()[0]
+
+    # 2. ACT
+    cache.put("first", "a" * 40)
+    cache.put("second", "b" * 40)
+    cache.put("first", "a" * 30)
+    after_replace = total(cache)
+    cache.put("third", "c" * 40)
+
+    # 3. ASSERT
+    assert after_replace == 70
+    # over 100 bytes, so the least recently used is removed until within 90.
+    assert cache.get("second") is None
+    assert total(cache) == 70
+    assert total(LLMResponseCache(path=tmp_path / "cache.db", ttl=0)) == 70
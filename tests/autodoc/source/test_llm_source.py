@@ -0,0 +1,265 @@
+"""Test loading LLM sources concurrently."""
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock, patch
+
+import pytest
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from autodoc.data.tables import LLMSource
+from autodoc.source import LLMSourceService
+from autodoc.source.llm_cache import LLMResponseCache
+from autodoc.source.llm_models import chat_models, provider_limiters, run_async
+from autodoc.source.llm_limits import ProviderLimiter, TokenBucket, parse_provider_limits
+
+
+class RateLimitError(Exception):
+    """A provider error with a HTTP status, like those raised by provider clients."""
+
+    status_code = 429
+
+
+class FakeChatModel(BaseChatModel):
+    """A local chat model that echoes the prompt, tracking concurrency and rate limiting."""
+
+    rate_limited_calls: int = 0
+    in_flight: int = 0
+    max_in_flight: int = 0
+    prompts: list = []
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake"
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        prompt = messages[-1].content
+        self.prompts.append(prompt)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=prompt.upper()))])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        if self.rate_limited_calls:
+            self.rate_limited_calls -= 1
+            raise RateLimitError("Too many requests")
+
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+
+        return self._generate(messages)
+
+
+@pytest.fixture(autouse=True)
+def no_llm_cache():
+    """Don't use the host's LLM response cache in tests."""
+    with patch("autodoc.source.llm_source.get_llm_cache", return_value=None) as get_llm_cache:
+        yield get_llm_cache
+
+
+@pytest.fixture(autouse=True)
+def no_chat_models():
+    """Don't share chat models or rate limiters between tests."""
+    chat_models.clear()
+    provider_limiters.clear()
+    yield
+    chat_models.clear()
+    provider_limiters.clear()
+
+
+def make_llm_source() -> MagicMock:
+    """Return an LLM source whose prompt reads the client field."""
+    source = MagicMock(
+        spec=LLMSource, FieldName="summary", LLMSystemPrompt="Be brief", BypassCache=False
+    )
+    source.LLMPromptTemplate = "summarise {{ client }}"
+    source.llm.ModelName = "fake-model"
+    source.llm.APIKey = "key"
+    source.llm.BaseURL = None
+    source.llm.provider.LangChainName = "fake"
+    return source
+
+
+def test_load_data_many_calls_concurrently_within_limits():
+    """Test that prompts run concurrently, capped per provider, and map back to contexts."""
+    # 1. ARRANGE
+    model = FakeChatModel()
+    service = LLMSourceService(source=make_llm_source())
+    contexts = [{"client": f"client {index % 6}", "row": index} for index in range(12)]
+
+    # 2. ACT
+    with (
+        patch("autodoc.source.llm_models.init_chat_model", return_value=model),
+        patch("autodoc.source.llm_limits.get_provider_limits", return_value=(3, 0)),
+    ):
+        results = service.load_data_many(contexts)
+
+    # 3. ASSERT
+    assert len(model.prompts) == 6
+    assert model.max_in_flight == 3
+    assert results == [{"summary": f"SUMMARISE CLIENT {index % 6}"} for index in range(12)]
+
+
+def test_load_data_many_backs_off_when_rate_limited():
+    """Test that 429 errors are retried rather than failing the source."""
+    model = FakeChatModel(rate_limited_calls=2)
+    service = LLMSourceService(source=make_llm_source())
+
+    with (
+        patch("autodoc.source.llm_models.init_chat_model", return_value=model),
+        patch.object(
+            ProviderLimiter, "for_provider", side_effect=lambda provider: ProviderLimiter(base_delay=0.001)
+        ),
+    ):
+        results = service.load_data_many([{"client": "ACME"}])
+
+    assert results == [{"summary": "SUMMARISE ACME"}]
+    assert model.rate_limited_calls == 0
+
+
+def test_concurrent_sources_share_the_provider_limit():
+    """Test that sources loaded at the same time share one in flight limit per provider."""
+    # 1. ARRANGE
+    model = FakeChatModel()
+    services = [LLMSourceService(source=make_llm_source()) for _ in range(3)]
+    contexts = [{"client": f"client {index}"} for index in range(4)]
+
+    # 2. ACT
+    with (
+        patch("autodoc.source.llm_models.init_chat_model", return_value=model),
+        patch("autodoc.source.llm_limits.get_provider_limits", return_value=(2, 0)),
+        ThreadPoolExecutor(max_workers=3) as executor,
+    ):
+        list(executor.map(lambda service: service.load_data_many(contexts), services))
+
+    # 3. ASSERT
+    assert model.max_in_flight == 2
+    assert len(provider_limiters.limiters) == 1
+
+
+def test_rate_limit_error_is_raised_after_max_retries():
+    """Test that a provider that keeps rate limiting eventually fails the call."""
+    limiter = ProviderLimiter(max_in_flight=1, max_retries=1, base_delay=0.001)
+
+    async def make_call():
+        raise RateLimitError("Too many requests")
+
+    with pytest.raises(RateLimitError):
+        asyncio.run(limiter.call(make_call, tokens=1))
+
+
+def test_token_bucket_waits_for_tokens():
+    """Test that the tokens per minute limit delays calls once the budget is spent."""
+
+    async def run() -> float:
+        bucket = TokenBucket(tokens_per_minute=60000)
+        await bucket.acquire(60000)
+
+        start = time.monotonic()
+        await bucket.acquire(100)  # 1000 tokens are earned a second.
+        return time.monotonic() - start
+
+    assert asyncio.run(run()) >= 0.09
+
+
+def test_parse_provider_limits():
+    """Test parsing per provider limits from the environment."""
+    assert parse_provider_limits("openai=8:90000, ollama=1") == {
+        "openai": (8, 90000),
+        "ollama": (1, 0),
+    }
+
+
+def test_cached_responses_are_not_requested_again(tmp_path, no_llm_cache):
+    """Test that a second run is served from the response cache, and counts hits and misses."""
+    # 1. ARRANGE
+    no_llm_cache.return_value = LLMResponseCache(path=tmp_path / "cache.db", ttl=0)
+    contexts = [{"client": "ACME"}, {"client": "Other"}]
+
+    first_model = FakeChatModel()
+    second_model = FakeChatModel()
+
+    # 2. ACT
+    with patch("autodoc.source.llm_models.init_chat_model", return_value=first_model):
+        first = LLMSourceService(source=make_llm_source())
+        first.load_data_many(contexts)
+
+    with patch("autodoc.source.llm_models.init_chat_model", return_value=second_model):
+        second = LLMSourceService(source=make_llm_source())
+        results = second.load_data_many(contexts + [{"client": "New"}])
+
+    # 3. ASSERT
+    assert (first.cache_hits, first.cache_misses) == (0, 2)
+    assert (second.cache_hits, second.cache_misses) == (2, 1)
+    assert second_model.prompts == ["summarise New"]
+    assert results[0] == {"summary": "SUMMARISE ACME"}
+
+
+def test_bypass_cache_always_calls_the_llm(tmp_path, no_llm_cache):
+    """Test that a source set to bypass the cache calls the LLM even when cached."""
+    no_llm_cache.return_value = LLMResponseCache(path=tmp_path / "cache.db", ttl=0)
+    model = FakeChatModel()
+
+    with patch("autodoc.source.llm_models.init_chat_model", return_value=model):
+        LLMSourceService(source=make_llm_source()).load_data(current_data={"client": "ACME"})
+
+        source = make_llm_source()
+        source.BypassCache = True
+        service = LLMSourceService(source=source)
+        service.load_data(current_data={"client": "ACME"})
+
+    assert model.prompts == ["summarise ACME", "summarise ACME"]
+    assert service.cache_hits == 0
+
+
+def test_chat_models_are_reused_until_settings_change():
+    """Test that sources of the same LLM share one model, replaced when the LLM changes."""
+    # 1. ARRANGE
+    source = make_llm_source()
+    source.llm.Id = 1
+    source.llm.APIKey = "first key"
+
+    # 2. ACT
+    with patch(
+        "autodoc.source.llm_models.init_chat_model", side_effect=lambda *args, **kwargs: FakeChatModel()
+    ) as init_chat_model:
+        first = LLMSourceService(source=source).get_model()
+        again = LLMSourceService(source=source).get_model()
+
+        source.llm.APIKey = "second key"
+        changed = LLMSourceService(source=source).get_model()
+
+    # 3. ASSERT
+    assert first is again
+    assert changed is not first
+    assert init_chat_model.call_count == 2
+
+
+def test_check_creates_the_model_once():
+    """Test that checking a source repeatedly doesn't create a model on every check."""
+    source = make_llm_source()
+    source.llm.Id = 1
+
+    with patch(
+        "autodoc.source.llm_models.init_chat_model", return_value=FakeChatModel()
+    ) as init_chat_model:
+        for _ in range(3):
+            assert LLMSourceService(source=source).check() == (True, None)
+
+    assert init_chat_model.call_count == 1
+
+
+def test_models_are_awaited_on_one_event_loop():
+    """Test that concurrent loads all run on the process's LLM event loop."""
+    loops = set()
+
+    async def record_loop():
+        loops.add(asyncio.get_running_loop())
+
+    run_async(record_loop())
+    run_async(record_loop())
+
+    assert len(loops) == 1
@@ -0,0 +1,122 @@
+"""Test the Parquet source."""
+
+from unittest.mock import MagicMock
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from autodoc.data.tables import ParquetSource
+from autodoc.source import ParquetSourceService
+from autodoc.source.parquet_source import parse_filters
+
+
+@pytest.fixture
+def parquet_path(tmp_path):
+    """Write a parquet file of orders in small row groups."""
+    table = pa.table(
+        {
+            "OrderId": list(range(10)),
+            "Region": ["North", "South"] * 5,
+            "ClientId": [index % 3 for index in range(10)],
+            "Notes": ["long text"] * 10,
+        }
+    )
+    path = tmp_path / "orders.parquet"
+    pq.write_table(table, path, row_group_size=3)
+    return path
+
+
+def make_service(path, columns=None, filters=None, is_splitter=True) -> ParquetSourceService:
+    """Return a service for the parquet file at path."""
+    source = MagicMock(
+        spec=ParquetSource, Columns=columns, Filters=filters, IsSplitter=is_splitter, FieldName="orders"
+    )
+    return ParquetSourceService(source=source, uploaded_filename=str(path))
+
+
+def test_load_data_projects_columns_and_filters_rows(parquet_path):
+    """Test that only the listed columns of rows meeting every filter are loaded."""
+    service = make_service(
+        parquet_path, columns="OrderId, ClientId", filters='Region = "North"\nOrderId >= 4'
+    )
+
+    service.load_data(current_data={})
+
+    assert service.data == [
+        {"OrderId": 4, "ClientId": 1},
+        {"OrderId": 6, "ClientId": 0},
+        {"OrderId": 8, "ClientId": 2},
+    ]
+
+
+def test_filters_read_fields_from_the_context(parquet_path):
+    """Test that :field filter values come from the context, and are its context fields."""
+    # 1. ARRANGE
+    service = make_service(parquet_path, columns="OrderId", filters="ClientId = :client_id")
+
+    # 2. ACT
+    records = list(service.stream_data(current_data={"client_id": 2, "other": "value"}))
+
+    # 3. ASSERT
+    assert service.context_fields == frozenset({"client_id"})
+    assert records == [{"OrderId": 2}, {"OrderId": 5}, {"OrderId": 8}]
+
+
+def test_splitter_only_reads_the_columns_read_downstream(parquet_path):
+    """Test that a splitter narrows its columns to the fields later read, and grouped rows don't."""
+    # 1. ARRANGE
+    splitter = make_service(parquet_path, filters='Region = "North"')
+    splitter.downstream_fields = frozenset({"OrderId", "client_id"})
+    narrowed = make_service(parquet_path, columns="OrderId, Notes")
+    narrowed.downstream_fields = frozenset({"Notes"})
+    grouped = make_service(parquet_path, columns="OrderId, Notes", is_splitter=False)
+    grouped.downstream_fields = frozenset({"orders"})
+
+    # 2. ACT
+    records = list(splitter.stream_data(current_data={}))
+    grouped.load_data(current_data={})
+
+    # 3. ASSERT
+    assert records == [{"OrderId": 0}, {"OrderId": 2}, {"OrderId": 4}, {"OrderId": 6}, {"OrderId": 8}]
+    assert next(iter(narrowed.stream_data(current_data={}))) == {"Notes": "long text"}
+    assert grouped.data[0] == {"OrderId": 0, "Notes": "long text"}
+
+
+def test_filter_field_missing_from_the_context(parquet_path):
+    """Test that a :field filter not in the context raises a clear ValueError."""
+    service = make_service(parquet_path, filters="ClientId = :client_id")
+
+    with pytest.raises(ValueError, match="Filter field 'client_id' is not in the context"):
+        service.load_data(current_data={"other": "value"})
+
+
+def test_splitter_streams_record_batches(parquet_path):
+    """Test that a splitter yields its rows lazily rather than loading the whole file."""
+    service = make_service(parquet_path, columns="OrderId")
+
+    records = service.stream_data(current_data={})
+
+    assert not isinstance(records, list)
+    assert next(iter(records)) == {"OrderId": 0}
+
+
+def test_check_reports_bad_filters_and_missing_columns(parquet_path):
+    """Test that check catches filters it can't parse and columns the file doesn't have."""
+    assert make_service(parquet_path, columns="OrderId").check() == (True, None)
+
+    is_ok, reason = make_service(parquet_path, filters="Region North").check()
+    assert not is_ok and reason.startswith("Invalid filter")
+
+    assert make_service(parquet_path, columns="OrderId, Missing").check() == (
+        False,
+        "Columns not in the parquet file: Missing",
+    )
+
+
+def test_parse_filters():
+    """Test parsing one condition per line, ignoring blank lines."""
+    assert parse_filters('Region = "North"\n\nYear >= 2024') == [
+        ("Region", "=", '"North"'),
+        ("Year", ">=", "2024"),
+    ]
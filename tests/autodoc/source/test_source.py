@@ -0,0 +1,133 @@
+"""Test loading sources for many contexts."""
+
+from unittest.mock import MagicMock, patch
+
+import os
+
+import pandas as pd
+import pytest
+
+from autodoc.data.tables import CSVSource, LLMSource
+from autodoc.source import CSVSourceService, LLMSourceService
+from autodoc.source.columnar_cache import ColumnarCache
+
+
+@pytest.fixture(autouse=True)
+def no_source_cache():
+    """Don't use the host's source cache in tests."""
+    with patch("autodoc.source.source.get_source_cache", return_value=None) as get_source_cache:
+        yield get_source_cache
+
+
+def test_independent_source_loads_once(tmp_path):
+    """Test that a CSV source is read once however many contexts it is loaded for."""
+    # 1. ARRANGE
+    csv_path = tmp_path / "clients.csv"
+    csv_path.write_text("Name,Age\nJohn,35\nAlice,24\n")
+
+    service = CSVSourceService(source=MagicMock(spec=CSVSource), uploaded_filename=str(csv_path))
+    contexts = [{"split": index} for index in range(5)]
+
+    # 2. ACT
+    with patch("autodoc.source.csv_source.pd.read_csv", wraps=pd.read_csv) as read:
+        results = service.load_data_many(contexts)
+        streamed = service.stream_data(current_data={"split": 6})
+
+    # 3. ASSERT
+    read.assert_called_once()
+    assert results[0] == [{"Name": "John", "Age": 35}, {"Name": "Alice", "Age": 24}]
+    assert all(result is results[0] for result in results)
+    assert streamed is results[0]
+
+
+def test_dependent_source_is_memoised_by_the_fields_it_uses():
+    """Test that an LLM source is only called once per distinct set of prompt variables."""
+    # 1. ARRANGE
+    source = MagicMock(spec=LLMSource, FieldName="summary")
+    source.LLMPromptTemplate = "Summarise {{ client }} in {{ region }}"
+
+    service = LLMSourceService(source=source)
+    calls = []
+
+    def load_data(current_data):
+        calls.append(current_data)
+        service.data[source.FieldName] = f"{current_data['client']} summary"
+
+    service.load_data = load_data
+
+    contexts = [
+        {"client": "ACME", "region": "North", "row": 1},
+        {"client": "ACME", "region": "North", "row": 2},
+        {"client": "Other", "region": "North", "row": 3},
+    ]
+
+    # 2. ACT
+    results = [service.stream_data(current_data=context) for context in contexts]
+
+    # 3. ASSERT
+    assert service.context_fields == frozenset({"client", "region"})
+    assert len(calls) == 2
+    assert results == [
+        {"summary": "ACME summary"},
+        {"summary": "ACME summary"},
+        {"summary": "Other summary"},
+    ]
+
+
+def test_unchanged_file_is_read_from_the_source_cache(tmp_path, no_source_cache):
+    """Test that a CSV is parsed once across runs, and again once it changes."""
+    # 1. ARRANGE
+    no_source_cache.return_value = ColumnarCache(directory=tmp_path / "cache")
+    csv_path = tmp_path / "clients.csv"
+    csv_path.write_text("Name,Age\nJohn,35\nAlice,24\n")
+
+    def load() -> list:
+        service = CSVSourceService(source=MagicMock(spec=CSVSource), uploaded_filename=str(csv_path))
+        service.load_data(current_data={})
+        return service.data
+
+    # 2. ACT
+    with patch("autodoc.source.csv_source.pd.read_csv", wraps=pd.read_csv) as read:
+        first = load()
+        second = load()
+        reads_before_change = read.call_count
+
+        csv_path.write_text("Name,Age\nJohn,36\n")
+        os.utime(csv_path, ns=(0, 10**9))
+        changed = load()
+
+    # 3. ASSERT
+    assert reads_before_change == 1
+    assert read.call_count == 2
+    assert first == second == [{"Name": "John", "Age": 35}, {"Name": "Alice", "Age": 24}]
+    assert changed == [{"Name": "John", "Age": 36}]
+
+
+def test_source_cache_evicts_least_recently_used(tmp_path):
+    """Test that the cache stays under its size, dropping the least recently read first."""
+    # 1. ARRANGE
+    cache = ColumnarCache(directory=tmp_path)
+    dataframe = pd.DataFrame({"value": range(1000)})
+
+    cache.put("first", dataframe)
+    cache.max_bytes = cache.path("first").stat().st_size * 2
+    cache.put("second", dataframe)
+    os.utime(cache.path("second"), (0, 0))
+
+    # 2. ACT
+    cache.get("first")
+    cache.put("third", dataframe)
+
+    # 3. ASSERT
+    assert cache.get("second") is None
+    assert cache.get("first")["value"].tolist() == list(range(1000))
+    assert cache.get("third") is not None
+
+
+def test_source_cache_skips_what_arrow_cannot_store(tmp_path):
+    """Test that columns of mixed types, or headings that aren't text, aren't cached."""
+    cache = ColumnarCache(directory=tmp_path)
+
+    assert cache.put("mixed", pd.DataFrame({"value": [1, "one"]})) is False
+    assert cache.put("numbered", pd.DataFrame({2024: [1]})) is False
+    assert list(tmp_path.iterdir()) == []
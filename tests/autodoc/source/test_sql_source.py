@@ -0,0 +1,67 @@
+"""Test the Database Source."""
+
+from unittest.mock import MagicMock, patch
+
+from autodoc.containers import RecordSet
+from autodoc.data.tables import DatabaseSource
+from autodoc.source import DatabaseSourceService
+
+
+def test_load_data_many_queries_distinct_parameters_once():
+    """Test that contexts sharing parameters are loaded with one parameter set."""
+    # 1. ARRANGE
+    source = MagicMock(spec=DatabaseSource)
+    source.SQLText = "SELECT Name FROM Client WHERE Region = :region"
+
+    with patch("autodoc.source.sql_source.MetaDatabase") as mock_meta_database_class:
+        service = DatabaseSourceService(source=source)
+
+    mock_meta_database = mock_meta_database_class.return_value
+    mock_meta_database.recordsets.return_value = [
+        RecordSet(["Name"], [("Alice",)]),
+        RecordSet(["Name"], [("Bob",), ("Carol",)]),
+    ]
+
+    contexts = [
+        {"region": "North", "split": 1},
+        {"region": "South", "split": 2},
+        {"region": "North", "split": 3},
+    ]
+
+    # 2. ACT
+    results = service.load_data_many(contexts)
+
+    # 3. ASSERT
+    mock_meta_database.recordsets.assert_called_once()
+    assert mock_meta_database.recordsets.call_args.kwargs["param_sets"] == [
+        {"region": "North"},
+        {"region": "South"},
+    ]
+    assert results == [
+        [{"Name": "Alice"}],
+        [{"Name": "Bob"}, {"Name": "Carol"}],
+        [{"Name": "Alice"}],
+    ]
+    assert results[0] is not results[2]
+
+
+def test_stream_data_streams_splitters_only():
+    """Test that a splitter streams its records, and grouped records load as usual."""
+    source = MagicMock(spec=DatabaseSource, IsSplitter=True)
+    source.SQLText = "SELECT Name FROM Client WHERE Region = :region"
+
+    with patch("autodoc.source.sql_source.MetaDatabase") as mock_meta_database_class:
+        service = DatabaseSourceService(source=source)
+
+    mock_meta_database = mock_meta_database_class.return_value
+    mock_meta_database.iter_records.return_value = iter([{"Name": "Alice"}])
+    mock_meta_database.recordset.return_value = RecordSet(["Name"], [("Bob",)])
+
+    streamed = service.stream_data(current_data={"region": "North", "other": 1})
+
+    mock_meta_database.iter_records.assert_called_once()
+    assert mock_meta_database.iter_records.call_args.kwargs["params"] == {"region": "North"}
+    assert list(streamed) == [{"Name": "Alice"}]
+
+    source.IsSplitter = False
+    assert service.stream_data(current_data={"region": "South"}) == [{"Name": "Bob"}]
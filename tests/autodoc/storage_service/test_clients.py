@@ -0,0 +1,89 @@
+"""Test the StorageClientRegistry."""
+
+import gc
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from autodoc.storage_service.clients import StorageClientRegistry, client_settings, storage_clients
+from autodoc.storage_service.s3 import S3StorageService
+
+
+@pytest.fixture(autouse=True)
+def no_storage_clients():
+    """Start every test with no shared clients."""
+    storage_clients.clear()
+    yield
+    storage_clients.clear()
+
+
+def test_s3_services_share_a_client_until_credentials_change():
+    """Test that services of one storage instance share its client, replaced on a new password."""
+    instance = {"url": "s3.test", "username": "u", "instance_id": 1}
+
+    first = S3StorageService(root="bucket", relative="a.docx", password="p", **instance)
+    second = S3StorageService(root="other", relative="b.docx", password="p", **instance)
+    changed = S3StorageService(root="bucket", relative="a.docx", password="q", **instance)
+
+    assert first.client is second.client
+    assert changed.client is not first.client
+    assert len(storage_clients.clients) == 1
+
+
+def test_idle_clients_are_closed_and_replaced():
+    """Test that a client unused for idle_seconds is closed and a new one created."""
+    # 1. ARRANGE
+    registry = StorageClientRegistry(idle_seconds=60)
+    settings = client_settings("url", "user", "password")
+    create = MagicMock(side_effect=lambda: MagicMock())
+
+    # 2. ACT
+    with patch("autodoc.storage_service.clients.time.monotonic", side_effect=[0, 30, 100]):
+        first = registry.get("s3", 1, settings, create)
+        again = registry.get("s3", 1, settings, create)
+        after_idle = registry.get("s3", 1, settings, create)
+
+    # 3. ASSERT
+    assert again is first
+    assert after_idle is not first
+    first.close.assert_called_once()
+
+
+def test_invalidate_forgets_the_instance_clients():
+    """Test that invalidating a storage instance closes only its clients."""
+    registry = StorageClientRegistry()
+    settings = client_settings("url", "user", "password")
+    client_1 = registry.get("s3", 1, settings, MagicMock)
+    client_2 = registry.get("s3", 2, settings, MagicMock)
+
+    registry.invalidate(instance_id=1)
+
+    client_1.close.assert_called_once()
+    assert registry.get("s3", 2, settings, MagicMock) is client_2
+    assert registry.get("s3", 1, settings, MagicMock) is not client_1
+
+
+def test_clients_in_use_are_only_closed_once_released():
+    """Test that a client is kept while its service lives, and closed once it is collected."""
+    # 1. ARRANGE
+    registry = StorageClientRegistry(idle_seconds=60)
+    settings = client_settings("url", "user", "password")
+    create = MagicMock(side_effect=lambda: MagicMock())
+    service = MagicMock()
+
+    # 2. ACT
+    with patch("autodoc.storage_service.clients.time.monotonic", return_value=0):
+        client = registry.get("s3", 1, settings, create, owner=service)
+
+    with patch("autodoc.storage_service.clients.time.monotonic", return_value=1000):
+        still_open = registry.get("s3", 1, settings, create)
+        registry.invalidate(instance_id=1)
+        closed_in_use = client.close.called
+
+        del service
+        gc.collect()
+
+    # 3. ASSERT
+    assert still_open is client
+    assert not closed_in_use
+    client.close.assert_called_once()
@@ -0,0 +1,141 @@
+"""Test the cache of remote files."""
+
+import multiprocessing
+import time
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import boto3
+from moto import mock_aws
+
+from autodoc.storage_service import file_cache
+from autodoc.storage_service.clients import storage_clients
+from autodoc.storage_service.file_cache import FileCache, read_through
+from autodoc.storage_service.s3 import S3StorageService
+
+
+def writer(content: bytes) -> MagicMock:
+    """Return a mock download that writes content to the path it is given."""
+    return MagicMock(side_effect=lambda path: Path(path).write_bytes(content))
+
+
+def slow_download(path: Path, count_path: Path):
+    """Count a download in count_path, then take a while to write path."""
+    with open(count_path, "a") as f:
+        f.write("x")
+    time.sleep(0.3)
+    Path(path).write_bytes(b"template")
+
+
+def get_in_process(directory: Path, count_path: Path):
+    """Get the same file from a cache in another process."""
+    location = ("s3", 1, "templates", "letter.docx")
+    FileCache(directory).get(location, '"v1"', lambda path: slow_download(path, count_path))
+
+
+def test_file_is_downloaded_again_only_when_its_version_changes(tmp_path):
+    """Test that a cached version is read from disk, and a new version downloaded."""
+    # 1. ARRANGE
+    cache = FileCache(tmp_path)
+    location = ("s3", 1, "templates", "letter.docx")
+    first, second = writer(b"first"), writer(b"second")
+
+    # 2. ACT
+    path = cache.get(location, '"v1"', first)
+    again = cache.get(location, '"v1"', second)
+    changed = cache.get(location, '"v2"', second)
+
+    # 3. ASSERT
+    assert path == again and path.read_bytes() == b"first"
+    assert changed.read_bytes() == b"second"
+    first.assert_called_once()
+    second.assert_called_once()
+
+
+def test_least_recently_used_files_are_evicted_over_size(tmp_path):
+    """Test that the least recently used files are removed once over max_bytes."""
+    # 1. ARRANGE
+    cache = FileCache(tmp_path, max_bytes=25)
+    used = cache.get(("s3", 1, "b", "used"), "v", writer(b"x" * 4))
+    time.sleep(0.01)
+    unused = cache.get(("s3", 1, "b", "unused"), "v", writer(b"x" * 6))
+    time.sleep(0.01)
+    cache.get(("s3", 1, "b", "used"), "v", writer(b""))
+
+    # 2. ACT
+    big = cache.get(("s3", 1, "b", "big"), "v", writer(b"x" * 20))
+
+    # 3. ASSERT
+    assert not unused.exists()
+    assert used.exists() and big.exists()
+
+
+def test_processes_download_a_file_once(tmp_path):
+    """Test that processes getting the same file at once wait for one download."""
+    # 1. ARRANGE
+    count_path = tmp_path / "downloads"
+    context = multiprocessing.get_context("fork")
+    processes = [
+        context.Process(target=get_in_process, args=(tmp_path / "cache", count_path))
+        for _ in range(3)
+    ]
+
+    # 2. ACT
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+    # 3. ASSERT
+    assert all(process.exitcode == 0 for process in processes)
+    assert count_path.read_text() == "x"
+
+
+def test_file_without_a_version_is_downloaded_to_a_temp_file(tmp_path):
+    """Test that a failed version check downloads to a temp file outside the cache."""
+    get_version = MagicMock(side_effect=OSError("HEAD not allowed"))
+
+    with patch.object(file_cache, "get_remote_file_cache", return_value=FileCache(tmp_path)):
+        path = read_through(("s3", 1, "b", "t.txt"), get_version, writer(b"text"))
+
+    assert path.read_bytes() == b"text"
+    assert path.parent != tmp_path
+    path.unlink()
+
+
+def test_s3_templates_are_revalidated_by_etag(tmp_path, monkeypatch):
+    """Test that an unchanged S3 object is read from the cache, and a changed one isn't."""
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    storage_clients.clear()
+
+    with (
+        mock_aws(),
+        patch.object(file_cache, "get_remote_file_cache", return_value=FileCache(tmp_path)),
+    ):
+        # 1. ARRANGE
+        s3 = boto3.client("s3", region_name="us-east-1")
+        s3.create_bucket(Bucket="templates")
+        s3.put_object(Bucket="templates", Key="letter.txt", Body=b"Dear {{ name }}")
+        service = S3StorageService(
+            root="templates",
+            relative="letter.txt",
+            url="s3.amazonaws.com",
+            username="u",
+            password="p",
+            instance_id=1,
+        )
+
+        # 2. ACT
+        download_file = service.client.download_file
+        with patch.object(service.client, "download_file", wraps=download_file) as download:
+            first = service.get_file()
+            second = service.get_file()
+            s3.put_object(Bucket="templates", Key="letter.txt", Body=b"Hello {{ name }}")
+            changed = service.get_file()
+
+        # 3. ASSERT
+        assert first == second
+        assert changed.read_bytes() == b"Hello {{ name }}"
+        assert download.call_count == 2
+
+    storage_clients.clear()
@@ -0,0 +1,33 @@
+"""Test saving to the local filesystem."""
+
+from unittest.mock import patch
+
+from autodoc.storage_service import base
+from autodoc.storage_service.linux import LinuxStorageService
+
+
+def test_saving_over_a_hard_linked_copy_leaves_the_source(tmp_path):
+    """Test that a document hard linked to another is replaced, not written through, when saved."""
+    # 1. ARRANGE
+    source = tmp_path / "first.txt"
+    source.write_text("Dear Acme")
+    service = LinuxStorageService(root=str(tmp_path), relative="{{ name }}.txt")
+    service.render({"name": "second"})
+
+    with patch.object(base, "DEDUP_HARD_LINKS", True):
+        service.save_copy(source)
+    linked = service.path.stat().st_ino == source.stat().st_ino
+
+    # 2. ACT
+    service.save_text("Dear Globex")
+    rendered = tmp_path / "rendered.txt"
+    rendered.write_text("Dear Initech")
+    service.temp_file_name = str(rendered)
+    with patch.object(base, "DEDUP_HARD_LINKS", True):
+        service.save_copy(source)
+    service.save_file()
+
+    # 3. ASSERT
+    assert linked
+    assert source.read_text() == "Dear Acme"
+    assert service.path.read_text() == "Dear Initech"
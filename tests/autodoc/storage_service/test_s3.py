@@ -0,0 +1,112 @@
+"""Test uploading to S3, against moto's stand-in."""
+
+import threading
+
+import boto3
+import pytest
+from boto3.s3.transfer import TransferConfig
+from botocore.exceptions import ClientError
+from moto import mock_aws
+
+from autodoc.storage_service import s3
+from autodoc.storage_service.clients import storage_clients
+from autodoc.storage_service.s3 import S3StorageService
+from autodoc.storage_service.uploads import UploadQueue
+
+
+@pytest.fixture
+def bucket(monkeypatch):
+    """Yield the name of an empty bucket on a stand-in S3."""
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    storage_clients.clear()
+
+    with mock_aws():
+        boto3.client("s3", region_name="us-east-1").create_bucket(Bucket="outputs")
+        yield "outputs"
+
+    storage_clients.clear()
+
+
+def read(bucket: str, key: str) -> bytes:
+    """Return the contents of an object."""
+    client = boto3.client("s3", region_name="us-east-1")
+    return client.get_object(Bucket=bucket, Key=key)["Body"].read()
+
+
+def make_service(bucket: str, relative: str, data: dict) -> S3StorageService:
+    """Return a rendered S3 storage service of the bucket."""
+    service = S3StorageService(
+        root=bucket, relative=relative, url="s3.amazonaws.com", username="u", password="p"
+    )
+    service.render(data)
+    return service
+
+
+def test_saves_are_uploaded_by_flush(bucket, tmp_path, monkeypatch):
+    """Test that text, small files and multipart files are all in the bucket after flush."""
+    # 1. ARRANGE
+    config = TransferConfig(multipart_threshold=5 * 2**20, multipart_chunksize=5 * 2**20)
+    monkeypatch.setattr(s3, "TRANSFER_CONFIG", config)
+    small = tmp_path / "small.docx"
+    small.write_bytes(b"small document")
+    large = tmp_path / "large.pdf"
+    large.write_bytes(b"x" * (11 * 2**20))
+
+    text_service = make_service(bucket, "{{ name }}.txt", {"name": "letter"})
+    file_service = make_service(bucket, "{{ name }}.docx", {"name": "small"})
+    large_service = make_service(bucket, "{{ name }}.pdf", {"name": "large"})
+
+    # 2. ACT
+    text_service.save_text("Dear client")
+    file_service.save_copy(small)
+    large_service.save_copy(large)
+    for service in (text_service, file_service, large_service):
+        service.flush()
+
+    # 3. ASSERT
+    assert read(bucket, "letter.txt") == b"Dear client"
+    assert read(bucket, "small.docx") == b"small document"
+    assert read(bucket, "large.pdf") == large.read_bytes()
+
+
+def test_failed_upload_is_raised_by_flush(bucket):
+    """Test that an upload to a missing bucket fails the flush rather than being lost."""
+    service = make_service("missing", "letter.txt", {})
+
+    service.save_text("Dear client")
+
+    with pytest.raises(ClientError):
+        service.flush()
+
+
+def test_upload_queue_waits_for_the_oldest_when_full():
+    """Test that no more than max_pending uploads are in progress, and all are run."""
+    queue = UploadQueue(workers=1)
+    done = []
+
+    for i in range(5):
+        queue.submit(lambda i=i: done.append(i))
+        assert len(queue.pending) <= queue.max_pending
+    queue.wait()
+
+    assert sorted(done) == [0, 1, 2, 3, 4]
+    assert not queue.pending
+
+
+def test_upload_queue_counts_uploads_from_the_oldest_in_progress():
+    """Test that in_progress counts every upload from the oldest unfinished one."""
+    # 1. ARRANGE
+    queue = UploadQueue(workers=2)
+    release = threading.Event()
+
+    # 2. ACT
+    queue.submit(release.wait)
+    queue.submit(lambda: None)
+    in_progress = queue.in_progress()
+    release.set()
+    queue.wait()
+
+    # 3. ASSERT
+    # the second upload may have finished, but the first hasn't.
+    assert in_progress == 2
+    assert queue.in_progress() == 0
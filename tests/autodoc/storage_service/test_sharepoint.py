@@ -0,0 +1,92 @@
+"""Test saving to SharePoint, against a mocked ClientContext or mocked HTTP requests."""
+
+import json
+from unittest.mock import MagicMock, patch
+
+import pytest
+import requests
+from office365.sharepoint.client_context import ClientContext
+
+from autodoc.storage_service import sharepoint
+from autodoc.storage_service.sharepoint import SharePointSiteStorageService
+
+
+@pytest.fixture
+def ctx():
+    """Yield the mocked ClientContext every SharePoint service is given."""
+    ctx = MagicMock(spec=ClientContext)
+    with patch.object(sharepoint, "sharepoint_context", return_value=ctx):
+        yield ctx
+
+
+def make_service(relative: str = "{{ client }}/letter.txt") -> SharePointSiteStorageService:
+    """Return a SharePoint storage service of the Documents library."""
+    return SharePointSiteStorageService(
+        root="Documents", relative=relative, url="https://sp.test", username="u", password="p"
+    )
+
+
+def test_each_folder_is_ensured_once(ctx):
+    """Test that documents saved to a folder already ensured don't ensure it again."""
+    service = make_service()
+
+    for client in ["acme", "acme", "acme", "globex"]:
+        service.render({"client": client})
+        service.save_text("Dear client")
+
+    ensured = [call.args[0] for call in ctx.web.ensure_folder_path.call_args_list]
+    assert ensured == ["Documents/acme", "Documents/globex"]
+
+
+def test_each_upload_is_sent_as_its_own_request():
+    """Test that a save is serialised by the library and sent at once, with nothing left queued."""
+    # 1. ARRANGE
+    sent = []
+
+    def request(session, method, url, **kwargs):
+        sent.append((url, kwargs.get("data")))
+        response = requests.Response()
+        response.status_code = 200
+        response.headers["Content-Type"] = "application/json"
+        response._content = json.dumps({"FormDigestValue": "digest", "FormDigestTimeoutSeconds": 1800}).encode()
+        return response
+
+    ctx = ClientContext("https://sp.test/sites/site")
+    service = make_service()
+    service.ensured_folders.add("Documents/acme")
+    service.render({"client": "acme"})
+
+    # 2. ACT
+    with (
+        patch.object(sharepoint, "sharepoint_context", return_value=ctx),
+        patch.object(ctx.authentication_context, "authenticate_request"),
+        patch("requests.Session.request", request),
+    ):
+        service.save_text("Dear client")
+        service.save_text("Dear client again")
+
+    # 3. ASSERT
+    uploads = [(url, data) for url, data in sent if "/Files/add(" in url]
+    assert [data for _, data in uploads] == [b"Dear client", b"Dear client again"]
+    assert all("url='letter.txt'" in url for url, _ in uploads)
+    assert not ctx.has_pending_request
+
+
+def test_large_files_are_uploaded_in_chunks(ctx, tmp_path):
+    """Test that a file over SHAREPOINT_CHUNK_MB is sent in an upload session."""
+    # 1. ARRANGE
+    service = make_service("reports/report.pdf")
+    service.render({})
+    service.temp_file_name = str(tmp_path / "report.pdf")
+    (tmp_path / "report.pdf").write_bytes(b"x" * 10)
+
+    # 2. ACT
+    with patch.object(sharepoint, "SHAREPOINT_CHUNK_MB", 0):
+        service.save_file()
+
+    # 3. ASSERT
+    files = ctx.web.get_folder_by_server_relative_url.return_value.files
+    files.create_upload_session.assert_called_once_with(
+        service.temp_file_name, 0, file_name="report.pdf"
+    )
+    files.add.assert_not_called()
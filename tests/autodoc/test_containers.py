@@ -0,0 +1,82 @@
+"""Test the data containers."""
+
+import pickle
+
+from jinja2 import Template
+
+from autodoc.containers import Context, RecordSet
+
+
+def test_context_layers_share_parents():
+    """Test that merged contexts add a layer over a shared parent instead of copying it."""
+    # 1. ARRANGE
+    rows = [{"row": 1}, {"row": 2}]
+    parent = Context({"client": "ACME"}).merge({"rows": rows})
+
+    # 2. ACT
+    first = parent.merge({"split": "one"})
+    second = parent.merge({"split": "two", "client": "Other"})
+
+    # 3. ASSERT
+    assert first.parent is parent and second.parent is parent
+    assert first.layer == {"split": "one"}
+    assert first["rows"] is rows
+
+    assert first == {"client": "ACME", "rows": rows, "split": "one"}
+    assert second == {"client": "Other", "rows": rows, "split": "two"}
+    assert parent == {"client": "ACME", "rows": rows}
+    assert list(second) == ["client", "rows", "split"]
+    assert len(second) == 3
+    assert "split" in first and "split" not in parent
+
+
+def test_context_renders_and_pickles_as_a_mapping():
+    """Test that a context can be rendered by jinja2 and sent to another process."""
+    context = Context({"name": "John"}).merge({"age": 35})
+
+    assert Template("{{ name }} is {{ age }}").render(context) == "John is 35"
+    assert Template("{{ name }} is {{ age }}").render(**context) == "John is 35"
+    assert pickle.loads(pickle.dumps(context)) == {"name": "John", "age": 35}
+    assert context.to_dict() == {"name": "John", "age": 35}
+
+
+def test_recordset_stores_columns_and_reads_rows():
+    """Test that a RecordSet shares its headings and reads rows through views."""
+    # 1. ARRANGE
+    recordset = RecordSet(["Name", "Age"], [("John", 35), ("Alice", 24)])
+
+    # 2. ACT
+    rows = recordset.data
+
+    # 3. ASSERT
+    assert recordset.headings == ("Name", "Age")
+    assert recordset.column("Age") == [35, 24]
+    assert recordset.column("Age") is recordset.column("Age")
+    assert recordset.column("Missing") == []
+
+    assert rows == [{"Name": "John", "Age": 35}, {"Name": "Alice", "Age": 24}]
+    assert rows[1]["Name"] == "Alice"
+    assert rows[1].Age == 24
+    assert len(recordset) == 2
+
+
+def test_recordset_rows_render_and_pickle():
+    """Test that rows work in templates as row.field and row["field"], and in other processes."""
+    recordset = RecordSet(["Name", "Age"], [("John", 35), ("Alice", 24)])
+    template = Template("{% for row in rows %}{{ row.Name }} {{ row['Age'] }}|{% endfor %}")
+
+    assert template.render(rows=recordset.data) == "John 35|Alice 24|"
+    assert template.render(rows=pickle.loads(pickle.dumps(recordset.data))) == "John 35|Alice 24|"
+    assert RecordSet(["Name"], []).data == []
+
+
+def test_row_pickles_without_its_recordset():
+    """Test that a pickled row is a dict of its fields, not the columns of every row."""
+    recordset = RecordSet(["Name", "Notes"], [(f"Client {i}", "x" * 100) for i in range(1000)])
+    row = recordset.data[1]
+
+    pickled = pickle.dumps(Context({"total": 10}).merge({"client": row}))
+
+    assert pickle.loads(pickled)["client"] == {"Name": "Client 1", "Notes": "x" * 100}
+    assert type(pickle.loads(pickle.dumps(row))) is dict
+    assert len(pickled) < len(pickle.dumps(dict(row))) + 200
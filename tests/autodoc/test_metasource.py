@@ -0,0 +1,128 @@
+"""Test the MetaDatabase."""
+
+from unittest.mock import MagicMock, patch
+
+from sqlalchemy import text
+
+from autodoc.data.tables import DatabaseMetaSource
+from autodoc.metasource import EngineRegistry, MetaDatabase
+
+
+def make_meta_database(tmp_path) -> MetaDatabase:
+    """Return a MetaDatabase over a small SQLite database."""
+    database = MagicMock(spec=DatabaseMetaSource, Id=1)
+    database.ConnectionString = f"sqlite:///{tmp_path / 'meta.db'}"
+    meta_database = MetaDatabase(database=database)
+
+    with meta_database.engine.begin() as connection:
+        connection.execute(text("CREATE TABLE Client (Id INTEGER, Name TEXT)"))
+        connection.execute(text("INSERT INTO Client VALUES (1, 'Alice'), (1, 'Bob'), (2, 'Carol')"))
+
+    return meta_database
+
+
+def test_recordsets_batches_parameter_sets(tmp_path):
+    """Test that each parameter set gets its own rows back, in order."""
+    meta_database = make_meta_database(tmp_path)
+    sql = "SELECT Name FROM Client WHERE Id = :client_id ORDER BY Name DESC;"
+
+    recordsets = meta_database.recordsets(
+        sql=sql, param_sets=[{"client_id": 2}, {"client_id": 1}, {"client_id": 3}]
+    )
+
+    assert [recordset.data for recordset in recordsets] == [
+        [{"Name": "Carol"}],
+        [{"Name": "Bob"}, {"Name": "Alice"}],
+        [],
+    ]
+    assert all(recordset.headings == ("Name",) for recordset in recordsets)
+
+
+def test_recordsets_only_batches_unordered_queries(tmp_path):
+    """Test that a query with an ORDER BY runs once per parameter set, so its order is kept."""
+    # 1. ARRANGE
+    meta_database = make_meta_database(tmp_path)
+    param_sets = [{"client_id": 1}, {"client_id": 2}]
+    ordered = "SELECT Name FROM Client WHERE Id = :client_id\norder  by Name DESC"
+    unordered = "SELECT Name FROM Client WHERE Id = :client_id"
+
+    # 2. ACT
+    with patch.object(
+        MetaDatabase, "get_batched_recordsets", wraps=MetaDatabase.get_batched_recordsets
+    ) as batched:
+        ordered_recordsets = meta_database.recordsets(sql=ordered, param_sets=param_sets)
+        batched_calls = batched.call_count
+        meta_database.recordsets(sql=unordered, param_sets=param_sets)
+
+    # 3. ASSERT
+    assert batched_calls == 0
+    assert batched.call_count == 1
+    assert ordered_recordsets[0].data == [{"Name": "Bob"}, {"Name": "Alice"}]
+
+
+def test_recordsets_matches_unbatched(tmp_path):
+    """Test that a batch size of 1 gives the same results as batching."""
+    meta_database = make_meta_database(tmp_path)
+    sql = "SELECT Id, Name FROM Client WHERE Id = :client_id"
+    param_sets = [{"client_id": 1}, {"client_id": 2}]
+
+    batched = meta_database.recordsets(sql=sql, param_sets=param_sets, batch_size=50)
+    unbatched = meta_database.recordsets(sql=sql, param_sets=param_sets, batch_size=1)
+
+    assert [r.data for r in batched] == [r.data for r in unbatched]
+    assert [r.data for r in unbatched] == [
+        meta_database.recordset(sql=sql, params=params).data for params in param_sets
+    ]
+
+
+def test_engine_registry_reuses_engines_until_the_connection_string_changes(tmp_path):
+    """Test that engines are shared per database, and replaced when it is edited."""
+    # 1. ARRANGE
+    registry = EngineRegistry()
+    database = MagicMock(spec=DatabaseMetaSource, Id=1)
+    database.ConnectionString = f"sqlite:///{tmp_path / 'first.db'}"
+    other_database = MagicMock(spec=DatabaseMetaSource, Id=2)
+    other_database.ConnectionString = f"sqlite:///{tmp_path / 'other.db'}"
+
+    # 2. ACT
+    engine = registry.get(database)
+    same_engine = registry.get(database)
+    other_engine = registry.get(other_database)
+
+    database.ConnectionString = f"sqlite:///{tmp_path / 'second.db'}"
+    edited_engine = registry.get(database)
+
+    registry.invalidate(database_id=1)
+    recreated_engine = registry.get(database)
+
+    # 3. ASSERT
+    assert same_engine is engine
+    assert other_engine is not engine
+    assert edited_engine is not engine
+    assert str(edited_engine.url).endswith("second.db")
+    assert recreated_engine is not edited_engine
+
+
+def test_iter_records_streams_rows(tmp_path):
+    """Test that records are yielded lazily and match the buffered recordset."""
+    meta_database = make_meta_database(tmp_path)
+    sql = "SELECT Id, Name FROM Client WHERE Id = :client_id"
+
+    records = meta_database.iter_records(sql=sql, params={"client_id": 1}, yield_per=1)
+
+    assert next(records) == {"Id": 1, "Name": "Alice"}
+    assert list(records) == [{"Id": 1, "Name": "Bob"}]
+
+
+def test_dispose_all_forgets_every_engine(tmp_path):
+    """Test that dispose_all, run at exit, disposes and forgets every engine."""
+    registry = EngineRegistry()
+    database = MagicMock(spec=DatabaseMetaSource, Id=1)
+    database.ConnectionString = f"sqlite:///{tmp_path / 'first.db'}"
+    engine = registry.get(database)
+
+    with patch.object(engine, "dispose") as dispose:
+        registry.dispose_all()
+
+    dispose.assert_called_once()
+    assert registry.engines == {}
@@ -64,3 +64,66 @@ def test_zip_downloads_single_file_in_dir(tmp_path: Path):
         assert len(namelist) == 1
         assert "single.pdf" in namelist
         assert zipf.read("single.pdf").decode() == "pdf content"
+
+
+def test_documents_added_as_saved_are_stored_or_compressed(tmp_path: Path):
+    """Test that saved documents are zipped as they arrive, storing compressed formats."""
+    # 1. ARRANGE
+    download_dir = tmp_path / "downloads"
+    download_dir.mkdir()
+    archiver = Archiver()
+    archiver.start(download_dir)
+
+    # 2. ACT
+    (download_dir / "letter.docx").write_bytes(b"docx content")
+    archiver.add(download_dir / "letter.docx")
+    (download_dir / "notes.txt").write_text("notes " * 100)
+    archiver.add(download_dir / "notes.txt")
+    archiver.add(tmp_path / "elsewhere.txt")  # not a download, so ignored
+
+    written_before_finishing = archiver.part_path(download_dir).exists()
+    archiver.zip_downloads(download_dir)
+
+    # 3. ASSERT
+    assert written_before_finishing
+    assert not archiver.part_path(download_dir).exists()
+
+    with zipfile.ZipFile(tmp_path / "downloads.zip", "r") as zipf:
+        assert zipf.getinfo("letter.docx").compress_type == zipfile.ZIP_STORED
+        assert zipf.getinfo("notes.txt").compress_type == zipfile.ZIP_DEFLATED
+        assert zipf.read("notes.txt").decode() == "notes " * 100
+
+
+def test_document_saved_over_after_being_added_is_zipped_again(tmp_path: Path):
+    """Test that a download saved over after it was zipped ends up in the zip once, as last saved."""
+    # 1. ARRANGE
+    download_dir = tmp_path / "downloads"
+    download_dir.mkdir()
+    archiver = Archiver()
+    archiver.start(download_dir)
+
+    # 2. ACT
+    (download_dir / "out.txt").write_text("first")
+    archiver.add(download_dir / "out.txt")
+    (download_dir / "out.txt").write_text("second")
+    archiver.add(download_dir / "out.txt")
+    archiver.zip_downloads(download_dir)
+
+    # 3. ASSERT
+    with zipfile.ZipFile(tmp_path / "downloads.zip", "r") as zipf:
+        assert zipf.namelist() == ["out.txt"]
+        assert zipf.read("out.txt").decode() == "second"
+
+
+def test_discard_removes_the_partial_zip(tmp_path: Path):
+    """Test that a zip being written is removed when the run fails."""
+    download_dir = tmp_path / "downloads"
+    download_dir.mkdir()
+    (download_dir / "a.pdf").write_bytes(b"pdf")
+    archiver = Archiver()
+    archiver.start(download_dir)
+    archiver.add(download_dir / "a.pdf")
+
+    archiver.discard()
+
+    assert list(tmp_path.iterdir()) == [download_dir]
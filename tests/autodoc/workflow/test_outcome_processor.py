@@ -1,11 +1,21 @@
 """Test the OutcomeProcessor."""
 
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from unittest.mock import MagicMock, call, patch
+from unittest.mock import MagicMock, patch
 
-from autodoc.data.tables import Outcome, OutcomeInstance, WorkflowInstance
-from autodoc.outcome import OutcomeService
+import pytest
+
+from sqlalchemy import create_engine
+
+from autodoc.containers import Context, RecordSet
+from autodoc.data import DatabaseManager
+from autodoc.data.base import Base
+from autodoc.data.tables import Outcome, OutcomeInstance, OutcomeType, WorkflowInstance
+from autodoc.outcome import OutcomeService, TextOutcomeService
+from autodoc.storage_service.uploads import get_upload_executor
 from autodoc.workflow.outcome_processor import OutcomeProcessor
+from autodoc.workflow.outcome_service_factory import OutcomeServiceFactory
 
 
 def test_builds_correctly(mock_outcome_service_factory, mock_manager):
@@ -31,9 +41,8 @@ def test_build_outcome_instance_array(mock_outcome_service_factory, mock_manager
     # Mock the workflow instance
     mock_workflow_instance = MagicMock(spec=WorkflowInstance, Id=1)
 
-    # Mock the return value for the database 'add' call
-    # Each time `add` is called, it should return a new mock instance
-    mock_manager.outcome_instances.add.side_effect = [
+    # Mock the return value for the database 'add_all' call, one instance per outcome/context
+    mock_manager.outcome_instances.add_all.return_value = [
         MagicMock(spec=OutcomeInstance, Id=i) for i in range(101, 107)
     ]
 
@@ -50,23 +59,19 @@ def test_build_outcome_instance_array(mock_outcome_service_factory, mock_manager
     # Check that we got 2 outcomes * 3 contexts = 6 total items
     assert len(outcome_array) == 6
 
-    # Check that the database 'add' method was called 6 times
-    assert mock_manager.outcome_instances.add.call_count == 6
-    # Check that 'commit' was called after each 'add'
-    assert mock_manager.commit.call_count == 6
-
-    # Verify the arguments for the first and last calls to 'add'
-    mock_manager.outcome_instances.add.assert_has_calls(
-        [
-            call(outcome_id=10, instance_id=1),
-            call(outcome_id=20, instance_id=1),
-        ]
+    # Check that all 6 instances were added in a single call and committed once
+    mock_manager.outcome_instances.add_all.assert_called_once_with(
+        outcome_ids=[10, 10, 10, 20, 20, 20], instance_id=1
     )
+    assert mock_manager.commit.call_count == 1
 
     # Check the structure of the first returned item
     assert outcome_array[0]["outcome"] is mock_outcome_1
     assert outcome_array[0]["context"] == {"client": "A"}
-    assert outcome_array[0]["instance"].Id == 101  # From our side_effect
+    assert outcome_array[0]["instance"].Id == 101  # From our return_value
+    assert outcome_array[5]["outcome"] is mock_outcome_2
+    assert outcome_array[5]["context"] == {"client": "C"}
+    assert outcome_array[5]["instance"].Id == 106
 
 
 def test_process_method(mock_outcome_service_factory, mock_manager):
@@ -110,6 +115,7 @@ def test_process_method(mock_outcome_service_factory, mock_manager):
 
         # Create the main service mock and attach the storage mock to the correct attribute
         mock_service = MagicMock(spec=OutcomeService, output_storage_service=mock_storage)
+        mock_service.pending_saves.return_value = 0
 
         mock_outcome_service_factory.create.return_value = mock_service
 
@@ -140,9 +146,8 @@ def test_process_method(mock_outcome_service_factory, mock_manager):
         mock_service.save.assert_called_once()
 
         # Verify the database state was updated
-        mock_manager.outcome_instances.set_complete.assert_called_once_with(outcome_instance_id=101)
-        mock_manager.outcome_instances.set_rendered_name.assert_called_once_with(
-            outcome_instance_id=101, rendered_name="rendered_file.pdf"
+        mock_manager.outcome_instances.set_complete_many.assert_called_once_with(
+            rendered_names={101: "rendered_file.pdf"}
         )
         # ANY is used because we don't know how many times it might be called
         mock_manager.commit.assert_called_with()
@@ -170,3 +175,353 @@ def test_downloads_exist(mock_outcome_service_factory, mock_manager):
 
     # Case 3: Empty list
     assert processor.downloads_exist(outcomes=[]) is False
+
+
+def test_process_parallel_marks_each_instance_complete(mock_outcome_service_factory, mock_manager):
+    """Test that the parallel path renders in the pool and records completion per instance."""
+    # 1. ARRANGE
+    processor = OutcomeProcessor(
+        outcome_service_factory=mock_outcome_service_factory, manager=mock_manager, workers=2
+    )
+
+    mock_outcome = MagicMock(spec=Outcome, Id=10, Name="Invoice", is_download=True)
+    outcome_array = [
+        {"outcome": mock_outcome, "instance": MagicMock(spec=OutcomeInstance, Id=101), "context": {"n": 1}},
+        {"outcome": mock_outcome, "instance": MagicMock(spec=OutcomeInstance, Id=102), "context": {"n": 2}},
+    ]
+    download_dir = Path("/tmp/downloads")
+
+    def fake_render(outcome_id, context, download_dir, uploaded_filename):
+        return f"{outcome_id}-{context['n']}-{uploaded_filename}.pdf", None
+
+    # 2. ACT
+    with (
+        patch.object(processor, "build_outcome_instance_array", return_value=outcome_array),
+        patch("autodoc.workflow.outcome_processor.ProcessPoolExecutor", ThreadPoolExecutor),
+        patch("autodoc.workflow.outcome_processor._init_worker"),
+        patch("autodoc.workflow.outcome_processor._render_in_worker", side_effect=fake_render),
+    ):
+        processor.process(
+            outcomes=[mock_outcome],
+            contexts=[{"n": 1}, {"n": 2}],
+            workflow_instance=MagicMock(spec=WorkflowInstance, Id=1),
+            upload_mapping={"Invoice": "template"},
+            download_dir=download_dir,
+        )
+
+    # 3. ASSERT
+    # services are built inside the pool, not by the parent's factory
+    mock_outcome_service_factory.create.assert_not_called()
+
+    rendered_names = {}
+    for completed in mock_manager.outcome_instances.set_complete_many.call_args_list:
+        rendered_names.update(completed.kwargs["rendered_names"])
+
+    assert rendered_names == {101: "10-1-template.pdf", 102: "10-2-template.pdf"}
+
+
+def test_iter_outcome_instances_batches_streamed_contexts(mock_outcome_service_factory, mock_manager):
+    """Test that streamed contexts have their outcome instances created a batch at a time."""
+    # 1. ARRANGE
+    processor = OutcomeProcessor(
+        outcome_service_factory=mock_outcome_service_factory, manager=mock_manager, batch_size=2
+    )
+    mock_outcome = MagicMock(spec=Outcome, Id=10)
+    mock_workflow_instance = MagicMock(spec=WorkflowInstance, Id=1)
+    mock_manager.outcome_instances.add_all.side_effect = lambda outcome_ids, instance_id: [
+        MagicMock(spec=OutcomeInstance) for _ in outcome_ids
+    ]
+
+    contexts = ({"client": client} for client in "ABCDE")
+
+    # 2. ACT
+    outcome_array = processor.iter_outcome_instances(
+        [mock_outcome], contexts, mock_workflow_instance
+    )
+    first = next(outcome_array)
+
+    # 3. ASSERT
+    assert first["context"] == {"client": "A"}
+    assert mock_manager.outcome_instances.add_all.call_count == 1
+
+    rest = list(outcome_array)
+    assert [info["context"]["client"] for info in rest] == ["B", "C", "D", "E"]
+    assert mock_manager.outcome_instances.add_all.call_count == 3
+
+
+def test_process_passes_only_the_fields_each_outcome_reads(mock_outcome_service_factory, mock_manager):
+    """Test that each outcome is rendered with just the context fields its templates read."""
+    # 1. ARRANGE
+    processor = OutcomeProcessor(
+        outcome_service_factory=mock_outcome_service_factory, manager=mock_manager
+    )
+    invoice = MagicMock(spec=Outcome, Id=10, Name="Invoice", is_download=True)
+    invoice.DownloadName = "{{ client }}.pdf"
+    letter = MagicMock(spec=Outcome, Id=20, Name="Letter", is_download=True)
+    context = {"client": "A", "total": 5, "notes": "x" * 1000}
+
+    mock_outcome_service_factory.template_fields.side_effect = lambda outcome, **_: (
+        frozenset({"total"}) if outcome is invoice else None
+    )
+    services = []
+
+    def create(**_):
+        services.append(MagicMock(spec=OutcomeService, output_storage_service=MagicMock()))
+        services[-1].pending_saves.return_value = 0
+        return services[-1]
+
+    mock_outcome_service_factory.create.side_effect = create
+    outcome_array = [
+        {"outcome": invoice, "instance": MagicMock(spec=OutcomeInstance, Id=101), "context": context},
+        {"outcome": letter, "instance": MagicMock(spec=OutcomeInstance, Id=102), "context": context},
+    ]
+
+    # 2. ACT
+    with patch.object(processor, "build_outcome_instance_array", return_value=outcome_array):
+        processor.process(
+            outcomes=[invoice, letter],
+            contexts=[context],
+            workflow_instance=MagicMock(spec=WorkflowInstance, Id=1),
+            upload_mapping={},
+            download_dir=Path("/tmp/downloads"),
+        )
+
+    # 3. ASSERT
+    # each template is only read once.
+    assert mock_outcome_service_factory.template_fields.call_count == 2
+    services[0].render.assert_called_once_with(data={"client": "A", "total": 5})
+    services[1].render.assert_called_once_with(data=context)
+
+
+def test_find_fields_adds_the_output_path_to_the_template(mock_outcome_service_factory, mock_manager):
+    """Test that an outcome reads its template's and output path's fields, or all if unknown."""
+    # 1. ARRANGE
+    processor = OutcomeProcessor(
+        outcome_service_factory=mock_outcome_service_factory, manager=mock_manager
+    )
+    invoice = MagicMock(spec=Outcome, Id=10, Name="Invoice", is_download=True)
+    invoice.DownloadName = "{{ client }}.pdf"
+    letter = MagicMock(spec=Outcome, Id=20, Name="Letter")
+
+    mock_outcome_service_factory.template_fields.side_effect = [
+        frozenset({"total"}),
+        ValueError("not a docx"),
+    ]
+
+    # 2. ACT
+    fields, template_fields = processor.find_fields([invoice, letter], upload_mapping={})
+
+    # 3. ASSERT
+    assert fields == {10: frozenset({"client", "total"}), 20: None}
+    assert template_fields == {10: frozenset({"total"}), 20: None}
+
+
+def test_process_copies_documents_with_the_same_template_inputs(tmp_path, mock_manager):
+    """Test that a document whose template reads the same values is copied, not rendered."""
+    # 1. ARRANGE
+    (tmp_path / "template.txt").write_text("Hello {{ name }}")
+    download_dir = tmp_path / "downloads"
+    download_dir.mkdir()
+
+    outcome = MagicMock(spec=Outcome, Id=10, Name="Letter", is_download=True)
+    outcome.outcome_type.Name = "Text"
+    outcome.DownloadName = "{{ id }}.txt"
+
+    contexts = [{"name": "A", "id": 1}, {"name": "A", "id": 2}, {"name": "B", "id": 3}]
+    outcome_array = [
+        {"outcome": outcome, "instance": MagicMock(spec=OutcomeInstance, Id=100 + i), "context": c}
+        for i, c in enumerate(contexts)
+    ]
+    processor = OutcomeProcessor(
+        outcome_service_factory=OutcomeServiceFactory(), manager=mock_manager
+    )
+
+    # 2. ACT
+    with (
+        patch.object(processor, "build_outcome_instance_array", return_value=outcome_array),
+        patch.object(
+            TextOutcomeService, "render", autospec=True, side_effect=TextOutcomeService.render
+        ) as render,
+    ):
+        processor.process(
+            outcomes=[outcome],
+            contexts=contexts,
+            workflow_instance=MagicMock(spec=WorkflowInstance, Id=1),
+            upload_mapping={"Letter": str(tmp_path / "template.txt")},
+            download_dir=download_dir,
+        )
+
+    # 3. ASSERT
+    assert render.call_count == 2
+    assert [(download_dir / f"{i}.txt").read_text() for i in (1, 2, 3)] == [
+        "Hello A",
+        "Hello A",
+        "Hello B",
+    ]
+    mock_manager.outcome_instances.set_complete_many.assert_called_once_with(
+        rendered_names={100: "1.txt", 101: "2.txt", 102: "3.txt"}
+    )
+
+
+def test_process_parallel_copies_duplicates_once_rendered(tmp_path, mock_manager):
+    """Test that a duplicate of a document still being rendered is copied once it is saved."""
+    # 1. ARRANGE
+    (tmp_path / "template.txt").write_text("Hello {{ name }}")
+    outcome = MagicMock(spec=Outcome, Id=10, Name="Letter", is_download=True)
+    outcome.outcome_type.Name = "Text"
+    outcome.DownloadName = "{{ id }}.txt"
+
+    contexts = [{"name": "A", "id": 1}, {"name": "A", "id": 2}]
+    outcome_array = [
+        {"outcome": outcome, "instance": MagicMock(spec=OutcomeInstance, Id=100 + i), "context": c}
+        for i, c in enumerate(contexts)
+    ]
+    processor = OutcomeProcessor(
+        outcome_service_factory=OutcomeServiceFactory(), manager=mock_manager, workers=2
+    )
+    rendered = []
+
+    def fake_render(outcome_id, context, download_dir, uploaded_filename):
+        rendered.append(context["id"])
+        path = download_dir / f"{context['id']}.txt"
+        path.write_text(f"Hello {context['name']}")
+        return path.name, path
+
+    # 2. ACT
+    with (
+        patch.object(processor, "build_outcome_instance_array", return_value=outcome_array),
+        patch("autodoc.workflow.outcome_processor.ProcessPoolExecutor", ThreadPoolExecutor),
+        patch("autodoc.workflow.outcome_processor._init_worker"),
+        patch("autodoc.workflow.outcome_processor._render_in_worker", side_effect=fake_render),
+    ):
+        processor.process(
+            outcomes=[outcome],
+            contexts=contexts,
+            workflow_instance=MagicMock(spec=WorkflowInstance, Id=1),
+            upload_mapping={"Letter": str(tmp_path / "template.txt")},
+            download_dir=tmp_path,
+        )
+
+    # 3. ASSERT
+    assert rendered == [1]
+    assert (tmp_path / "2.txt").read_text() == "Hello A"
+
+
+def test_process_builds_each_outcome_service_once(mock_outcome_service_factory, mock_manager):
+    """Test that an outcome's service is created once and reset before each document."""
+    # 1. ARRANGE
+    processor = OutcomeProcessor(
+        outcome_service_factory=mock_outcome_service_factory, manager=mock_manager
+    )
+    outcome = MagicMock(spec=Outcome, Id=10, Name="Invoice", is_download=False)
+    contexts = [{"client": client} for client in "ABC"]
+    outcome_array = [
+        {"outcome": outcome, "instance": MagicMock(spec=OutcomeInstance, Id=100 + i), "context": c}
+        for i, c in enumerate(contexts)
+    ]
+    mock_service = MagicMock(spec=OutcomeService, output_storage_service=MagicMock())
+    mock_service.pending_saves.return_value = 0
+    mock_outcome_service_factory.create.return_value = mock_service
+
+    # 2. ACT
+    with patch.object(processor, "build_outcome_instance_array", return_value=outcome_array):
+        processor.process(
+            outcomes=[outcome],
+            contexts=contexts,
+            workflow_instance=MagicMock(spec=WorkflowInstance, Id=1),
+            upload_mapping={},
+            download_dir=Path("/tmp/downloads"),
+        )
+
+    # 3. ASSERT
+    mock_outcome_service_factory.create.assert_called_once()
+    assert mock_service.reset.call_count == 3
+    assert [c.kwargs["data"] for c in mock_service.render.call_args_list] == contexts
+
+
+def test_process_only_completes_documents_once_saved(mock_outcome_service_factory, mock_manager):
+    """Test that documents still uploading aren't complete, nor any left when an upload fails."""
+    # 1. ARRANGE
+    processor = OutcomeProcessor(
+        outcome_service_factory=mock_outcome_service_factory, manager=mock_manager
+    )
+    outcome = MagicMock(spec=Outcome, Id=10, Name="Invoice", is_download=False)
+    contexts = [{"client": client} for client in "ABC"]
+    outcome_array = [
+        {"outcome": outcome, "instance": MagicMock(spec=OutcomeInstance, Id=100 + i), "context": c}
+        for i, c in enumerate(contexts)
+    ]
+    mock_service = MagicMock(spec=OutcomeService, output_storage_service=MagicMock())
+    # one upload is always in progress, and the last fails.
+    mock_service.pending_saves.return_value = 1
+    mock_service.flush.side_effect = RuntimeError("upload failed")
+    mock_outcome_service_factory.create.return_value = mock_service
+
+    # 2. ACT
+    with (
+        patch.object(processor, "build_outcome_instance_array", return_value=outcome_array),
+        pytest.raises(RuntimeError, match="upload failed"),
+    ):
+        processor.process(
+            outcomes=[outcome],
+            contexts=contexts,
+            workflow_instance=MagicMock(spec=WorkflowInstance, Id=1),
+            upload_mapping={},
+            download_dir=Path("/tmp/downloads"),
+        )
+
+    # 3. ASSERT
+    completed = [
+        instance_id
+        for call in mock_manager.outcome_instances.set_complete_many.call_args_list
+        for instance_id in call.kwargs["rendered_names"]
+    ]
+    assert completed == [100, 101]
+
+
+def test_process_parallel_renders_in_a_real_pool(tmp_path):
+    """Test rendering with pool processes that load their outcome from a real database."""
+    # 1. ARRANGE
+    db_file = tmp_path / "autodoc.db"
+    Base.metadata.create_all(create_engine(f"sqlite:///{db_file}"))
+    manager = DatabaseManager(db_file=str(db_file))
+
+    workflow = manager.workflows.add(name="Letters")
+    outcome = Outcome(outcome_type=OutcomeType(Name="Text"), Name="Letter")
+    outcome.DownloadName = "{{ client.name }}.txt"
+    workflow.outcomes.append(outcome)
+    workflow_instance = manager.workflow_instances.add(workflow_id=workflow.Id)
+    manager.commit()
+
+    (tmp_path / "template.txt").write_text("Dear {{ client.name }}, you owe {{ total }}")
+    download_dir = tmp_path / "downloads"
+    download_dir.mkdir()
+
+    # contexts are layered Contexts holding Rows, as the source loader builds them.
+    clients = RecordSet(["name"], [("Acme",), ("Globex",), ("Initech",)])
+    base = Context({"total": 10})
+    contexts = [base.merge({"client": row}) for row in clients.data]
+
+    processor = OutcomeProcessor(
+        outcome_service_factory=OutcomeServiceFactory(),
+        manager=manager,
+        workers=2,
+        db_file=str(db_file),
+    )
+    # the pool is forked while the upload threads are running, as it is in a real run.
+    get_upload_executor().submit(lambda: None).result()
+
+    # 2. ACT
+    processor.process(
+        outcomes=[outcome],
+        contexts=contexts,
+        workflow_instance=workflow_instance,
+        upload_mapping={"Letter": str(tmp_path / "template.txt")},
+        download_dir=download_dir,
+    )
+
+    # 3. ASSERT
+    assert (download_dir / "Globex.txt").read_text() == "Dear Globex, you owe 10"
+    instances = manager.outcome_instances.get_all(instance_id=workflow_instance.Id)
+    assert sorted(i.RenderedName for i in instances) == ["Acme.txt", "Globex.txt", "Initech.txt"]
+    assert {i.Status for i in instances} == {"Complete"}
@@ -0,0 +1,47 @@
+"""Test remembering rendered documents so identical ones are copied."""
+
+from autodoc.workflow.render_dedup import RenderedDocuments, render_key
+
+
+def test_render_key_only_depends_on_the_fields_read():
+    """Test that contexts differing only in fields the template doesn't read share a key."""
+    fields = frozenset({"name"})
+
+    first = render_key(10, {"name": "A", "id": 1}, fields)
+
+    assert first == render_key(10, {"name": "A", "id": 2}, fields)
+    assert first != render_key(10, {"name": "B", "id": 1}, fields)
+    assert first != render_key(20, {"name": "A", "id": 1}, fields)
+    assert render_key(10, {"name": "A"}, None) is None
+
+
+def test_overwritten_documents_are_forgotten(tmp_path):
+    """Test that a document is forgotten once another is saved over its file."""
+    # 1. ARRANGE
+    path = tmp_path / "out.txt"
+    path.write_text("first")
+    documents = RenderedDocuments(max_entries=4)
+
+    # 2. ACT
+    documents.add("first", path)
+    remembered = documents.get("first")
+    documents.add("second", path)
+
+    # 3. ASSERT
+    assert remembered == path
+    assert documents.get("first") is None
+    assert documents.get("second") == path
+
+
+def test_least_recently_used_documents_are_forgotten(tmp_path):
+    """Test that at most max_entries documents are remembered."""
+    documents = RenderedDocuments(max_entries=2)
+    for key in "abc":
+        (tmp_path / key).write_text(key)
+
+    documents.add("a", tmp_path / "a")
+    documents.add("b", tmp_path / "b")
+    documents.get("a")
+    documents.add("c", tmp_path / "c")
+
+    assert list(documents.entries) == ["a", "c"]
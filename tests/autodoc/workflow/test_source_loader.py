@@ -1,9 +1,16 @@
 """Test the SourceLoader class."""
 
-from unittest.mock import MagicMock, call
+import threading
+from typing import Optional
+from unittest.mock import MagicMock, call, patch
 
+import pytest
+
+from autodoc.containers import Context
 from autodoc.data.tables import Source, WorkflowInstance
 from autodoc.source import SourceService
+from autodoc.storage_service.clients import storage_clients
+from autodoc.storage_service.sharepoint import SharePointSiteStorageService
 from autodoc.workflow.source_loader import SourceLoader
 
 
@@ -439,3 +446,247 @@ def test_source_loader_build_contexts_with_initial(mock_source_service_factory,
     assert mock_service_3.load_data.call_count == 1
     assert mock_service_4.load_data.call_count == 2
     assert mock_service_5.load_data.call_count == 2
+
+
+def test_source_loader_stream_contexts(mock_source_service_factory, mock_manager):
+    """Test that stream_contexts yields the same contexts as build_contexts, lazily."""
+    # 1. ARRANGE
+    mock_source_1 = MagicMock(spec=Source, Id=1, IsSplitter=False)
+    mock_source_1.Name = "Single Record"
+
+    mock_source_2 = MagicMock(spec=Source, Id=2, IsSplitter=True)
+    mock_source_2.Name = "Splitter"
+
+    mock_source_3 = MagicMock(spec=Source, Id=3, IsSplitter=False, FieldName="rows")
+    mock_source_3.Name = "Multi Record to Field"
+
+    mock_service_1 = MagicMock(spec=SourceService, source=mock_source_1, is_multi_record=False)
+    mock_service_1.stream_data.return_value = {"client": "ACME"}
+
+    mock_service_2 = MagicMock(spec=SourceService, source=mock_source_2, is_multi_record=True)
+    mock_service_2.stream_data.return_value = [{"split": "one"}, {"split": "two"}]
+
+    mock_service_3 = MagicMock(spec=SourceService, source=mock_source_3, is_multi_record=True)
+    mock_service_3.stream_data.return_value = [{"row": 1}]
+
+    mock_source_service_factory.create.side_effect = [mock_service_1, mock_service_2, mock_service_3]
+    source_loader = SourceLoader(
+        source_service_factory=mock_source_service_factory, manager=mock_manager
+    )
+
+    # 2. ACT
+    contexts = source_loader.stream_contexts(
+        sources=[mock_source_1, mock_source_2, mock_source_3],
+        workflow_instance=MagicMock(spec=WorkflowInstance, Id=1),
+        initial_data={"form": "value"},
+        upload_mapping={},
+    )
+    first = next(contexts)
+
+    # 3. ASSERT
+    # the first context is ready before the second split has been expanded.
+    assert first == {"form": "value", "client": "ACME", "split": "one", "rows": [{"row": 1}]}
+    assert mock_service_3.stream_data.call_count == 1
+    mock_manager.source_instances.set_loaded.assert_not_called()
+
+    assert list(contexts) == [
+        {"form": "value", "client": "ACME", "split": "two", "rows": [{"row": 1}]}
+    ]
+    assert mock_service_3.stream_data.call_count == 2
+    mock_service_3.stream_data.assert_called_with(
+        current_data={"form": "value", "client": "ACME", "split": "two"}
+    )
+    assert mock_manager.source_instances.set_loaded.call_count == 3
+
+
+class FakeSourceService(SourceService):
+    """A source returning fixed data, that can wait at a barrier to prove it runs concurrently."""
+
+    def __init__(self, source, data, reads: Optional[frozenset], barrier=None):
+        """Create the service with the data it loads and the fields it reads."""
+        super().__init__(source=source)
+        self.data = data
+        self.is_multi_record = isinstance(data, list)
+        self.context_fields = reads
+        self.barrier = barrier
+        self.loaded_with: list = []
+
+    def check(self):
+        """Return that the source can always be loaded."""
+        return True, None
+
+    def load_data(self, current_data):
+        """Record the context loaded for, waiting at the barrier if given."""
+        if self.barrier:
+            self.barrier.wait()
+        self.loaded_with.append(dict(current_data))
+
+
+def make_source(source_id: int, is_splitter: bool = False, field_name: str = "", step: int = 1):
+    """Return a mocked Source."""
+    source = MagicMock(spec=Source, Id=source_id, IsSplitter=is_splitter, FieldName=field_name, Step=step)
+    source.Name = f"Source {source_id}"
+    return source
+
+
+def test_build_contexts_loads_independent_sources_together(mock_source_service_factory, mock_manager):
+    """Test that sources not reading each other's fields load concurrently, merged in order."""
+    # 1. ARRANGE
+    # the first two only finish once both are loading at the same time.
+    barrier = threading.Barrier(2, timeout=5)
+    splitter = FakeSourceService(
+        make_source(1, is_splitter=True), [{"client": "A"}, {"client": "B"}], frozenset(), barrier
+    )
+    grouped = FakeSourceService(
+        make_source(2, field_name="products"), [{"product": "X"}], frozenset(), barrier
+    )
+    # reads a field the splitter adds, so waits for it.
+    dependent = FakeSourceService(make_source(3), {"address": "here"}, frozenset({"client"}))
+
+    services = [splitter, grouped, dependent]
+    mock_source_service_factory.create.side_effect = services
+    source_loader = SourceLoader(
+        source_service_factory=mock_source_service_factory, manager=mock_manager, workers=4
+    )
+
+    # 2. ACT
+    groups = source_loader.group_independent(services)
+    mock_source_service_factory.create.side_effect = services
+    contexts = source_loader.build_contexts(
+        sources=[service.source for service in services],
+        workflow_instance=MagicMock(spec=WorkflowInstance, Id=1),
+        initial_data={"form": "value"},
+        upload_mapping={},
+    )
+
+    # 3. ASSERT
+    assert groups == [[splitter, grouped], [dependent]]
+    assert [dict(context) for context in contexts] == [
+        {"form": "value", "client": "A", "products": [{"product": "X"}], "address": "here"},
+        {"form": "value", "client": "B", "products": [{"product": "X"}], "address": "here"},
+    ]
+    assert grouped.loaded_with == [{"form": "value"}]
+    assert dependent.loaded_with == [
+        {"form": "value", "client": "A", "products": [{"product": "X"}]},
+        {"form": "value", "client": "B", "products": [{"product": "X"}]},
+    ]
+    assert mock_manager.source_instances.set_loaded.call_count == 3
+
+
+def test_group_independent_splits_on_dependencies_and_steps(mock_source_service_factory, mock_manager):
+    """Test that a source reading an earlier field, of a later Step or reading any field starts a group."""
+    first = FakeSourceService(make_source(1, field_name="rows"), [], frozenset())
+    independent = FakeSourceService(make_source(2), {}, frozenset({"form"}))
+    reads_rows = FakeSourceService(make_source(3), {}, frozenset({"rows"}))
+    later_step = FakeSourceService(make_source(4, step=2), {}, frozenset())
+    unknown = FakeSourceService(make_source(5, step=2), {}, None)
+
+    source_loader = SourceLoader(
+        source_service_factory=mock_source_service_factory, manager=mock_manager, workers=4
+    )
+    groups = source_loader.group_independent([first, independent, reads_rows, later_step, unknown])
+
+    assert groups == [[first, independent], [reads_rows], [later_step], [unknown]]
+
+    serial_loader = SourceLoader(
+        source_service_factory=mock_source_service_factory, manager=mock_manager, workers=1
+    )
+    assert len(serial_loader.group_independent([first, independent])) == 2
+
+
+def test_set_downstream_fields_adds_what_later_sources_read(mock_source_service_factory, mock_manager):
+    """Test that each source is given the outcomes' fields and those later sources read."""
+    first = FakeSourceService(make_source(1, is_splitter=True), [], frozenset())
+    second = FakeSourceService(make_source(2), {}, frozenset({"client"}))
+    third = FakeSourceService(make_source(3), {}, frozenset({"region"}))
+    unknown = FakeSourceService(make_source(4), {}, None)
+
+    SourceLoader.set_downstream_fields([first, second, third], frozenset({"name"}))
+
+    assert first.downstream_fields == frozenset({"name", "client", "region"})
+    assert second.downstream_fields == frozenset({"name", "region"})
+    assert third.downstream_fields == frozenset({"name"})
+
+    SourceLoader.set_downstream_fields([first, unknown, third], frozenset({"name"}))
+    assert first.downstream_fields is None
+    assert unknown.downstream_fields == frozenset({"name", "region"})
+
+
+class SharePointSourceService(FakeSourceService):
+    """A source reading from SharePoint, recording the context each load used."""
+
+    def __init__(self, source, barrier):
+        """Create the service with a SharePoint storage service, on the calling thread."""
+        super().__init__(source=source, data={}, reads=frozenset(), barrier=barrier)
+        self.storage_service = SharePointSiteStorageService(
+            root="Documents",
+            relative="data.csv",
+            url="https://sp.test",
+            username="u",
+            password="p",
+            instance_id=1,
+        )
+        self.contexts: list = []
+
+    def load_data(self, current_data):
+        """Record the SharePoint context used, once both sources are loading."""
+        super().load_data(current_data)
+        self.contexts.append(self.storage_service.ctx)
+
+
+def test_concurrent_sharepoint_sources_use_their_thread_context(mock_source_service_factory, mock_manager):
+    """Test that SharePoint sources loaded together don't share one thread's ClientContext."""
+    # 1. ARRANGE
+    storage_clients.clear()
+    barrier = threading.Barrier(2, timeout=5)
+
+    with (
+        patch("autodoc.storage_service.clients.ClientContext", side_effect=lambda url: MagicMock()),
+        patch("autodoc.storage_service.clients.UserCredential"),
+    ):
+        first = SharePointSourceService(make_source(1), barrier)
+        second = SharePointSourceService(make_source(2), barrier)
+        main_context = first.storage_service.ctx
+
+        source_loader = SourceLoader(
+            source_service_factory=mock_source_service_factory, manager=mock_manager, workers=2
+        )
+
+        # 2. ACT
+        source_loader.load_group([first, second], [Context({})])
+
+    storage_clients.clear()
+
+    # 3. ASSERT
+    [first_context], [second_context] = first.contexts, second.contexts
+    assert first_context is not second_context
+    assert main_context not in (first_context, second_context)
+
+
+def test_build_contexts_sets_each_group_loaded_as_it_finishes(mock_source_service_factory, mock_manager):
+    """Test that sources are set as loaded group by group, so a later failure keeps them."""
+    # 1. ARRANGE
+    first = FakeSourceService(make_source(1), {"client": "A"}, frozenset())
+    failing = FakeSourceService(make_source(2), {}, frozenset({"client"}))
+    failing.load_data = MagicMock(side_effect=RuntimeError("query failed"))
+
+    mock_source_service_factory.create.side_effect = [first, failing]
+    mock_manager.source_instances.add.side_effect = lambda source_id, **_: MagicMock(Id=source_id * 10)
+    source_loader = SourceLoader(
+        source_service_factory=mock_source_service_factory, manager=mock_manager, workers=1
+    )
+
+    # 2. ACT
+    with pytest.raises(RuntimeError, match="query failed"):
+        source_loader.build_contexts(
+            sources=[first.source, failing.source],
+            workflow_instance=MagicMock(spec=WorkflowInstance, Id=1),
+            initial_data={},
+            upload_mapping={},
+        )
+
+    # 3. ASSERT
+    mock_manager.source_instances.set_loaded.assert_called_once_with(
+        source_instance_id=10, cache_hits=None, cache_misses=None
+    )
+    mock_manager.commit.assert_called_with(expire=False)
@@ -0,0 +1,39 @@
+"""Test the OutcomeStatusBuffer."""
+
+from autodoc.workflow.status_buffer import OutcomeStatusBuffer
+
+
+def test_flushes_when_full(mock_manager):
+    """Test that completions are written once max_count have built up."""
+    status_buffer = OutcomeStatusBuffer(manager=mock_manager, max_count=2, max_seconds=60)
+
+    status_buffer.add(outcome_instance_id=1, rendered_name="one.pdf")
+    mock_manager.outcome_instances.set_complete_many.assert_not_called()
+
+    status_buffer.add(outcome_instance_id=2, rendered_name="two.pdf")
+    mock_manager.outcome_instances.set_complete_many.assert_called_once_with(
+        rendered_names={1: "one.pdf", 2: "two.pdf"}
+    )
+    mock_manager.commit.assert_called_once()
+    assert status_buffer.pending == {}
+
+
+def test_flushes_when_stale(mock_manager):
+    """Test that completions are written once max_seconds have passed."""
+    status_buffer = OutcomeStatusBuffer(manager=mock_manager, max_count=100, max_seconds=0)
+
+    status_buffer.add(outcome_instance_id=1, rendered_name="one.pdf")
+
+    mock_manager.outcome_instances.set_complete_many.assert_called_once_with(
+        rendered_names={1: "one.pdf"}
+    )
+
+
+def test_flush_with_nothing_pending(mock_manager):
+    """Test that an empty flush doesn't touch the database."""
+    status_buffer = OutcomeStatusBuffer(manager=mock_manager)
+
+    status_buffer.flush()
+
+    mock_manager.outcome_instances.set_complete_many.assert_not_called()
+    mock_manager.commit.assert_not_called()
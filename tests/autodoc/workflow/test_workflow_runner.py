@@ -79,6 +79,12 @@ def test_workflow_runner_process_success_path(
     mock_source_loader.build_contexts.assert_called_once()
     mock_outcome_processor.process.assert_called_once()
     mock_outcome_processor.downloads_exist.assert_called_once()
+    mock_archiver.start.assert_called_once()
+    assert mock_outcome_processor.process.call_args.kwargs["archiver"] is mock_archiver
+    # the fields are found once, and passed to both the sources and the outcomes.
+    mock_outcome_processor.find_fields.assert_called_once()
+    assert mock_outcome_processor.process.call_args.kwargs["fields"] == {1: frozenset({"client"})}
+    assert mock_source_loader.build_contexts.call_args.kwargs["outcome_fields"] == frozenset({"client"})
     mock_archiver.zip_downloads.assert_called_once()
 
     # Check that the final status is "Complete"
@@ -156,3 +162,30 @@ def test_workflow_runner_with_no_downloads(
         call(instance_id=1, status="Complete")
         in mock_manager.workflow_instances.update_status.call_args_list
     )
+
+
+def test_workflow_runner_process_streaming_contexts(
+    mock_manager,
+    mock_source_loader,
+    mock_outcome_processor,
+    mock_archiver,
+    test_download_dir,
+):
+    """Test that a streaming runner passes the context stream straight to the processor."""
+    runner = WorkflowRunner(
+        instance_id=1,
+        manager=mock_manager,
+        source_loader=mock_source_loader,
+        outcome_processor=mock_outcome_processor,
+        archiver=mock_archiver,
+        stream_contexts=True,
+    )
+
+    runner.process()
+
+    mock_source_loader.build_contexts.assert_not_called()
+    mock_source_loader.stream_contexts.assert_called_once()
+    assert (
+        mock_outcome_processor.process.call_args.kwargs["contexts"]
+        is mock_source_loader.stream_contexts.return_value
+    )